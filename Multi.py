@@ -10,6 +10,7 @@ def run_admin():
         import admin
         config_path = os.path.join(os.path.dirname(__file__), 'urls.json')
         admin_portal = admin.AdminPortal(config_path)
+        admin_portal.showFullScreen()
         sys.exit(admin.app.exec_())
     except Exception as e:
         print(f"Error starting Admin Portal: {e}")
@@ -0,0 +1,89 @@
+# background_cache.py
+
+import glob
+import hashlib
+import os
+import threading
+from PyQt5.QtCore import QObject, QRect, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_cache')
+
+
+def crop_rect(source_size, x_offset, y_offset, width, height):
+    """Move the requested region inside the image where it fits, then clip it to the image."""
+    x = max(0, min(x_offset, source_size.width() - width))
+    y = max(0, min(y_offset, source_size.height() - height))
+    return QRect(x, y, width, height).intersected(QRect(0, 0, source_size.width(), source_size.height()))
+
+
+def cache_path(source_path, rect, target_size, cache_dir=CACHE_DIR):
+    """Cache file for one crop of `source_path`; any change to the source or geometry changes the name."""
+    stat = os.stat(source_path)
+    key = '|'.join(str(part) for part in (
+        os.path.abspath(source_path), stat.st_mtime_ns, stat.st_size,
+        rect.x(), rect.y(), rect.width(), rect.height(), target_size.width(), target_size.height(),
+    ))
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(cache_dir, f"{name}-{hashlib.sha1(key.encode()).hexdigest()[:16]}.png")
+
+
+def load_region(source_path, x_offset, y_offset, width, height, target_size=None, cache_dir=CACHE_DIR):
+    """
+    Return the display-ready region of an image as a QImage (null on failure).
+
+    A cached crop is used when one matches the source's mtime and size and the requested
+    geometry. Otherwise only the region is decoded, at `target_size` (the region's own size by
+    default); JPEG decoders skip the rest of the image and scale during the decode.
+    """
+    reader = QImageReader(source_path)
+    source_size = reader.size()  # Read from the header, nothing is decoded yet
+    if not source_size.isValid():
+        print(f"Failed to read image at {source_path}: {reader.errorString()}")
+        return QImage()
+
+    rect = crop_rect(source_size, x_offset, y_offset, width, height)
+    target_size = target_size or rect.size()
+    try:
+        path = cache_path(source_path, rect, target_size, cache_dir)
+    except OSError as e:
+        print(f"Failed to read image at {source_path}: {e}")
+        return QImage()
+
+    cached = QImage(path)
+    if not cached.isNull():
+        return cached
+
+    reader.setClipRect(rect)
+    if target_size != rect.size():
+        reader.setScaledSize(target_size)
+    image = reader.read()
+    if image.isNull():
+        print(f"Failed to load image at {source_path}: {reader.errorString()}")
+        return image
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Crops of older versions of the source or of other geometries are never read again
+        prefix = path.rsplit('-', 1)[0]
+        for stale in glob.glob(glob.escape(prefix) + '-' + '?' * 16 + '.png'):
+            os.remove(stale)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        if image.save(temp_path, 'PNG'):
+            os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Could not cache background image: {e}")
+    return image
+
+
+class BackgroundImageLoader(QObject):
+    """Runs load_region() on a worker thread and delivers the result through `loaded`."""
+
+    loaded = pyqtSignal(QImage)
+
+    def load(self, *args, **kwargs):
+        thread = threading.Thread(
+            target=lambda: self.loaded.emit(load_region(*args, **kwargs)),
+            name='background-image', daemon=True,
+        )
+        thread.start()
@@ -0,0 +1,533 @@
+# caching_proxy.py
+
+"""
+Shared caching HTTP proxy for a fleet of kiosks on one LAN.
+
+Kiosks use it as their HTTP proxy (the 'proxy' setting of the 'profile' block in urls.json),
+or, started with --upstream, it serves as a reverse proxy in front of one Jira server and the
+kiosks' urls.json points at it directly. Either way:
+
+- Versioned static assets (Jira's /s/<version>/... bundles, /download/resources, images) are
+  cached for `static_ttl` seconds and shared by every kiosk. Other files that merely look
+  static (.png, .css, ...) are cached as long, but per caller, and not at all when marked
+  private or no-store.
+- Pages and REST responses (/browse, /rest, /secure, ...) are cached for a short `page_ttl`,
+  so a fleet refreshing the same board costs Jira one request per TTL; attachments under
+  /secure are pages, whatever their extension.
+- Everything but the versioned assets is keyed by the caller's Authorization and Cookie
+  headers unless `shared_session` is set (all kiosks log in as one wallboard user).
+  Responses that set cookies are never cached.
+- Concurrent misses for the same key are coalesced into a single upstream request.
+- Upstream connections are HTTP/1.1 keep-alive and pooled per origin.
+- HTTPS requests arrive as CONNECT tunnels and are passed through uncached.
+
+GET /__proxy/stats returns the counters as JSON, including the hit ratio.
+
+    python caching_proxy.py [--port 8899] [--upstream http://jira:8080] [--page-ttl 5]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import ssl
+import sys
+import time
+import urllib.parse
+from collections import OrderedDict
+
+DEFAULT_PORT = 8899
+DEFAULT_PAGE_TTL = 5  # s
+DEFAULT_STATIC_TTL = 86400  # s
+DEFAULT_CACHE_MB = 256
+DEFAULT_TIMEOUT = 30  # s per upstream request
+STATS_PATH = '/__proxy/stats'
+
+MAX_HEADER_BYTES = 65536
+HOP_BY_HOP = frozenset((
+    'connection', 'keep-alive', 'proxy-connection', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'transfer-encoding', 'upgrade',
+))
+CONDITIONAL_HEADERS = frozenset(('if-none-match', 'if-modified-since'))
+STATIC_PREFIXES = ('/s/', '/download/resources/', '/download/batch/', '/images/', '/static/')
+STATIC_EXTENSIONS = ('.js', '.css', '.woff', '.woff2', '.ttf', '.png', '.gif', '.svg', '.ico', '.jpg')
+PAGE_PREFIXES = ('/browse/', '/rest/', '/issues/', '/secure/')
+
+
+def classify(path):
+    """'page', 'shared' (versioned assets anyone may get), 'static' (per caller) or None."""
+    if path.startswith(PAGE_PREFIXES):
+        return 'page'  # Before the extension rule: /secure/attachment/1/x.png is someone's file
+    if path.startswith(STATIC_PREFIXES):
+        return 'shared'
+    if path.lower().endswith(STATIC_EXTENSIONS):
+        return 'static'
+    return None
+
+
+class UpstreamError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Response:
+    __slots__ = ('status', 'reason', 'headers', 'body')
+
+    def __init__(self, status, reason, headers, body):
+        self.status = status
+        self.reason = reason
+        self.headers = headers  # [(name, value)], without hop-by-hop headers
+        self.body = body
+
+
+class CacheEntry:
+    __slots__ = ('response', 'stored', 'expires')
+
+    def __init__(self, response, ttl):
+        self.response = response
+        self.stored = time.monotonic()
+        self.expires = self.stored + ttl
+
+
+def get_header(headers, name):
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def end_to_end(headers):
+    return [(name, value) for name, value in headers if name.lower() not in HOP_BY_HOP]
+
+
+def error_response(status, message):
+    reasons = {400: 'Bad Request', 502: 'Bad Gateway', 504: 'Gateway Timeout'}
+    return Response(status, reasons.get(status, 'Error'), [('Content-Type', 'text/plain')],
+                    message.encode('utf-8'))
+
+
+async def read_head(reader):
+    """Read a request or status line and its headers."""
+    data = await reader.readuntil(b'\r\n\r\n')
+    lines = data.decode('latin-1').split('\r\n')
+    headers = []
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers.append((name.strip(), value.strip()))
+    return lines[0], headers
+
+
+async def read_body(reader, headers, until_eof=False):
+    """
+    Read a message body framed by chunked encoding or Content-Length. Without either, a
+    response body runs to the end of the connection (`until_eof`) and a request has none.
+    Returns (body, reusable), where reusable says whether the connection can carry another message.
+    """
+    if 'chunked' in (get_header(headers, 'Transfer-Encoding') or '').lower():
+        chunks = []
+        while True:
+            size_line = await reader.readuntil(b'\r\n')
+            size = int(size_line.split(b';', 1)[0].strip(), 16)
+            if size == 0:
+                # Skip trailers up to the blank line
+                while (await reader.readuntil(b'\r\n')) != b'\r\n':
+                    pass
+                return b''.join(chunks), True
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    length = get_header(headers, 'Content-Length')
+    if length is not None:
+        return await reader.readexactly(int(length)), True
+    if until_eof:
+        return await reader.read(), False
+    return b'', True
+
+
+class UpstreamPool:
+    """Idle keep-alive connections per origin, reused before new ones are opened."""
+
+    def __init__(self, max_idle=8, idle_timeout=30):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.idle = {}  # (scheme, host, port) -> [(reader, writer, idle since)]
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self, origin):
+        """Return (reader, writer, reused)."""
+        connections = self.idle.get(origin, [])
+        now = time.monotonic()
+        while connections:
+            reader, writer, since = connections.pop()
+            if writer.is_closing() or reader.at_eof() or now - since > self.idle_timeout:
+                writer.close()
+                continue
+            self.reused += 1
+            return reader, writer, True
+        scheme, host, port = origin
+        context = ssl.create_default_context() if scheme == 'https' else None
+        reader, writer = await asyncio.open_connection(host, port, ssl=context, limit=MAX_HEADER_BYTES)
+        self.opened += 1
+        return reader, writer, False
+
+    def release(self, origin, reader, writer, reusable):
+        connections = self.idle.setdefault(origin, [])
+        if reusable and not writer.is_closing() and len(connections) < self.max_idle:
+            connections.append((reader, writer, time.monotonic()))
+        else:
+            writer.close()
+
+    def close(self):
+        for connections in self.idle.values():
+            for _, writer, _ in connections:
+                writer.close()
+        self.idle.clear()
+
+
+class ResponseCache:
+    """In-memory responses with per-entry expiry, evicting least recently used past `max_bytes`."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> CacheEntry
+        self.size = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic():
+            self.remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, response, ttl):
+        if len(response.body) > self.max_bytes // 4:
+            return  # One huge download would flush everything else
+        self.remove(key)
+        self.entries[key] = CacheEntry(response, ttl)
+        self.size += len(response.body)
+        while self.size > self.max_bytes:
+            self.remove(next(iter(self.entries)))
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry.response.body)
+
+
+class CachingProxy:
+    def __init__(self, upstream=None, page_ttl=DEFAULT_PAGE_TTL, static_ttl=DEFAULT_STATIC_TTL,
+                 cache_mb=DEFAULT_CACHE_MB, shared_session=False, timeout=DEFAULT_TIMEOUT):
+        self.upstream = upstream.rstrip('/') if upstream else None  # Reverse proxy target
+        self.page_ttl = page_ttl
+        self.static_ttl = static_ttl
+        self.shared_session = shared_session
+        self.timeout = timeout
+        self.cache = ResponseCache(cache_mb * 1024 * 1024)
+        self.pool = UpstreamPool()
+        self.inflight = {}  # cache key -> Future of the upstream Response
+        self.stats = {
+            'requests': 0, 'hits': 0, 'misses': 0, 'coalesced': 0, 'uncacheable': 0,
+            'passthrough': 0, 'tunnels': 0, 'errors': 0, 'bytes_from_cache': 0, 'bytes_from_upstream': 0,
+        }
+
+    def stats_snapshot(self):
+        stats = dict(self.stats)
+        lookups = stats['hits'] + stats['coalesced'] + stats['misses'] + stats['uncacheable']
+        stats['hit_ratio'] = round((stats['hits'] + stats['coalesced']) / lookups, 3) if lookups else 0
+        stats['cache_entries'] = len(self.cache.entries)
+        stats['cache_bytes'] = self.cache.size
+        stats['upstream_connections_opened'] = self.pool.opened
+        stats['upstream_connections_reused'] = self.pool.reused
+        return stats
+
+    # Policy
+
+    def cache_ttl(self, path, response):
+        """Seconds a GET response may be shared for; 0 when it must not be cached."""
+        if response.status != 200 or get_header(response.headers, 'Set-Cookie') is not None:
+            return 0
+        if (get_header(response.headers, 'Vary') or '').strip() == '*':
+            return 0
+        kind = classify(path)
+        if kind == 'page':
+            return self.page_ttl  # Jira marks every page no-store; the short TTL is the point
+        cache_control = (get_header(response.headers, 'Cache-Control') or '').lower()
+        if 'private' in cache_control or 'no-store' in cache_control:
+            return 0
+        if kind is not None:
+            return self.static_ttl
+        max_age = re.search(r'max-age=(\d+)', cache_control)
+        if max_age:
+            return min(int(max_age.group(1)), self.static_ttl)
+        return 0
+
+    def cache_key(self, url, path, headers):
+        identity = ''
+        if classify(path) != 'shared' and not self.shared_session:
+            identity = f"{get_header(headers, 'Authorization') or ''}\n{get_header(headers, 'Cookie') or ''}"
+        return url, get_header(headers, 'Accept-Encoding') or '', identity
+
+    # Upstream
+
+    async def fetch(self, method, url, headers, body):
+        try:
+            return await asyncio.wait_for(self.fetch_once(method, url, headers, body), self.timeout)
+        except asyncio.TimeoutError:
+            raise UpstreamError(504, f"Upstream timed out: {url}")
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+            raise UpstreamError(502, f"Upstream failed: {url}: {e}")
+
+    async def fetch_once(self, method, url, headers, body):
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme or 'http'
+        origin = (scheme, parts.hostname, parts.port or (443 if scheme == 'https' else 80))
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}"]
+        for name, value in end_to_end(headers):
+            if name.lower() not in ('host', 'content-length'):
+                lines.append(f"{name}: {value}")
+        if body or method in ('POST', 'PUT', 'PATCH'):
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append('Connection: keep-alive')
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+        while True:
+            reader, writer, reused = await self.pool.acquire(origin)
+            try:
+                writer.write(request)
+                await writer.drain()
+                status_line, response_headers = await read_head(reader)
+            except (OSError, asyncio.IncompleteReadError):
+                writer.close()
+                if reused and method in ('GET', 'HEAD'):
+                    continue  # The server closed an idle connection; retry on a fresh one
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            break
+
+        try:
+            _, status, reason = (status_line.split(' ', 2) + [''])[:3]
+            status = int(status)
+            if method == 'HEAD' or status in (204, 304) or status < 200:
+                response_body, reusable = b'', True
+            else:
+                response_body, reusable = await read_body(reader, response_headers, until_eof=True)
+        except BaseException:
+            writer.close()
+            raise
+        connection = (get_header(response_headers, 'Connection') or '').lower()
+        self.pool.release(origin, reader, writer, reusable and connection != 'close')
+        self.stats['bytes_from_upstream'] += len(response_body)
+        return Response(status, reason, end_to_end(response_headers), response_body)
+
+    # Requests
+
+    async def respond(self, method, url, headers, body):
+        """Return (response, cache state) for one client request."""
+        if method != 'GET':
+            self.stats['passthrough'] += 1
+            return await self.fetch(method, url, headers, body), 'PASS'
+
+        path = urllib.parse.urlsplit(url).path or '/'
+        key = self.cache_key(url, path, headers)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.stats['hits'] += 1
+            self.stats['bytes_from_cache'] += len(entry.response.body)
+            return entry.response, 'HIT'
+
+        inflight = self.inflight.get(key)
+        if inflight is not None:
+            self.stats['coalesced'] += 1
+            response = await asyncio.shield(inflight)
+            if isinstance(response, UpstreamError):
+                raise response
+            return response, 'COALESCED'
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            # Fetch the full body; the client's own validators are answered from it afterwards
+            upstream_headers = [(name, value) for name, value in headers if name.lower() not in CONDITIONAL_HEADERS]
+            response = await self.fetch('GET', url, upstream_headers, b'')
+        except UpstreamError as e:
+            future.set_result(e)
+            raise
+        except BaseException:
+            future.set_result(UpstreamError(502, f"Upstream request abandoned: {url}"))
+            raise
+        finally:
+            del self.inflight[key]
+        ttl = self.cache_ttl(path, response)
+        if ttl:
+            self.cache.put(key, response, ttl)
+            self.stats['misses'] += 1
+        else:
+            self.stats['uncacheable'] += 1
+        future.set_result(response)
+        return response, 'MISS' if ttl else 'BYPASS'
+
+    def resolve(self, target):
+        """The absolute upstream URL for a request target, or None."""
+        if target.startswith(('http://', 'https://')):
+            return target
+        if self.upstream and target.startswith('/'):
+            return self.upstream + target
+        return None
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line, headers = await read_head(reader)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+                    return
+                try:
+                    method, target, version = request_line.split(' ', 2)
+                except ValueError:
+                    await self.send(writer, error_response(400, 'Malformed request line'), 'ERROR', False, False)
+                    return
+                if method == 'CONNECT':
+                    await self.tunnel(target, reader, writer)
+                    return
+
+                body, _ = await read_body(reader, headers)
+                connection = (get_header(headers, 'Connection') or get_header(headers, 'Proxy-Connection') or '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                self.stats['requests'] += 1
+
+                url = self.resolve(target)
+                if target.split('?', 1)[0] == STATS_PATH:
+                    body = json.dumps(self.stats_snapshot(), indent=2).encode('utf-8')
+                    response, state = Response(200, 'OK', [('Content-Type', 'application/json')], body), 'STATS'
+                elif url is None:
+                    response, state = error_response(400, 'No upstream for this request'), 'ERROR'
+                else:
+                    try:
+                        response, state = await self.respond(method, url, headers, body)
+                    except UpstreamError as e:
+                        self.stats['errors'] += 1
+                        response, state = error_response(e.status, str(e)), 'ERROR'
+                    response = self.answer_conditional(response, headers)
+                await self.send(writer, response, state, keep_alive, method == 'HEAD')
+                if not keep_alive:
+                    return
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def answer_conditional(self, response, headers):
+        etag = get_header(response.headers, 'ETag')
+        if response.status == 200 and etag is not None and get_header(headers, 'If-None-Match') == etag:
+            kept = [(name, value) for name, value in response.headers
+                    if name.lower() in ('etag', 'cache-control', 'expires', 'last-modified', 'date')]
+            return Response(304, 'Not Modified', kept, b'')
+        return response
+
+    async def send(self, writer, response, state, keep_alive, head_only):
+        lines = [f"HTTP/1.1 {response.status} {response.reason}"]
+        for name, value in response.headers:
+            if name.lower() != 'content-length':
+                lines.append(f"{name}: {value}")
+        if response.status != 304:
+            lines.append(f"Content-Length: {len(response.body)}")
+        lines.append(f"X-Cache: {state}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        writer.write(head if head_only else head + response.body)
+        await writer.drain()
+
+    async def tunnel(self, target, reader, writer):
+        host, _, port = target.rpartition(':')
+        try:
+            upstream_reader, upstream_writer = await asyncio.wait_for(
+                asyncio.open_connection(host.strip('[]'), int(port)), self.timeout
+            )
+        except (OSError, ValueError, asyncio.TimeoutError):
+            self.stats['errors'] += 1
+            writer.write(b'HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n')
+            await writer.drain()
+            return
+        self.stats['tunnels'] += 1
+        writer.write(b'HTTP/1.1 200 Connection Established\r\n\r\n')
+        await writer.drain()
+        await asyncio.gather(pipe(reader, upstream_writer), pipe(upstream_reader, writer))
+
+    async def serve(self, host='0.0.0.0', port=DEFAULT_PORT):
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_HEADER_BYTES)
+
+    async def report(self, interval):
+        reported = None
+        while True:
+            await asyncio.sleep(interval)
+            stats = self.stats_snapshot()
+            if stats['requests'] == reported:
+                continue
+            reported = stats['requests']
+            print(f"Proxy: {stats['requests']} requests, hit ratio {stats['hit_ratio']:.0%} "
+                  f"({stats['hits']} hits, {stats['coalesced']} coalesced, {stats['misses']} misses, "
+                  f"{stats['uncacheable']} uncacheable), {stats['cache_bytes'] / 1048576:.1f} MB cached, "
+                  f"{stats['upstream_connections_opened']} upstream connections")
+
+
+async def pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except OSError:
+        pass
+    finally:
+        writer.close()
+
+
+async def run(args):
+    proxy = CachingProxy(args.upstream, args.page_ttl, args.static_ttl, args.cache_mb,
+                         args.shared_session, args.timeout)
+    server = await proxy.serve(args.host, args.port)
+    address = server.sockets[0].getsockname()
+    target = f"reverse proxy for {args.upstream}" if args.upstream else "forward proxy"
+    print(f"Caching proxy listening on {address[0]}:{address[1]} as {target}")
+    reporter = asyncio.ensure_future(proxy.report(args.report_interval))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reporter.cancel()
+        proxy.pool.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared caching proxy for a fleet of kiosks.")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--upstream', help="Jira base URL to reverse proxy, e.g. http://jira:8080")
+    parser.add_argument('--page-ttl', type=float, default=DEFAULT_PAGE_TTL, help="Seconds pages and REST responses are shared")
+    parser.add_argument('--static-ttl', type=float, default=DEFAULT_STATIC_TTL, help="Seconds static assets are shared")
+    parser.add_argument('--cache-mb', type=int, default=DEFAULT_CACHE_MB)
+    parser.add_argument('--shared-session', action='store_true',
+                        help="Share pages between kiosks regardless of their cookies (one wallboard login)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument('--report-interval', type=float, default=300, help="Seconds between stats lines")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# command_bus.py
+
+"""
+Local command bus between the admin portal and the rotating frontend.
+
+Messages are newline-delimited JSON over a QLocalSocket (a Unix domain socket on Linux):
+
+    {"v": 1, "type": "batch", "commands": [{"id": 7, "command": "refresh_tab", "args": {"index": 2}}]}
+
+The frontend answers every batch with one acknowledgement message:
+
+    {"v": 1, "type": "ack", "results": [{"id": 7, "ok": true}]}
+
+Commands: refresh_tab {index}, refresh_all, navigate_tab {index, url}, pause, resume,
+reorder {order: [old indices in new order]} and config_changed.
+"""
+
+import json
+from PyQt5.QtCore import QTimer
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+PROTOCOL_VERSION = 1
+SERVER_NAME = 'jira-kiosk-command-bus'
+COMMANDS = ('refresh_tab', 'refresh_all', 'navigate_tab', 'pause', 'resume', 'reorder', 'config_changed')
+
+
+def encode_message(message):
+    return json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def split_messages(buffer):
+    """Split complete lines off `buffer`; returns (messages, remaining bytes)."""
+    messages = []
+    while b'\n' in buffer:
+        line, buffer = buffer.split(b'\n', 1)
+        if line.strip():
+            messages.append(json.loads(line.decode('utf-8')))
+    return messages, buffer
+
+
+class CommandBusServer:
+    """Frontend side: accepts admin connections and dispatches commands to `handlers`."""
+
+    def __init__(self, handlers, server_name=SERVER_NAME):
+        self.handlers = handlers  # command name -> callable(**args)
+        self.buffers = {}  # socket -> bytes received but not yet parsed
+        self.server = QLocalServer()
+        # A crashed frontend leaves its socket file behind, which would block listen()
+        QLocalServer.removeServer(server_name)
+        if not self.server.listen(server_name):
+            print(f"Command bus could not listen on '{server_name}': {self.server.errorString()}")
+        self.server.newConnection.connect(self.accept_connections)
+
+    def accept_connections(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = b''
+            socket.readyRead.connect(lambda s=socket: self.read_messages(s))
+            socket.disconnected.connect(lambda s=socket: self.drop_connection(s))
+
+    def drop_connection(self, socket):
+        self.buffers.pop(socket, None)
+        socket.deleteLater()
+
+    def read_messages(self, socket):
+        try:
+            messages, self.buffers[socket] = split_messages(self.buffers[socket] + bytes(socket.readAll()))
+        except ValueError as e:
+            print(f"Command bus dropped a malformed message: {e}")
+            self.buffers[socket] = b''
+            return
+        for message in messages:
+            # This runs in a slot, where an exception would abort the frontend
+            try:
+                results = self.handle(message)
+            except Exception as e:
+                print(f"Command bus could not handle a message: {e}")
+                results = [{'id': None, 'ok': False, 'error': str(e)}]
+            socket.write(encode_message({'v': PROTOCOL_VERSION, 'type': 'ack', 'results': results}))
+        socket.flush()
+
+    def handle(self, message):
+        if not isinstance(message, dict):
+            return [{'id': None, 'ok': False, 'error': "message is not an object"}]
+        commands = message.get('commands', []) if message.get('type') == 'batch' else [message]
+        if not isinstance(commands, list):
+            return [{'id': None, 'ok': False, 'error': "batch commands are not a list"}]
+        if message.get('v') != PROTOCOL_VERSION:
+            error = f"unsupported protocol version {message.get('v')}"
+            return [{'id': command.get('id') if isinstance(command, dict) else None, 'ok': False, 'error': error}
+                    for command in commands]
+        return [self.dispatch(command) for command in commands]
+
+    def dispatch(self, command):
+        if not isinstance(command, dict):
+            return {'id': None, 'ok': False, 'error': "command is not an object"}
+        args = command.get('args', {})
+        if not isinstance(args, dict):
+            return {'id': command.get('id'), 'ok': False, 'error': "args is not an object"}
+        handler = self.handlers.get(command.get('command'))
+        if handler is None:
+            return {'id': command.get('id'), 'ok': False, 'error': f"unknown command {command.get('command')}"}
+        try:
+            handler(**args)
+        except Exception as e:
+            print(f"Command bus: {command.get('command')} failed: {e}")
+            return {'id': command.get('id'), 'ok': False, 'error': str(e)}
+        return {'id': command.get('id'), 'ok': True}
+
+
+class CommandBusClient:
+    """
+    Admin side: sends commands to the frontend.
+
+    Commands issued during one event loop iteration are coalesced into a single batch.
+    send() returns False when no frontend is listening so callers can fall back.
+    """
+
+    def __init__(self, server_name=SERVER_NAME, connect_timeout_ms=100):
+        self.server_name = server_name
+        self.connect_timeout_ms = connect_timeout_ms
+        self.socket = QLocalSocket()
+        self.socket.readyRead.connect(self.read_acks)
+        self.buffer = b''
+        self.queue = []
+        self.next_id = 1
+        self.ack_callbacks = {}  # command id -> callable(ok, error)
+
+        self.flush_timer = QTimer()
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(0)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def ensure_connected(self):
+        if self.socket.state() == QLocalSocket.ConnectedState:
+            return True
+        self.socket.abort()
+        self.buffer = b''
+        self.socket.connectToServer(self.server_name)
+        return self.socket.waitForConnected(self.connect_timeout_ms)
+
+    def send(self, command, on_ack=None, **args):
+        if command not in COMMANDS:
+            raise ValueError(f"Unknown command bus command '{command}'")
+        if not self.ensure_connected():
+            return False
+        command_id = self.next_id
+        self.next_id += 1
+        self.queue.append({'id': command_id, 'command': command, 'args': args})
+        if on_ack is not None:
+            self.ack_callbacks[command_id] = on_ack
+        self.flush_timer.start()
+        return True
+
+    def flush(self):
+        if not self.queue:
+            return
+        message = {'v': PROTOCOL_VERSION, 'type': 'batch', 'commands': self.queue}
+        self.queue = []
+        self.socket.write(encode_message(message))
+        self.socket.flush()
+
+    def read_acks(self):
+        try:
+            messages, self.buffer = split_messages(self.buffer + bytes(self.socket.readAll()))
+        except ValueError:
+            self.buffer = b''
+            return
+        for message in messages:
+            if message.get('type') != 'ack':
+                continue
+            for result in message.get('results', []):
+                callback = self.ack_callbacks.pop(result.get('id'), None)
+                if callback is not None:
+                    callback(result.get('ok', False), result.get('error'))
@@ -0,0 +1,200 @@
+# config_store.py
+
+import copy
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from PyQt5.QtCore import QObject, pyqtSignal
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; writes stay atomic but are not serialized
+    fcntl = None
+
+
+def default_config_path(script_file):
+    """urls.json next to `script_file`; KIOSK_CONFIG overrides it (used by startup_benchmark.py)."""
+    return os.environ.get('KIOSK_CONFIG') or os.path.join(os.path.dirname(os.path.abspath(script_file)), 'urls.json')
+
+
+@contextmanager
+def file_lock(lock_path, shared=False):
+    """Advisory lock shared by every process that reads or writes the config file."""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class ConfigStore(QObject):
+    """
+    Shared, cached access to urls.json for the admin portal and the frontend.
+
+    Reads are served from an in-memory copy. update() changes the copy at once and a worker
+    thread writes bursts of updates as one temp-file + fsync + rename under an advisory lock.
+    Each write re-reads the file and applies only the keys this process changed, so
+    processes that own different keys never drop each other's settings. Every write bumps
+    the file's `version`, and `saved` is emitted with it once the data is on disk.
+    """
+
+    saved = pyqtSignal(int)
+
+    def __init__(self, config_path, debounce_ms=300):
+        super().__init__()
+        self.config_path = os.path.abspath(config_path)
+        self.lock_path = self.config_path + '.lock'
+        self.debounce = debounce_ms / 1000
+
+        self.condition = threading.Condition()
+        self.cache = {}
+        self.version = 0
+        self.stat_key = None  # (mtime, size, inode) of the file the cache was read from
+        self.pending = {}  # keys changed locally and not yet written
+        self.last_change = 0
+        self.writing = False
+        self.flush_requested = False
+        self.worker = None
+        self.writes = 0
+
+    def load(self):
+        """Read the file into the cache. Raises FileNotFoundError or json.JSONDecodeError like json.load()."""
+        with file_lock(self.lock_path, shared=True):
+            with open(self.config_path, 'r') as f:
+                config = json.load(f)
+                stat = os.fstat(f.fileno())
+        with self.condition:
+            # Local changes that are still waiting to be written stay on top
+            self.cache = dict(config, **copy.deepcopy(self.pending))
+            self.version = max(self.version, config.get('version', 0))
+            self.stat_key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            return copy.deepcopy(self.cache)
+
+    def refresh(self):
+        """Re-read the file only if it changed on disk; returns True if the cached content changed."""
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return False
+        with self.condition:
+            if (stat.st_mtime_ns, stat.st_size, stat.st_ino) == self.stat_key:
+                return False
+            old = self.cache
+        try:
+            new = self.load()
+        except (OSError, ValueError):
+            # Missing or mid-write; the next change notification will pick it up
+            return False
+        return new != old
+
+    def get(self, key, default=None):
+        with self.condition:
+            return copy.deepcopy(self.cache.get(key, default))
+
+    def snapshot(self):
+        with self.condition:
+            return copy.deepcopy(self.cache)
+
+    def update(self, changes):
+        """Apply `changes` to the cache now and schedule them to be written."""
+        changes = copy.deepcopy(changes)
+        with self.condition:
+            self.cache.update(changes)
+            self.pending.update(changes)
+            self.last_change = time.monotonic()
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run, name='config-store', daemon=True)
+                self.worker.start()
+            self.condition.notify_all()
+
+    def flush(self, timeout=5):
+        """Write pending changes now and wait for them to reach the disk."""
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            done = self.condition.wait_for(lambda: not self.pending and not self.writing, timeout)
+            self.flush_requested = False
+            return done
+
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+                # Coalesce a burst of updates: write once things have been quiet for `debounce`
+                while not self.flush_requested:
+                    remaining = self.last_change + self.debounce - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                changes = self.pending
+                self.pending = {}
+                self.writing = True
+
+            try:
+                version = self.write(changes)
+            except Exception as e:
+                print(f"Error saving configuration to {self.config_path}: {e}")
+                with self.condition:
+                    self.pending = dict(changes, **self.pending)
+                    self.writing = False
+                    self.condition.notify_all()
+                time.sleep(max(self.debounce, 1))
+                continue
+
+            # Emit before flush() can return so no signal is in flight at shutdown
+            self.saved.emit(version)
+            with self.condition:
+                self.writing = False
+                self.writes += 1
+                self.condition.notify_all()
+
+    def write(self, changes):
+        directory = os.path.dirname(self.config_path)
+        with file_lock(self.lock_path):
+            try:
+                with open(self.config_path, 'r') as f:
+                    on_disk = json.load(f)
+                if not isinstance(on_disk, dict):
+                    raise ValueError("the top level is not an object")
+            except FileNotFoundError:
+                on_disk = {}
+            except ValueError as e:
+                # A hand edit gone wrong must not cost every key this process does not own
+                with self.condition:
+                    on_disk = copy.deepcopy(self.cache) if self.stat_key is not None else None
+                if on_disk is None:
+                    raise ValueError(f"{self.config_path} is not valid JSON ({e}) and nothing was loaded to "
+                                     f"rebuild it from; not overwriting it")
+                print(f"{self.config_path} is not valid JSON ({e}); rewriting it from the last good copy")
+
+            merged = dict(on_disk, **changes)
+            with self.condition:
+                version = max(on_disk.get('version', 0), self.version) + 1
+            merged['version'] = version
+
+            temp_path = os.path.join(directory, f".{os.path.basename(self.config_path)}.{os.getpid()}.tmp")
+            with open(temp_path, 'w') as f:
+                json.dump(merged, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.config_path)
+            if hasattr(os, 'O_DIRECTORY'):
+                # Make the rename itself durable
+                directory_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(directory_fd)
+                finally:
+                    os.close(directory_fd)
+            stat = os.stat(self.config_path)
+
+        with self.condition:
+            self.version = version
+            self.cache = dict(merged, **copy.deepcopy(self.pending))
+            self.stat_key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        return version
@@ -0,0 +1,146 @@
+# config_watcher.py
+
+import os
+from collections import defaultdict, deque
+from PyQt5.QtCore import QFileSystemWatcher, QTimer
+
+TIMER_KEYS = ('interval', 'pause_duration', 'tab_pause_duration')
+
+
+def match_urls(old_urls, new_urls):
+    """
+    Map each new URL position onto the old list.
+
+    Returns (plan, removed): plan[j] is ('keep', i) when new URL j is old URL i (possibly
+    moved), ('edit', i) when old tab i was changed in place to a new URL, or ('add', None).
+    `removed` lists the old indices that are no longer used.
+    """
+    positions = defaultdict(deque)
+    for i, url in enumerate(old_urls):
+        positions[url].append(i)
+
+    plan = [None] * len(new_urls)
+    used = set()
+    for j, url in enumerate(new_urls):
+        if positions[url]:
+            i = positions[url].popleft()
+            plan[j] = ('keep', i)
+            used.add(i)
+
+    # An unmatched URL in a slot whose old URL also disappeared is an in-place edit
+    for j in range(len(new_urls)):
+        if plan[j] is None and j < len(old_urls) and j not in used:
+            plan[j] = ('edit', j)
+            used.add(j)
+
+    for j in range(len(new_urls)):
+        if plan[j] is None:
+            plan[j] = ('add', None)
+
+    removed = [i for i in range(len(old_urls)) if i not in used]
+    return plan, removed
+
+
+class ConfigDiff:
+    """Structural difference between two urls.json snapshots."""
+
+    def __init__(self, old, new):
+        old_urls = old.get('urls', [])
+        new_urls = new.get('urls', [])
+        self.urls = new_urls
+        self.url_plan = None
+        self.removed = []
+        self.added = []
+        self.edited = []
+        self.moved = []
+        if old_urls != new_urls:
+            self.url_plan, self.removed = match_urls(old_urls, new_urls)
+            for j, (kind, i) in enumerate(self.url_plan):
+                if kind == 'add':
+                    self.added.append(j)
+                elif kind == 'edit':
+                    self.edited.append(j)
+                elif i != j:
+                    self.moved.append((i, j))
+
+        self.timers = {key: new[key] for key in TIMER_KEYS if key in new and new.get(key) != old.get(key)}
+
+        # Per-tab settings from the admin's playlist editor, e.g. dwell times
+        self.playlist = None
+        if (new.get('playlist') or {}) != (old.get('playlist') or {}):
+            self.playlist = new.get('playlist') or {}
+
+        # The admin bumps 'sequence' on every Refresh, so repeated commands are still seen
+        self.refresh_command = None
+        command = new.get('refresh_command') or {}
+        if command != (old.get('refresh_command') or {}) and (
+                command.get('refresh_tab') is not None or command.get('refresh_all')):
+            self.refresh_command = command
+
+    def is_empty(self):
+        return self.url_plan is None and not self.timers and self.playlist is None and self.refresh_command is None
+
+    def describe(self):
+        parts = []
+        if self.url_plan is not None:
+            parts.append(
+                f"{len(self.added)} added, {len(self.removed)} removed, "
+                f"{len(self.edited)} edited, {len(self.moved)} moved"
+            )
+        if self.timers:
+            parts.append(', '.join(f"{key}={value}" for key, value in self.timers.items()))
+        if self.playlist is not None:
+            parts.append('playlist settings')
+        if self.refresh_command is not None:
+            parts.append('refresh requested')
+        return '; '.join(parts) or 'no changes'
+
+
+class ConfigWatcher:
+    """
+    Watches the file behind a ConfigStore and calls `on_change(diff, config)` with what changed.
+
+    Editors and atomic writers replace the file rather than rewrite it, so the directory is
+    watched too and the file is re-added whenever it reappears. Bursts of change
+    notifications are coalesced with a short debounce, and the store only re-parses the
+    file when its mtime, size or inode moved.
+    """
+
+    def __init__(self, config_store, on_change, debounce_ms=200):
+        self.config_store = config_store
+        self.config_path = config_store.config_path
+        self.on_change = on_change
+
+        self.debounce_timer = QTimer()
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(self.reload)
+
+        self.watcher = QFileSystemWatcher()
+        self.watcher.addPath(os.path.dirname(self.config_path))
+        if os.path.exists(self.config_path):
+            self.watcher.addPath(self.config_path)
+        self.watcher.fileChanged.connect(self.schedule_reload)
+        self.watcher.directoryChanged.connect(self.schedule_reload)
+
+    def stop(self):
+        self.debounce_timer.stop()
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+
+    def schedule_reload(self, path=None):
+        self.debounce_timer.start()
+
+    def reload(self):
+        if os.path.exists(self.config_path) and self.config_path not in self.watcher.files():
+            self.watcher.addPath(self.config_path)
+
+        old_config = self.config_store.snapshot()
+        if not self.config_store.refresh():
+            return
+        config = self.config_store.snapshot()
+        diff = ConfigDiff(old_config, config)
+        if not diff.is_empty():
+            print(f"Configuration changed: {diff.describe()}")
+            self.on_change(diff, config)
@@ -0,0 +1,179 @@
+# cpu_governor.py
+
+import json
+import os
+import time
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+DEFAULT_INTERVAL = 2000  # ms between CPU samples
+DEFAULT_THAW_MS = 3000  # ms before a hidden tab is shown that it may run again
+DEFAULT_BUDGET_PERCENT = 25  # of one core, for all hidden tabs together
+DEFAULT_REPORT_INTERVAL = 60000  # ms
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def cpu_governor_settings(config):
+    """Return the 'cpu_governor' block of a urls.json mapping, or None when disabled."""
+    settings = config.get('cpu_governor', {})
+    if not settings.get('enabled', False):
+        return None
+    return settings
+
+
+def read_process_cpu(pid):
+    """Return the user + system CPU seconds a process has used, or None if it is gone or unreadable."""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            stat = f.read()
+        # The command name may contain spaces and parentheses; the fields after it do not
+        fields = stat[stat.rindex(')') + 2:].split()
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS  # utime, stime
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class CpuGovernor:
+    """
+    Keeps hidden tabs from competing with the shown one for CPU.
+
+    Every `interval` ms the CPU time of each live tab's renderer is read from /proc and split
+    between the tabs sharing it. Hidden pages are frozen (lifecycle state Frozen, which stops
+    their timers, polling and animations) unless they are due on screen within `thaw_ms`, as
+    told by `due_in(host)`, or were woken for background work with wake(). Frozen pages keep
+    their DOM and resume where they were when thawed.
+
+    Hidden tabs that still run are held to `budget_percent` of one core together: when a sample
+    is over it, the greediest of them are frozen until they are shown, even inside the thaw
+    window. Each tab's share of the CPU used by all tabs is printed and optionally logged every
+    `report_interval` ms, greediest first.
+    """
+
+    def __init__(self, view_pool, interval=DEFAULT_INTERVAL, thaw_ms=DEFAULT_THAW_MS,
+                 budget_percent=DEFAULT_BUDGET_PERCENT, report_interval=DEFAULT_REPORT_INTERVAL,
+                 due_in=None, log_path=None):
+        self.view_pool = view_pool
+        self.thaw_ms = thaw_ms
+        self.budget = budget_percent / 100  # cores
+        self.due_in = due_in or (lambda host: None)
+        self.log_path = log_path  # JSON lines, one per tab per report
+        self.last_cpu = {}  # pid -> (monotonic time, cpu seconds)
+        self.usage = {}  # host -> cores used in the last sample
+        self.totals = {}  # host -> cpu seconds attributed since start
+        self.over_budget = set()  # hosts frozen by the budget until they are shown
+        self.awake = set()  # hosts woken for background work until they are shown
+        self.budget_freezes = 0
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.sample)
+        self.timer.start(interval)
+        self.report_timer = QTimer()
+        self.report_timer.timeout.connect(self.report)
+        self.report_timer.start(report_interval)
+
+    def wake(self, host):
+        """Let a hidden tab run until it is shown, e.g. while a refresh patches its page."""
+        self.awake.add(host)
+        self.apply()
+
+    def thawed(self, host):
+        """True if a hidden tab should run now."""
+        if host in self.over_budget:
+            return False
+        if host in self.awake:
+            return True
+        due = self.due_in(host)
+        return due is not None and due <= self.thaw_ms
+
+    def apply(self):
+        """Bring every live page's lifecycle state in line with the policy; run after each show."""
+        for host in self.view_pool.lru:
+            if host.isVisible():
+                # Shown: it has had its turn, so budget and wake marks start over
+                self.over_budget.discard(host)
+                self.awake.discard(host)
+                continue
+            state = QWebEnginePage.Active if self.thawed(host) else QWebEnginePage.Frozen
+            self.view_pool.set_lifecycle_state(host, state)
+
+    def sample(self):
+        now = time.monotonic()
+        hosts_by_pid = {}
+        for host in self.view_pool.lru:
+            pid = host.view.page().renderProcessPid()
+            if pid > 0:
+                hosts_by_pid.setdefault(pid, []).append(host)
+
+        usage = {}
+        for pid, hosts in hosts_by_pid.items():
+            cpu = read_process_cpu(pid)
+            if cpu is None:
+                continue
+            last = self.last_cpu.get(pid)
+            self.last_cpu[pid] = (now, cpu)
+            if last is None or now <= last[0]:
+                continue  # The first sample of a renderer only sets its baseline
+            used = max(0.0, cpu - last[1])
+            for host in hosts:
+                # Renderers shared by several tabs are split evenly between them
+                usage[host] = used / (now - last[0]) / len(hosts)
+                self.totals[host] = self.totals.get(host, 0.0) + used / len(hosts)
+        for pid in [pid for pid in self.last_cpu if pid not in hosts_by_pid]:
+            del self.last_cpu[pid]
+        self.usage = usage
+
+        self.enforce_budget()
+        self.apply()
+
+    def enforce_budget(self):
+        running = [host for host in self.view_pool.lru
+                   if not host.isVisible() and host.view.page().lifecycleState() == QWebEnginePage.Active]
+        background = sum(self.usage.get(host, 0.0) for host in running)
+        for host in sorted(running, key=lambda host: self.usage.get(host, 0.0), reverse=True):
+            if background <= self.budget:
+                break
+            print(f"Freezing {host.url}: background tabs at {background:.0%} of a core "
+                  f"(budget {self.budget:.0%}), this one {self.usage.get(host, 0.0):.0%}")
+            self.over_budget.add(host)
+            self.awake.discard(host)
+            background -= self.usage.get(host, 0.0)
+            self.budget_freezes += 1
+
+    def shares(self):
+        """(host, cpu seconds, share of all tabs' CPU) for live and past tabs, greediest first."""
+        hosts = [host for host in self.totals if self.view_pool.index_of(host) is not None]
+        total = sum(self.totals[host] for host in hosts) or 1.0
+        return sorted(((host, self.totals[host], self.totals[host] / total) for host in hosts),
+                      key=lambda entry: entry[1], reverse=True)
+
+    def report(self):
+        shares = self.shares()
+        if not shares:
+            return
+        print("Renderer CPU: " + ', '.join(
+            f"tab {self.view_pool.index_of(host)} {share:.0%} ({seconds:.1f}s)" for host, seconds, share in shares
+        ))
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a') as f:
+                    for host, seconds, share in shares:
+                        f.write(json.dumps({
+                            'time': time.time(), 'tab': self.view_pool.index_of(host), 'url': host.url,
+                            'cpu_seconds': round(seconds, 2), 'share': round(share, 3),
+                            'cores_now': round(self.usage.get(host, 0.0), 3),
+                            'frozen': host.view is not None and
+                            host.view.page().lifecycleState() != QWebEnginePage.Active,
+                        }) + '\n')
+            except OSError as e:
+                print(f"Could not write CPU log {self.log_path}: {e}")
+
+    def forget(self, host):
+        self.usage.pop(host, None)
+        self.totals.pop(host, None)
+        self.over_budget.discard(host)
+        self.awake.discard(host)
+
+    def stop(self):
+        self.timer.stop()
+        self.report_timer.stop()
@@ -0,0 +1,228 @@
+# fake_jira.py
+
+"""
+Local stand-in for the parts of the Jira server the kiosk talks to.
+
+Serves /browse/<KEY> pages, /rest/api/2/issue/<KEY> and a /rest/api/2/search endpoint that
+understands the JQL the kiosk sends (`key in (...)`, `filter in (...)`, `filter = N`,
+`resolution = Unresolved`, `statusCategory = Done` and `updated >= -Nm`). Like Jira it pages
+search results through startAt/maxResults, answers system filter IDs in `filter` clauses
+with a 400, and sends no ETag for searches; issue responses carry one and honour
+If-None-Match. Pages reference versioned static bundles under /s/<version>/_/, as Jira's
+do. Connections are kept alive.
+
+Run it with `python fake_jira.py [port]` and point urls.json at http://127.0.0.1:<port>.
+"""
+
+import hashlib
+import json
+import re
+import sys
+import threading
+import urllib.parse
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+STATIC_VERSION = '8.20.0-1'
+MAX_RESULTS = 1000  # Jira's default cap on a search page
+
+
+def jira_timestamp(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}+0000"
+
+
+class FakeJira:
+    """In-memory issues and filters, plus counters of the requests that were served."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.issues = {}  # key -> fields dict (summary, status, assignee, updated)
+        self.filters = {}  # filter id -> list of issue keys
+        self.request_counts = {}
+
+    def add_issue(self, key, summary, status='To Do', assignee=None):
+        with self.lock:
+            self.issues[key] = {
+                'summary': summary,
+                'status': {'name': status},
+                'assignee': {'displayName': assignee} if assignee else None,
+                'updated': datetime.now(timezone.utc),
+            }
+
+    def update_issue(self, key, **fields):
+        """Change an issue's fields and bump its `updated` stamp, as an edit in Jira would."""
+        with self.lock:
+            issue = self.issues[key]
+            if 'summary' in fields:
+                issue['summary'] = fields['summary']
+            if 'status' in fields:
+                issue['status'] = {'name': fields['status']}
+            if 'assignee' in fields:
+                issue['assignee'] = {'displayName': fields['assignee']} if fields['assignee'] else None
+            issue['updated'] = datetime.now(timezone.utc)
+
+    def set_filter(self, filter_id, keys):
+        with self.lock:
+            self.filters[str(filter_id)] = list(keys)
+
+    def count(self, kind):
+        with self.lock:
+            self.request_counts[kind] = self.request_counts.get(kind, 0) + 1
+
+    def issue_json(self, key):
+        issue = self.issues[key]
+        fields = dict(issue)
+        fields['updated'] = jira_timestamp(issue['updated'])
+        return {'key': key, 'fields': fields}
+
+    def search(self, jql):
+        """Evaluate the small JQL subset the kiosk uses and return matching issue keys."""
+        with self.lock:
+            keys = set()
+            for group in re.findall(r'key\s+in\s*\(([^)]*)\)', jql, re.IGNORECASE):
+                keys.update(k.strip().upper() for k in group.split(',') if k.strip())
+            filter_ids = []
+            for group in re.findall(r'filter\s+in\s*\(([^)]*)\)', jql, re.IGNORECASE):
+                filter_ids.extend(f.strip() for f in group.split(',') if f.strip())
+            filter_ids.extend(re.findall(r'filter\s*=\s*(-?\d+)', jql, re.IGNORECASE))
+            for filter_id in filter_ids:
+                if filter_id.startswith('-'):
+                    raise ValueError(f"The value '{filter_id}' does not exist for the field 'filter'.")
+                keys.update(self.filters.get(filter_id, []))
+            # The clauses Jira's system filters expand to; an issue counts as resolved once Done
+            unresolved = re.search(r'resolution\s*=\s*Unresolved', jql, re.IGNORECASE)
+            done = re.search(r'statusCategory\s*=\s*Done', jql, re.IGNORECASE)
+            for key, issue in self.issues.items():
+                if (unresolved and issue['status']['name'] != 'Done') or (done and issue['status']['name'] == 'Done'):
+                    keys.add(key)
+
+            if not keys and not filter_ids and not unresolved and not done:
+                keys = set(self.issues)
+
+            since = None
+            match = re.search(r'updated\s*>=\s*-(\d+)m', jql, re.IGNORECASE)
+            if match:
+                since = datetime.now(timezone.utc) - timedelta(minutes=int(match.group(1)))
+
+            matched = []
+            for key in sorted(keys):
+                issue = self.issues.get(key)
+                if issue is None or (since and issue['updated'] < since):
+                    continue
+                matched.append(self.issue_json(key))
+            return matched
+
+
+class FakeJiraHandler(BaseHTTPRequestHandler):
+    jira = None  # set on the subclass built by serve()
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like a real Jira behind a web server
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, payload, etag=True):
+        body = json.dumps(payload).encode('utf-8')
+        if not etag:
+            self.send_body(200, body, 'application/json')
+            return
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_body(200, body, 'application/json', {'ETag': etag})
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(parts.query)
+        path = parts.path
+
+        if path == '/rest/api/2/search':
+            self.jira.count('search')
+            try:
+                issues = self.jira.search(query.get('jql', [''])[0])
+                start_at = int(query.get('startAt', ['0'])[0])
+                max_results = min(int(query.get('maxResults', ['50'])[0]), MAX_RESULTS)
+            except ValueError as e:
+                self.send_body(400, json.dumps({'errorMessages': [str(e)]}).encode('utf-8'), 'application/json')
+                return
+            self.send_json({'startAt': start_at, 'maxResults': max_results, 'total': len(issues),
+                            'issues': issues[start_at:start_at + max_results]}, etag=False)
+        elif path.startswith('/rest/api/2/issue/'):
+            self.jira.count('issue')
+            key = path.rsplit('/', 1)[-1].upper()
+            if key not in self.jira.issues:
+                self.send_body(404, b'{"errorMessages": ["Issue does not exist"]}', 'application/json')
+                return
+            with self.jira.lock:
+                payload = self.jira.issue_json(key)
+            self.send_json(payload)
+        elif path.startswith('/browse/'):
+            self.jira.count('browse')
+            key = path.rsplit('/', 1)[-1].upper()
+            if key not in self.jira.issues:
+                self.send_body(404, b'<html><body>Issue does not exist</body></html>', 'text/html')
+                return
+            with self.jira.lock:
+                issue = self.jira.issue_json(key)
+            fields = issue['fields']
+            assignee = (fields['assignee'] or {}).get('displayName', 'Unassigned')
+            body = (
+                f"<html><head><title>[{key}] {fields['summary']}</title>"
+                f"<link rel=\"stylesheet\" href=\"/s/{STATIC_VERSION}/_/batch.css\">"
+                f"<script src=\"/s/{STATIC_VERSION}/_/batch.js\"></script></head><body>"
+                f"<h1 id=\"summary-val\">{fields['summary']}</h1>"
+                f"<span id=\"key-val\">{key}</span>"
+                f"<span id=\"status-val\">{fields['status']['name']}</span>"
+                f"<span id=\"assignee-val\">{assignee}</span>"
+                f"</body></html>"
+            ).encode('utf-8')
+            self.send_body(200, body, 'text/html; charset=utf-8', {'Cache-Control': 'no-cache, no-store'})
+        elif path.startswith('/s/'):
+            self.jira.count('static')
+            name = path.rsplit('/', 1)[-1]
+            content_type = 'text/css' if name.endswith('.css') else 'application/javascript'
+            body = f"/* {path} */\n".encode('utf-8') + b' ' * 20000  # About the size of a small bundle
+            self.send_body(200, body, content_type, {'Cache-Control': 'max-age=31536000'})
+        else:
+            self.jira.count('other')
+            self.send_body(404, b'Not found', 'text/plain')
+
+
+def sample_jira():
+    jira = FakeJira()
+    for number in range(1, 6):
+        jira.add_issue(f"XCH-{number}", f"Sample issue {number}", assignee='Kiosk')
+    jira.set_filter(10000, ["XCH-1", "XCH-3", "XCH-5"])
+    return jira
+
+
+def serve(jira=None, host='127.0.0.1', port=0):
+    """Start a fake Jira on a background thread; returns (server, jira). Port 0 picks a free port."""
+    jira = jira or sample_jira()
+    handler = type('BoundFakeJiraHandler', (FakeJiraHandler,), {'jira': jira})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, name='fake-jira', daemon=True)
+    thread.start()
+    return server, jira
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    server, jira = serve(port=port)
+    print(f"Fake Jira listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
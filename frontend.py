@@ -4,13 +4,22 @@ import sys
 import os
 import json
 import subprocess
+# Imported first so the startup clock covers the Qt imports
+from startup_profiler import profiler
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QMenuBar, QMenu, QAction, QTabWidget,
-    QInputDialog, QMessageBox
+    QApplication, QMainWindow, QMenuBar, QMenu, QAction, QFileDialog,
+    QInputDialog, QMessageBox, QShortcut
 )
-from PyQt5.QtCore import QUrl, Qt
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile
-from PyQt5.QtGui import QShortcut, QKeySequence
+from PyQt5.QtCore import QUrl, Qt, QTimer
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+from playlist_editor import PlaylistEditor, PlaylistModel, parse_url_list
+from tab_reconciler import TabReconciler
+from config_watcher import ConfigWatcher
+from command_bus import CommandBusClient
+from config_store import ConfigStore, default_config_path
+from profile_factory import get_profile
+from refresh_scheduler import RefreshScheduler, RefreshPolicy
+from PyQt5.QtGui import QKeySequence
 
 
 class AdminPortal(QMainWindow):
@@ -24,15 +33,25 @@ class AdminPortal(QMainWindow):
         self.tab_pause_duration = 13000
         self.refresh_command = {'refresh_tab': None, 'refresh_all': False}
         self.shortcuts = {}
-        self.web_views = []
+        self.playlist = {}  # url -> per-entry settings such as dwell time
+        self.refresh_policies = {}  # url -> refresh policy, from the 'refresh' block
+        self.command_bus = CommandBusClient()  # Delivers commands straight to a running frontend
+        # Cached, atomically written urls.json shared with the frontend process
+        self.config_store = ConfigStore(config_path)
+        self.config_store.saved.connect(self.on_config_saved)
 
         self.load_config()
+        # Refreshes of the preview share the kiosk's refresh settings
+        self.refresh_scheduler = RefreshScheduler.from_settings(self.config_store.get('refresh'))
+        self.reconciling = False  # True while rows are updated from urls.json
         self.init_ui()
+        # urls.json edited elsewhere (by hand or another admin) only touches the rows that changed
+        self.reconciler = TabReconciler(self.editor)
+        self.config_watcher = ConfigWatcher(self.config_store, self.on_config_changed)
 
     def load_config(self):
         try:
-            with open(self.config_path, 'r') as f:
-                config = json.load(f)
+            config = self.config_store.load()
         except FileNotFoundError:
             QMessageBox.critical(self, "Error", f"Configuration file '{self.config_path}' not found.")
             return
@@ -48,6 +67,8 @@ class AdminPortal(QMainWindow):
             QMessageBox.critical(self, "Error", "Invalid 'urls' in configuration.")
             return
 
+        self.playlist = config.get('playlist', {})
+        self.refresh_policies = config.get('refresh', {}).get('policies', {})
         self.interval = config.get('interval', 5000)
         self.pause_duration = config.get('pause_duration', 10000)
         self.tab_pause_duration = config.get('tab_pause_duration', 13000)
@@ -55,23 +76,33 @@ class AdminPortal(QMainWindow):
         self.shortcuts = config.get('shortcuts', {})
 
     def save_config(self):
-        try:
-            with open(self.config_path, 'w') as f:
-                json.dump({
-                    'urls': self.urls,
-                    'no_tab_urls': self.no_tab_urls,  # Save No Tab URLs
-                    'interval': self.interval,
-                    'pause_duration': self.pause_duration,
-                    'tab_pause_duration': self.tab_pause_duration,
-                    'refresh_command': self.refresh_command,
-                    'shortcuts': self.shortcuts
-                }, f, indent=4)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error saving configuration: {e}")
+        self.urls = self.editor.model.urls()
+        self.playlist, policies = self.editor.model.metadata()
+        # Policies of URLs that left the playlist go with them; the default policy stays
+        self.refresh_policies = {url: policy for url, policy in self.refresh_policies.items() if url == 'default'}
+        self.refresh_policies.update(policies)
+        refresh = self.config_store.get('refresh', {})
+        refresh['policies'] = self.refresh_policies
+        # Only the keys the admin owns are written; settings other tools keep in urls.json survive
+        self.config_store.update({
+            'urls': self.urls,
+            'playlist': self.playlist,
+            'refresh': refresh,
+            'no_tab_urls': self.no_tab_urls,  # Save No Tab URLs
+            'interval': self.interval,
+            'pause_duration': self.pause_duration,
+            'tab_pause_duration': self.tab_pause_duration,
+            'refresh_command': self.refresh_command,
+            'shortcuts': self.shortcuts
+        })
+
+    def on_config_saved(self, version):
+        # Let a running frontend pick the change up now rather than on its file watcher
+        self.command_bus.send('config_changed')
 
     def init_ui(self):
+        # Built hidden; whoever opens the portal (ModeLauncher or __main__) shows it
         self.setWindowTitle("Admin Portal")
-        self.showFullScreen()
 
         # Create the menu bar
         menu_bar = self.menuBar()
@@ -111,6 +142,33 @@ class AdminPortal(QMainWindow):
         delete_tab_action.triggered.connect(self.delete_current_tab)
         tools_menu.addAction(delete_tab_action)
 
+        # Bulk import from a file (one URL per line, or a JSON list) or from the clipboard
+        import_urls_action = QAction("Import URLs", self)
+        import_urls_action.setShortcut("Ctrl+I")
+        import_urls_action.triggered.connect(self.import_urls)
+        tools_menu.addAction(import_urls_action)
+
+        paste_urls_action = QAction("Paste URLs", self)
+        paste_urls_action.setShortcut("Ctrl+Shift+V")
+        paste_urls_action.triggered.connect(self.paste_urls)
+        tools_menu.addAction(paste_urls_action)
+
+        # Per-entry settings
+        edit_dwell_action = QAction("Edit Dwell Time", self)
+        edit_dwell_action.setShortcut("Ctrl+Shift+D")
+        edit_dwell_action.triggered.connect(self.edit_dwell_time)
+        tools_menu.addAction(edit_dwell_action)
+
+        edit_policy_action = QAction("Edit Refresh Policy", self)
+        edit_policy_action.setShortcut("Ctrl+Shift+P")
+        edit_policy_action.triggered.connect(self.edit_refresh_policy)
+        tools_menu.addAction(edit_policy_action)
+
+        find_action = QAction("Find", self)
+        find_action.setShortcut("Ctrl+F")
+        find_action.triggered.connect(lambda: self.editor.filter_edit.setFocus())
+        tools_menu.addAction(find_action)
+
         # Add No Tab URL action
         add_no_tab_url_action = QAction("Add No Tab URL", self)
         add_no_tab_url_action.setShortcut("Ctrl+N")
@@ -162,97 +220,178 @@ class AdminPortal(QMainWindow):
         exit_and_open_frontend_action.triggered.connect(self.exit_and_open_frontend)
         options_menu.addAction(exit_and_open_frontend_action)
 
-        # Tab widget
-        self.tab_widget = QTabWidget()
-        self.tab_widget.currentChanged.connect(self.on_tab_changed)
+        # The playlist, with one preview that loads only the selected entry
+        self.editor = PlaylistEditor(self.create_shared_profile())
+        self.editor.model.load(self.urls, self.playlist, self.refresh_policies)
+        self.editor.model.dataChanged.connect(self.on_playlist_edited)
+        self.editor.reordered.connect(self.save_config)
+        preview_page = self.editor.preview.page()
+        # A crashed or killed renderer leaves a blank preview; load it again
+        preview_page.renderProcessTerminated.connect(self.on_render_process_terminated)
 
         # Set the central widget
-        self.setCentralWidget(self.tab_widget)
-
-        # Load tabs
-        self.load_tabs()
+        self.setCentralWidget(self.editor)
+        if self.urls:
+            profiler.track_view(self.editor.preview, self.urls[0])
+            self.editor.select_row(0)
 
         # Bind No Tab URLs to shortcuts
         self.bind_no_tab_urls()
 
     def create_shared_profile(self):
-        storage_path = os.path.join(os.path.expanduser('~'), '.my_browser_profile')
-        if not os.path.exists(storage_path):
-            os.makedirs(storage_path)
-        profile = QWebEngineProfile.defaultProfile()
-        profile.setCachePath(storage_path)
-        profile.setPersistentStoragePath(storage_path)
-        profile.setPersistentCookiesPolicy(QWebEngineProfile.ForcePersistentCookies)
-        return profile
-
-    def load_tabs(self):
-        self.tab_widget.clear()
-        self.web_views.clear()
-        for index, url in enumerate(self.urls):
-            web = QWebEngineView()
-            web.setFocusPolicy(Qt.StrongFocus)
-            page = QWebEnginePage(self.create_shared_profile(), web)
-            web.setPage(page)
-            web.setUrl(QUrl(url))
-            self.tab_widget.addTab(web, f"Tab {index + 1}")
-            self.web_views.append(web)
+        # Created once per process; the admin caches in memory and shares the frontend's login
+        return get_profile('admin', self.config_store.get('profile'))
+
+    def on_render_process_terminated(self, status, exit_code):
+        if status != QWebEnginePage.NormalTerminationStatus:
+            preview = self.editor.preview
+            print(f"Renderer for {preview.url().toString()} terminated (exit code {exit_code}); reloading")
+            QTimer.singleShot(1000, preview.reload)
+
+    def on_playlist_edited(self, top_left, bottom_right, roles):
+        # Preview load times are shown in the list but are not settings, and changes
+        # read from urls.json are already saved
+        if roles != [PlaylistModel.LoadRole] and not self.reconciling:
+            self.save_config()
+
+    def on_config_changed(self, diff, config):
+        if diff.url_plan is None and diff.playlist is None:
+            return
+        self.reconciling = True
+        try:
+            self.reconciler.reconcile(
+                config.get('urls', []), config.get('playlist'), config.get('refresh', {}).get('policies')
+            )
+        finally:
+            self.reconciling = False
+        self.urls = self.editor.model.urls()
+        self.playlist = config.get('playlist', {})
+        self.refresh_policies = config.get('refresh', {}).get('policies', {})
 
     def edit_current_url(self):
-        index = self.tab_widget.currentIndex()
-        if index < 0:
+        row = self.editor.current_row()
+        if row < 0:
             return
-        current_url = self.urls[index]
+        current_url = self.editor.model.items[row].url
         new_url, ok = QInputDialog.getText(self, "Edit URL", "Enter new URL:", text=current_url)
         if ok and new_url:
-            self.urls[index] = new_url
-            self.web_views[index].setUrl(QUrl(new_url))
-            self.tab_widget.setTabText(index, f"Tab {index + 1}")
-            self.save_config()
+            self.editor.model.setData(self.editor.model.index(row), new_url)
+            self.editor.preview_timer.start()
 
     def add_tab(self):
         new_url, ok = QInputDialog.getText(self, "Add New Tab", "Enter the URL for the new tab:")
         if ok and new_url:
-            self.urls.append(new_url)
-            web = QWebEngineView()
-            web.setFocusPolicy(Qt.StrongFocus)
-            page = QWebEnginePage(self.create_shared_profile(), web)
-            web.setPage(page)
-            web.setUrl(QUrl(new_url))
-            new_tab_index = len(self.urls) - 1
-            self.tab_widget.addTab(web, f"Tab {new_tab_index + 1}")
-            self.web_views.append(web)
+            self.editor.model.insert_urls([new_url])
+            new_tab_index = self.editor.model.rowCount() - 1
+            self.editor.select_row(new_tab_index)
             shortcut_key = f"Ctrl+{new_tab_index + 1}"
             self.shortcuts[str(new_tab_index)] = shortcut_key
             self.save_config()
 
     def delete_current_tab(self):
-        index = self.tab_widget.currentIndex()
-        if index < 0:
+        rows = self.editor.selected_rows()
+        if not rows:
             return
+        what = f"Tab {rows[0] + 1}" if len(rows) == 1 else f"these {len(rows)} tabs"
         confirm = QMessageBox.question(
             self, "Delete Tab",
-            f"Are you sure you want to delete Tab {index + 1}?",
+            f"Are you sure you want to delete {what}?",
             QMessageBox.Yes | QMessageBox.No
         )
         if confirm == QMessageBox.Yes:
-            del self.urls[index]
+            self.editor.model.remove_rows(rows)
             self.save_config()
-            self.load_tabs()
+
+    def import_urls(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import URLs", "", "URL lists (*.txt *.json);;All files (*)"
+        )
+        if not path:
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                urls = parse_url_list(f.read())
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"Could not import URLs from '{path}': {e}")
+            return
+        self.append_urls(urls)
+
+    def paste_urls(self):
+        text, ok = QInputDialog.getMultiLineText(self, "Paste URLs", "One URL per line:")
+        if not ok or not text.strip():
+            return
+        try:
+            urls = parse_url_list(text)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Could not read the pasted URLs: {e}")
+            return
+        self.append_urls(urls)
+
+    def append_urls(self, urls):
+        if not urls:
+            return
+        first = self.editor.model.rowCount()
+        self.editor.model.insert_urls(urls)
+        self.editor.select_row(first)
+        self.save_config()
+
+    def edit_dwell_time(self):
+        row = self.editor.current_row()
+        if row < 0:
+            return
+        index = self.editor.model.index(row)
+        dwell, ok = QInputDialog.getInt(
+            self, "Edit Dwell Time",
+            "Milliseconds on screen (0 uses the rotation interval):",
+            value=index.data(PlaylistModel.DwellRole) or 0, min=0
+        )
+        if ok:
+            self.editor.model.setData(index, dwell, PlaylistModel.DwellRole)
+
+    def edit_refresh_policy(self):
+        row = self.editor.current_row()
+        if row < 0:
+            return
+        index = self.editor.model.index(row)
+        text, ok = QInputDialog.getText(
+            self, "Edit Refresh Policy",
+            'Policy, e.g. {"every": 300, "windows": ["mon-fri 08:00-18:00"]} ({} for the default):',
+            text=json.dumps(index.data(PlaylistModel.PolicyRole) or {})
+        )
+        if not ok:
+            return
+        try:
+            policy = json.loads(text or '{}')
+            if not isinstance(policy, dict):
+                raise ValueError("the policy must be a JSON object")
+            RefreshPolicy.from_dict(policy)
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", f"Invalid refresh policy: {e}")
+            return
+        self.editor.model.setData(index, policy, PlaylistModel.PolicyRole)
 
     def refresh_current_tab(self):
-        index = self.tab_widget.currentIndex()
+        index = self.editor.current_row()
         if index < 0:
             return
-        self.web_views[index].reload()
+        self.refresh_scheduler.refresh_now(self.editor.preview)
+        if self.command_bus.send('refresh_tab', index=index):
+            return
+        # No frontend on the command bus; leave the request in urls.json for it to pick up
         self.refresh_command['refresh_tab'] = index
         self.refresh_command['refresh_all'] = False
+        # Bumped on every request so the frontend also sees repeated refreshes
+        self.refresh_command['sequence'] = self.refresh_command.get('sequence', 0) + 1
         self.save_config()
 
     def refresh_all_tabs(self):
-        for web_view in self.web_views:
-            web_view.reload()
+        # Only the selected entry is loaded here; the frontend refreshes the rest
+        self.refresh_scheduler.refresh_now(self.editor.preview)
+        if self.command_bus.send('refresh_all'):
+            return
         self.refresh_command['refresh_tab'] = None
         self.refresh_command['refresh_all'] = True
+        self.refresh_command['sequence'] = self.refresh_command.get('sequence', 0) + 1
         self.save_config()
 
     def add_no_tab_url(self):
@@ -272,12 +411,8 @@ class AdminPortal(QMainWindow):
             q_shortcut.activated.connect(lambda u=url: self.open_no_tab_url(u))
 
     def open_no_tab_url(self, url):
-        """Open the No Tab URL in the current tab."""
-        current_index = self.tab_widget.currentIndex()
-        if current_index >= 0:
-            current_view = self.tab_widget.widget(current_index)
-            if isinstance(current_view, QWebEngineView):
-                current_view.setUrl(QUrl(url))
+        """Open the No Tab URL in the preview."""
+        self.editor.preview.setUrl(QUrl(url))
 
     def edit_pause_duration(self):
         current_pause_duration = self.pause_duration
@@ -301,14 +436,12 @@ class AdminPortal(QMainWindow):
             self.tab_pause_duration = new_tab_pause_duration
             self.save_config()
 
-    def on_tab_changed(self, index):
-        pass
-
     def closeEvent(self, event):
-        # Properly delete web views
-        for web_view in self.web_views:
-            web_view.page().deleteLater()
-            web_view.deleteLater()
+        # Properly delete the preview; later changes to urls.json have no playlist to go to
+        self.config_watcher.stop()
+        self.editor.dispose()
+        # Don't lose edits that are still waiting for the debounced write
+        self.config_store.flush()
         event.accept()
 
     def exit_and_open_frontend(self):
@@ -324,8 +457,10 @@ class AdminPortal(QMainWindow):
 
 
 if __name__ == "__main__":
+    profiler.mark('imports')
     app = QApplication(sys.argv)
-    config_path = os.path.join(os.path.dirname(__file__), 'urls.json')
+    profiler.mark('app_init')
+    config_path = default_config_path(__file__)
     admin_portal = AdminPortal(config_path)
-    admin_portal.show()
+    admin_portal.showFullScreen()
     sys.exit(app.exec_())
@@ -1,16 +1,105 @@
 import sys
 import os
+# Imported first so the startup clock covers the Qt imports
+from startup_profiler import profiler
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QStackedWidget, QToolBar, QAction, QLabel, QShortcut, QTabWidget, QHBoxLayout
+    QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QStackedWidget, QToolBar, QAction, QLabel, QShortcut, QTabWidget
 )
 from PyQt5.QtGui import QKeySequence
 from PyQt5.QtCore import QUrl, QTimer, Qt, QPropertyAnimation, QRect
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
 from functools import partial
+from view_pool import ViewPool, view_pool_settings
+from config_store import ConfigStore, default_config_path
+from profile_factory import get_profile
+from mode_launcher import ModeLauncher
+from ui_state import UiStateStore
+from web_telemetry import OverlayAnchor
+from refresh_scheduler import RefreshScheduler, refresh_settings
+
+class AutoTabSwitcher:
+    """Rotates the tab widget's tabs and refreshes the next tab shortly before it is shown."""
+
+    def __init__(self, tab_widget, interval, pause_label, default_urls, view_pool, pause_duration=10000):
+        self.tab_widget = tab_widget
+        self.view_pool = view_pool
+        self.interval = interval
+        self.pause_duration = pause_duration  # How long a custom link pauses rotation
+        self.pause_label = pause_label
+        self.is_paused = False
+        self.default_urls = default_urls
+        self.current_urls = list(default_urls)  # Track current URLs for each tab
+
+        # Timer for switching tabs
+        self.switch_timer = QTimer()
+        self.switch_timer.timeout.connect(self.switch_tab)
+
+        # Timer for refreshing the next tab ahead of the switch
+        self.refresh_timer = QTimer()
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self.refresh_next_tab)
+
+        if interval > 0:
+            self.start_timers()
+        else:
+            self.is_paused = True
+            self.pause_label.show()
+
+    def start_timers(self):
+        self.is_paused = False
+        self.pause_label.hide()
+        self.schedule_refresh()
+        self.switch_timer.start(self.interval)
+
+    def stop_timers(self):
+        self.is_paused = True
+        self.pause_label.show()
+        self.switch_timer.stop()
+        self.refresh_timer.stop()
+
+    def toggle(self):
+        if self.is_paused:
+            self.start_timers()
+        else:
+            self.stop_timers()
+
+    def next_index(self):
+        return (self.tab_widget.currentIndex() + 1) % self.tab_widget.count()
+
+    def schedule_refresh(self):
+        # Refresh 3 seconds before switching
+        self.refresh_timer.start(max(0, self.interval - 3000))
+
+    def refresh_next_tab(self):
+        # Released tabs load fresh when they are shown, so only live views need a refresh
+        view = self.view_pool.view_for(self.next_index())
+        if view is not None:
+            self.tab_widget.refresh_scheduler.refresh_now(view, reason='show')
+
+    def switch_tab(self):
+        self.tab_widget.setCurrentIndex(self.next_index())
+        self.schedule_refresh()
+
+    def open_custom_link(self, index, url):
+        """Opens a custom link in the tab and pauses the switcher for the pause duration."""
+        if 0 <= index < self.tab_widget.count():
+            self.view_pool.navigate(index, url)
+            self.current_urls[index] = url  # Track the new current URL for the tab
+            self.stop_timers()
+            # Afterwards, revert to the default URL and resume auto-switching
+            QTimer.singleShot(self.pause_duration, lambda: self.revert_to_default(index))
+
+    def revert_to_default(self, index):
+        """Reverts the tab back to its default URL and resumes auto-switching."""
+        if 0 <= index < self.tab_widget.count():
+            self.view_pool.navigate(index, self.default_urls[index])
+            self.current_urls[index] = self.default_urls[index]
+        self.start_timers()
+
 
 # Initial page with App and Admin console buttons
 class InitialPage(QWidget):
-    def __init__(self, app_start_function, admin_console_function):
+    def __init__(self, app_start_function, admin_console_function, preload_function=None):
         super().__init__()
         self.app_start_function = app_start_function
         self.admin_console_function = admin_console_function
@@ -43,6 +132,10 @@ class InitialPage(QWidget):
         self.timer.setSingleShot(True)
         self.timer.start(10000)  # 10 seconds
 
+        # Build the default choice off-screen during the countdown, once this page has painted
+        if preload_function is not None:
+            QTimer.singleShot(0, preload_function)
+
         # Add keyboard shortcuts for App and Admin console
         self.app_button.setShortcut("A")  # Shortcut: Press 'A' to start App
         self.admin_button.setShortcut("D")  # Shortcut: Press 'D' to start Admin Console
@@ -73,6 +166,13 @@ def start_admin_console():
 
 def load_main_application():
     # This function will initialize the main application (your original code with the browser and auto tab switcher)
+    window = build_main_application()
+    window.showFullScreen()
+    QApplication.instance().exec_()
+
+
+def build_main_application():
+    """Build the browser window hidden, so its tabs can load while the chooser is still up."""
     base_ip = '10.0.0.186:8080'
     urls = [
         f'http://{base_ip}/browse/XCH-1?filter=-5',
@@ -80,34 +180,42 @@ def load_main_application():
         'https://www.github.com'
     ]
     interval = 5000  # 5 seconds interval
-    open_fullscreen_browser_with_features(urls, interval)
+    config_path = default_config_path(__file__)
+    try:
+        config = ConfigStore(config_path).load()
+    except (OSError, ValueError):
+        config = {}
+    pool_size, lookahead = view_pool_settings(config)
+    return create_browser_window(urls, interval, pool_size, lookahead, config.get('profile'), refresh_settings(config))
 
 
-def open_fullscreen_browser_with_features(urls, interval=0):
+def open_fullscreen_browser_with_features(urls, interval=0, pool_size=3, lookahead=1, profile_settings=None):
     app = QApplication.instance() or QApplication(sys.argv)
+    main_widget = create_browser_window(urls, interval, pool_size, lookahead, profile_settings)
+    main_widget.showFullScreen()
+    app.exec_()  # Ensure the event loop runs properly
 
-    profile = QWebEngineProfile('PersistentProfile', app)
-    profile.setPersistentCookiesPolicy(QWebEngineProfile.ForcePersistentCookies)
-    storage_path = os.path.join(os.getcwd(), 'browser_data')
-    profile.setCachePath(storage_path)
-    profile.setPersistentStoragePath(storage_path)
+
+def create_browser_window(urls, interval=0, pool_size=3, lookahead=1, profile_settings=None, refresh=None):
+    profile = get_profile('frontend', profile_settings)
 
     main_widget = QWidget()
     main_layout = QVBoxLayout()
     main_layout.setContentsMargins(0, 0, 0, 0)
     main_widget.setLayout(main_layout)
 
-    # Create a QTabWidget to display the tab bar
+    # Create a QTabWidget to display the tab bar; tabs hold lightweight hosts
+    # and the pool only keeps live views for the shown tab and the next ones
     tab_widget = QTabWidget()
-    web_views = []
-    for index, url in enumerate(urls):
-        web = QWebEngineView()
-        web.setFocusPolicy(Qt.StrongFocus)
-        page = QWebEnginePage(profile, web)
-        web.setPage(page)
-        web.setUrl(QUrl(url))
-        tab_widget.addTab(web, f"Tab {index + 1}")
-        web_views.append(web)
+    view_pool = ViewPool(profile, urls, pool_size=pool_size, lookahead=lookahead)
+    view_pool.ui_state = UiStateStore(profile)
+    for index, host in enumerate(view_pool.hosts):
+        tab_widget.addTab(host, f"Tab {index + 1}")
+    tab_widget.view_pool = view_pool
+    # Refresh and Refresh All go through a scheduler that caps concurrent loads
+    tab_widget.refresh_scheduler = RefreshScheduler.from_settings(refresh)
+    view_pool.show(0)
+    tab_widget.currentChanged.connect(view_pool.show)
 
     toolbar = QToolBar()
     refresh_action = QAction("Refresh", main_widget)
@@ -123,25 +231,19 @@ def open_fullscreen_browser_with_features(urls, interval=0):
     main_layout.addWidget(toolbar)
     main_layout.addWidget(tab_widget)
 
-    pause_label = QLabel("Paused")
+    # Floats over the tabs instead of sitting in the layout, so it never resizes them
+    pause_label = QLabel("Paused", main_widget)
     pause_label.setAlignment(Qt.AlignLeft | Qt.AlignBottom)
     pause_label.setStyleSheet("font-size: 18px; color: white; background-color: rgba(0, 0, 0, 0.5);")
     pause_label.setMargin(10)
+    OverlayAnchor(pause_label, Qt.BottomLeftCorner)
     pause_label.hide()
 
-    overlay_layout = QHBoxLayout()
-    overlay_layout.addWidget(pause_label)
-    overlay_layout.addStretch()
-    main_layout.addLayout(overlay_layout)
-
-    main_widget.showFullScreen()
-
-    auto_switcher = AutoTabSwitcher(tab_widget, interval, pause_label, urls)
+    auto_switcher = AutoTabSwitcher(tab_widget, interval, pause_label, urls, view_pool)
     tab_widget.auto_switcher = auto_switcher
 
     setup_keyboard_shortcuts(tab_widget, auto_switcher, len(urls))
-
-    app.exec_()  # Ensure the event loop runs properly
+    return main_widget
 
 
 def setup_keyboard_shortcuts(tab_widget, auto_switcher, num_tabs):
@@ -177,44 +279,36 @@ def switch_to_tab(tab_widget, index):
 
 
 def refresh_tab(tab_widget):
-    current_widget = tab_widget.currentWidget()
-    if isinstance(current_widget, QWebEngineView):
-        auto_switcher = getattr(tab_widget, 'auto_switcher', None)
-        if auto_switcher:
-            auto_switcher.save_ui_state(current_widget)
-            current_widget.reload()
-            current_widget.loadFinished.connect(lambda: auto_switcher.restore_ui_state(current_widget))
-        else:
-            current_widget.reload()
+    # Pages restore their own scroll and panel state from the view pool's UI state store
+    current_widget = tab_widget.view_pool.view_for(tab_widget.currentIndex())
+    if current_widget is not None:
+        tab_widget.refresh_scheduler.refresh_now(current_widget)
 
 
 def refresh_all_tabs(tab_widget):
-    auto_switcher = getattr(tab_widget, 'auto_switcher', None)
-    for i in range(tab_widget.count()):
-        widget = tab_widget.widget(i)
-        if isinstance(widget, QWebEngineView):
-            if auto_switcher:
-                auto_switcher.save_ui_state(widget)
-                widget.reload()
-                widget.loadFinished.connect(lambda w=widget: auto_switcher.restore_ui_state(w))
-            else:
-                widget.reload()
+    tab_widget.refresh_scheduler.refresh_all(tab_widget.view_pool.live_views() + tab_widget.view_pool.native_views())
 
 
 def main():
+    profiler.mark('imports')
     app = QApplication(sys.argv)
+    profiler.mark('app_init')
 
     # Create a stacked widget to switch between screens
     stacked_widget = QStackedWidget()
 
+    # The app is built in this process while the countdown runs and shown when it ends
+    launcher = ModeLauncher({'app': build_main_application}, 'app', chooser=stacked_widget, fullscreen=('app',))
+
     # Create the initial page with buttons
-    initial_page = InitialPage(start_app, start_admin_console)
+    initial_page = InitialPage(lambda: launcher.switch('app'), start_admin_console, launcher.preload)
 
     # Add the initial page to the stacked widget
     stacked_widget.addWidget(initial_page)
 
     # Show the initial page
     stacked_widget.showFullScreen()
+    profiler.mark('chooser_shown')
 
     sys.exit(app.exec_())
 
@@ -0,0 +1,391 @@
+# jira_board.py
+
+import base64
+import http.client
+import json
+import math
+import threading
+import time
+import urllib.parse
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5 import sip
+from PyQt5.QtWidgets import QAbstractItemView, QHeaderView, QLabel, QTableView, QVBoxLayout, QWidget
+from PyQt5.QtGui import QColor
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QObject, QTimer, QUrl, Qt, pyqtSignal
+from jira_changes import filter_jql, parse_jira_url, searchable_target
+
+# Tabs whose urls.json entry starts with this prefix are drawn natively from REST data,
+# e.g. "native:http://jira:8080/browse/XCH-1?filter=-5"
+NATIVE_PREFIX = 'native:'
+
+DEFAULT_POLL_INTERVAL = 30000  # ms
+DEFAULT_FONT_SIZE = 28  # px
+DEFAULT_WORKERS = 4
+PAGE_SIZE = 100  # issues per search request; Jira caps maxResults anyway
+MAX_ISSUES = 5000  # a board stops paging here rather than tie up a worker
+FULL_SYNC_EVERY = 10  # incremental polls between full syncs, which also drop issues that left a filter
+FIELDS = ('summary', 'status', 'assignee', 'priority', 'updated')
+COLUMNS = (('key', 'Key'), ('summary', 'Summary'), ('status', 'Status'), ('assignee', 'Assignee'), ('updated', 'Updated'))
+STATUS_COLORS = {'done': '#5fd068', 'closed': '#5fd068', 'resolved': '#5fd068', 'in progress': '#4aa3ff'}
+
+
+def is_native_url(url):
+    return url.startswith(NATIVE_PREFIX)
+
+
+def native_target(url):
+    """The JiraTarget a native tab shows, or None if the URL is not a Jira issue/filter URL."""
+    return searchable_target(parse_jira_url(url[len(NATIVE_PREFIX):])) if is_native_url(url) else None
+
+
+def native_tab_settings(config):
+    """Return the 'native_tabs' block of a urls.json mapping ({} when absent)."""
+    return config.get('native_tabs', {})
+
+
+class JiraRestClient(QObject):
+    """
+    Runs Jira REST requests on a small worker pool and calls back on the GUI thread.
+
+    Keep-alive connections are pooled per origin and shared by every native tab, so polling
+    many boards costs neither a thread nor a TCP handshake per request. Searches page through
+    startAt/total on the worker and call back once with every page.
+    """
+
+    finished = pyqtSignal(object, object, object)  # callback, result dict or None, error or None
+
+    def __init__(self, username=None, token=None, workers=DEFAULT_WORKERS, timeout=10):
+        super().__init__()
+        self.timeout = timeout
+        self.auth_header = None
+        if username and token:
+            credentials = base64.b64encode(f"{username}:{token}".encode()).decode()
+            self.auth_header = f"Basic {credentials}"
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='jira-rest')
+        self.lock = threading.Lock()
+        self.idle = {}  # (scheme, netloc) -> [HTTPConnection]
+        self.requests = 0
+        self.stopped = False
+        self.finished.connect(self.deliver)
+
+    def search(self, base_url, jql, callback):
+        """Calls back with ({'issues': [...], 'complete': bool}, None) or (None, error)."""
+        if self.stopped:
+            return  # Shutting down; a late timer tick must not reach the closed executor
+        self.executor.submit(self.run_search, base_url, jql, callback)
+
+    def deliver(self, callback, result, error):
+        callback(result, error)
+
+    def run_search(self, base_url, jql, callback):
+        issues = []
+        try:
+            while True:
+                query = urllib.parse.urlencode({
+                    'jql': jql, 'fields': ','.join(FIELDS), 'startAt': len(issues), 'maxResults': PAGE_SIZE,
+                })
+                payload = self.fetch(f"{base_url}/rest/api/2/search?{query}")
+                page = payload.get('issues') or []
+                issues.extend(page)
+                total = payload.get('total', 0)
+                if not page or len(issues) >= total or len(issues) >= MAX_ISSUES:
+                    break
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            self.finished.emit(callback, None, e)
+            return
+        self.finished.emit(callback, {'issues': issues, 'complete': len(issues) >= total}, None)
+
+    def fetch(self, url):
+        parts = urllib.parse.urlsplit(url)
+        origin = (parts.scheme, parts.netloc)
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        headers = {'Accept': 'application/json'}
+        if self.auth_header:
+            headers['Authorization'] = self.auth_header
+
+        for attempt in range(2):
+            connection, reused = self.acquire(origin)
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                if reused and attempt == 0:
+                    continue  # The server closed an idle connection; retry on a fresh one
+                raise
+            break
+        self.release(origin, connection, not response.will_close)
+
+        with self.lock:
+            self.requests += 1
+        if response.status != 200:
+            raise ValueError(f"HTTP {response.status} from {url}")
+        return json.loads(body.decode('utf-8'))
+
+    def acquire(self, origin):
+        with self.lock:
+            connections = self.idle.get(origin)
+            if connections:
+                return connections.pop(), True
+        scheme, netloc = origin
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(netloc, timeout=self.timeout), False
+
+    def release(self, origin, connection, reusable):
+        if not reusable:
+            connection.close()
+            return
+        with self.lock:
+            self.idle.setdefault(origin, []).append(connection)
+
+    def stop(self):
+        self.stopped = True
+        self.executor.shutdown(wait=False)
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle.clear()
+
+
+def issue_row(issue):
+    fields = issue.get('fields', {})
+    return {
+        'key': issue.get('key'),
+        'summary': fields.get('summary') or '',
+        'status': (fields.get('status') or {}).get('name', ''),
+        'assignee': (fields.get('assignee') or {}).get('displayName', 'Unassigned'),
+        'updated': (fields.get('updated') or '')[:16].replace('T', ' '),
+    }
+
+
+class IssueTableModel(QAbstractTableModel):
+    """Issues of one board; apply() updates, inserts and removes single rows."""
+
+    def __init__(self, highlight_key=None, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.row_of = {}  # issue key -> row
+        self.highlight_key = highlight_key
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][1]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        field = COLUMNS[index.column()][0]
+        if role == Qt.DisplayRole:
+            return row[field]
+        if role == Qt.ForegroundRole and field == 'status':
+            return QColor(STATUS_COLORS.get(row['status'].lower(), '#d0d0d0'))
+        if role == Qt.BackgroundRole and row['key'] == self.highlight_key:
+            return QColor('#33405a')
+        return None
+
+    def apply(self, issues, full=False):
+        """Merge search results; a full result also removes issues it no longer contains. Returns rows changed."""
+        changed = 0
+        seen = set()
+        for issue in issues:
+            row = issue_row(issue)
+            seen.add(row['key'])
+            position = self.row_of.get(row['key'])
+            if position is None:
+                position = len(self.rows)
+                self.beginInsertRows(QModelIndex(), position, position)
+                self.rows.append(row)
+                self.row_of[row['key']] = position
+                self.endInsertRows()
+                changed += 1
+            elif self.rows[position] != row:
+                self.rows[position] = row
+                self.dataChanged.emit(self.index(position, 0), self.index(position, len(COLUMNS) - 1))
+                changed += 1
+        if full:
+            for position in reversed(range(len(self.rows))):
+                if self.rows[position]['key'] not in seen:
+                    self.beginRemoveRows(QModelIndex(), position, position)
+                    del self.rows[position]
+                    self.endRemoveRows()
+                    changed += 1
+            self.row_of = {row['key']: position for position, row in enumerate(self.rows)}
+        return changed
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.row_of = {}
+        self.endResetModel()
+
+
+class JiraBoardView(QWidget):
+    """
+    A native tab: the issue or filter behind a Jira URL as a large-font table.
+
+    Polls only ask for issues updated within a fixed `updated >= -Nm` window, which is usually
+    none; every FULL_SYNC_EVERY polls, or when a poll was missed for longer than the window,
+    the full result is fetched so issues that left a filter go. System filters are searched
+    with their JQL, since Jira rejects `filter = -5`. Quacks like a QWebEngineView where the
+    rotation needs it (url, setUrl, reload).
+    """
+
+    def __init__(self, url, client, poll_interval=DEFAULT_POLL_INTERVAL, font_size=DEFAULT_FONT_SIZE, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.lookback_minutes = max(2, math.ceil(poll_interval * 3 / 60000))
+        self.generation = 0  # Bumped on navigation so late answers for the old URL are dropped
+        self.pending = False
+        self.polls_since_full = 0
+        self.last_sync = None  # monotonic time the last successful query was sent
+        self.error = None
+
+        self.setStyleSheet(f"""
+            QWidget {{ background-color: #161a20; color: #f0f0f0; }}
+            QLabel {{ font-size: {int(font_size * 1.3)}px; font-weight: bold; padding: 16px; }}
+            QTableView {{ font-size: {font_size}px; gridline-color: #2a303a; border: none; }}
+            QTableView::item {{ padding: 4px 12px; }}
+            QHeaderView::section {{ background-color: #222833; color: #a0a8b8; font-size: {int(font_size * 0.8)}px;
+                                   padding: 8px; border: none; }}
+        """)
+        self.title = QLabel()
+        self.model = IssueTableModel(parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.table.setFocusPolicy(Qt.NoFocus)
+        self.table.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.table.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.Stretch)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addWidget(self.title)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self.refresh)
+        self.poll_timer.start(poll_interval)
+        self.setUrl(QUrl(url))
+
+    def url(self):
+        return QUrl(self._url)
+
+    def setUrl(self, url):
+        self._url = url.toString() if isinstance(url, QUrl) else url
+        self.target = native_target(self._url)
+        self.generation += 1
+        self.pending = False
+        self.model.highlight_key = self.target.issue_key if self.target and self.target.filter_id else None
+        self.model.clear()
+        self.reload()
+
+    def jql(self, full):
+        if self.target.filter_id is not None:
+            clause = filter_jql(self.target.filter_id)
+        else:
+            clause = f"key in ({self.target.issue_key})"
+        clauses = [f"({clause})"] if clause else []  # '' is "All issues"
+        if not full:
+            clauses.append(f"updated >= -{self.lookback_minutes}m")
+        # A stable order, so paging neither skips nor repeats issues
+        return ' '.join([' AND '.join(clauses), 'ORDER BY key ASC']).strip()
+
+    def reload(self):
+        """Fetch the full result now."""
+        self.query(full=True)
+
+    def refresh(self):
+        """Fetch what changed since the last sync, falling back to a full sync when due."""
+        stale = self.last_sync is None or time.monotonic() - self.last_sync > self.lookback_minutes * 60 - 30
+        self.query(full=stale or self.polls_since_full >= FULL_SYNC_EVERY)
+
+    def query(self, full):
+        if self.target is None:
+            self.update_title(f"Not a Jira issue or filter URL: {self._url[len(NATIVE_PREFIX):]}")
+            return
+        if self.pending:
+            return
+        self.pending = True
+        started = time.monotonic()
+        self.client.search(
+            self.target.base_url, self.jql(full),
+            lambda result, error, generation=self.generation: self.on_result(generation, full, started, result, error),
+        )
+
+    def on_result(self, generation, full, started, result, error):
+        if generation != self.generation:
+            return
+        self.pending = False
+        if error is not None:
+            self.error = str(error)
+            self.update_title()
+            return
+        self.error = None
+        self.last_sync = started
+        if full:
+            self.polls_since_full = 0
+        else:
+            self.polls_since_full += 1
+        # Rows past MAX_ISSUES were not fetched, so they must not be taken as gone
+        self.model.apply(result['issues'], full=full and result['complete'])
+        self.update_title()
+
+    def update_title(self, text=None):
+        if text is None:
+            target = self.target
+            name = f"Filter {target.filter_id}" if target.filter_id is not None else target.issue_key
+            text = f"{name}  ·  {len(self.model.rows)} issues  ·  {time.strftime('%H:%M')}"
+            if self.error:
+                text += f"  ·  offline ({self.error})"
+        if text != self.title.text():
+            self.title.setText(text)
+
+
+class JiraBoards:
+    """Creates native tabs; they share one REST client."""
+
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL, font_size=DEFAULT_FONT_SIZE, username=None, token=None,
+                 workers=DEFAULT_WORKERS):
+        self.poll_interval = poll_interval
+        self.font_size = font_size
+        self.client = JiraRestClient(username, token, workers)
+        self.views = weakref.WeakSet()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            poll_interval=settings.get('poll_interval', DEFAULT_POLL_INTERVAL),
+            font_size=settings.get('font_size', DEFAULT_FONT_SIZE),
+            username=settings.get('username'),
+            token=settings.get('token'),
+            workers=settings.get('workers', DEFAULT_WORKERS),
+        )
+
+    def create_view(self, url):
+        view = JiraBoardView(url, self.client, self.poll_interval, self.font_size)
+        self.views.add(view)
+        return view
+
+    def stop(self):
+        for view in list(self.views):
+            if not sip.isdeleted(view):
+                view.poll_timer.stop()
+        self.client.stop()
@@ -0,0 +1,303 @@
+# jira_changes.py
+
+import base64
+import json
+import math
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import namedtuple
+
+# A configured tab URL that points at Jira content we can poll for changes
+JiraTarget = namedtuple('JiraTarget', ['base_url', 'issue_key', 'filter_id'])
+
+DEFAULT_POLL_INTERVAL = 30000  # ms
+
+# Jira's built-in filters have negative IDs that `filter = ` rejects; this is the JQL they run
+SYSTEM_FILTERS = {
+    '-1': 'assignee = currentUser() AND resolution = Unresolved',  # My open issues
+    '-2': 'reporter = currentUser()',  # Reported by me
+    '-3': 'issuekey in issueHistory()',  # Viewed recently
+    '-4': '',  # All issues
+    '-5': 'resolution = Unresolved',  # Open issues
+    '-6': 'created >= -1w',  # Created recently
+    '-7': 'resolutiondate >= -1w',  # Resolved recently
+    '-8': 'updated >= -1w',  # Updated recently
+    '-9': 'statusCategory = Done',  # Done issues
+}
+
+
+def parse_jira_url(url):
+    """Return a JiraTarget for issue/filter URLs such as /browse/XCH-1?filter=-5, or None."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https'):
+        return None
+    query = urllib.parse.parse_qs(parts.query)
+    path = parts.path
+    filter_id = (query.get('filter') or query.get('requestId') or [None])[0]
+
+    issue_key = None
+    if '/browse/' in path:
+        prefix, _, rest = path.partition('/browse/')
+        issue_key = rest.strip('/').split('/')[0].upper() or None
+    elif '/issues' in path and filter_id is not None:
+        prefix = path.partition('/issues')[0]
+    elif path.endswith('/secure/IssueNavigator.jspa') and filter_id is not None:
+        prefix = path.partition('/secure/')[0]
+    else:
+        return None
+
+    if issue_key is None and filter_id is None:
+        return None
+    base_url = f"{parts.scheme}://{parts.netloc}{prefix}"
+    return JiraTarget(base_url, issue_key, filter_id)
+
+
+def filter_jql(filter_id):
+    """JQL selecting a filter's issues ('' for all issues), or None for IDs Jira would reject."""
+    filter_id = str(filter_id).strip()
+    if filter_id in SYSTEM_FILTERS:
+        return SYSTEM_FILTERS[filter_id]
+    if filter_id.isdigit():
+        return f"filter = {filter_id}"
+    return None
+
+
+def searchable_target(target):
+    """`target` as it can be searched: a filter Jira cannot search for falls back to the issue key."""
+    if target is None or target.filter_id is None or filter_jql(target.filter_id) is not None:
+        return target
+    return target._replace(filter_id=None) if target.issue_key else None
+
+
+def change_detection_settings(config):
+    """Return the 'change_detection' block of a urls.json mapping, or None when disabled."""
+    settings = config.get('change_detection', {})
+    if not settings.get('enabled', False):
+        return None
+    return settings
+
+
+class JiraChangeDetector:
+    """
+    Tracks whether the Jira data behind each configured tab changed since it was last loaded.
+
+    Each poll sends one search request per Jira host, covering every tracked issue key and
+    filter with `updated >= -Nm`, and repeats any ETag/Last-Modified validators the server sent,
+    so an unchanged result costs a 304 where searches are validated (Jira's are not). Issues whose `updated` stamp moved mark their tabs dirty.
+    Filter results cannot be attributed to one filter, so any change on a host dirties all of
+    its filter tabs. Issues that leave a filter no longer match its JQL, so each filter's keys
+    are also fetched (keys only) and a filter whose membership changed dirties its tabs.
+    URLs that are not Jira issue/filter pages, and hosts whose last poll failed, always reload. System filters are searched with their own JQL; a filter that has
+    no JQL equivalent is tracked through the issue key of its URL, if it has one.
+    """
+
+    def __init__(self, urls, poll_interval=DEFAULT_POLL_INTERVAL, username=None, token=None, timeout=10):
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        # The lookback window stays fixed so repeated queries are identical and cacheable
+        self.lookback_minutes = max(2, math.ceil(poll_interval * 3 / 60000))
+        self.auth_header = None
+        if username and token:
+            credentials = base64.b64encode(f"{username}:{token}".encode()).decode()
+            self.auth_header = f"Basic {credentials}"
+
+        self.lock = threading.Lock()
+        self.targets = {}  # url -> JiraTarget
+        # base_url -> {'keys': set, 'filters': set, 'members', 'etag', 'last_modified', 'healthy', 'baselined'}
+        self.hosts = {}
+        self.seen_updated = {}  # (base_url, issue key) -> last seen `updated` stamp
+        self.dirty = set()  # URLs whose data changed since their last reload
+        self.avoided_reloads = 0
+        self.polls = 0
+        self.not_modified = 0
+
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        for url in urls:
+            self.track(url)
+
+    def track(self, url):
+        target = searchable_target(parse_jira_url(url))
+        if target is None:
+            return None
+        with self.lock:
+            self.targets[url] = target
+            host = self.hosts.setdefault(target.base_url, {
+                'keys': set(), 'filters': set(), 'members': {}, 'etag': None, 'last_modified': None,
+                'healthy': False, 'baselined': False,
+            })
+            if target.issue_key:
+                host['keys'].add(target.issue_key)
+            if target.filter_id is not None:
+                host['filters'].add(target.filter_id)
+            # The query changed, so previous validators no longer apply
+            host['etag'] = None
+            host['last_modified'] = None
+        return target
+
+    def build_jql(self, host):
+        updated = f"updated >= -{self.lookback_minutes}m"
+        filters = [filter_jql(filter_id) for filter_id in sorted(host['filters'])]
+        if '' in filters:
+            return updated  # An "All issues" tab sees every change anyway
+        clauses = []
+        if host['keys']:
+            clauses.append(f"key in ({', '.join(sorted(host['keys']))})")
+        clauses.extend(f"({jql})" for jql in filters)
+        return f"({' OR '.join(clauses)}) AND {updated}"
+
+    def search_url(self, base_url, host):
+        query = urllib.parse.urlencode({
+            'jql': self.build_jql(host),
+            'fields': 'updated',
+            'maxResults': 1000,
+        })
+        return f"{base_url}/rest/api/2/search?{query}"
+
+    def members_url(self, base_url, jql):
+        query = urllib.parse.urlencode({'jql': jql, 'fields': 'key', 'maxResults': 1000})
+        return f"{base_url}/rest/api/2/search?{query}"
+
+    def fetch_json(self, url, host=None):
+        """GET `url` as JSON, sending `host`'s validators if given; returns (payload, headers)."""
+        request = urllib.request.Request(url)
+        request.add_header('Accept', 'application/json')
+        if self.auth_header:
+            request.add_header('Authorization', self.auth_header)
+        if host and host['etag']:
+            request.add_header('If-None-Match', host['etag'])
+        if host and host['last_modified']:
+            request.add_header('If-Modified-Since', host['last_modified'])
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8')), response.headers
+
+    def fetch_members(self, base_url, host):
+        """Return {filter id: (total, keys)} for the host's filters, as Jira answers them now."""
+        members = {}
+        for filter_id in sorted(host['filters']):
+            jql = filter_jql(filter_id)
+            if not jql:
+                continue  # "All issues" only gains or loses issues through updates the search sees
+            payload, _ = self.fetch_json(self.members_url(base_url, jql))
+            # Past the first page only the total is compared
+            keys = frozenset(issue.get('key') for issue in payload.get('issues', []))
+            members[filter_id] = (payload.get('total'), keys)
+        return members
+
+    def poll(self):
+        """Run one polling round: a conditional search per Jira host, plus its filters' keys."""
+        with self.lock:
+            # track() keeps adding to the sets while the requests run unlocked
+            hosts = {base_url: dict(host, keys=set(host['keys']), filters=set(host['filters']))
+                     for base_url, host in self.hosts.items()}
+        for base_url, host in hosts.items():
+            self.poll_host(base_url, host)
+        with self.lock:
+            self.polls += 1
+
+    def poll_host(self, base_url, host):
+        payload = None
+        try:
+            members = self.fetch_members(base_url, host)
+            try:
+                payload, headers = self.fetch_json(self.search_url(base_url, host), host)
+            except urllib.error.HTTPError as e:
+                if e.code != 304:
+                    raise
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            self.mark_unhealthy(base_url, e)
+            return
+
+        with self.lock:
+            state = self.hosts[base_url]
+            changed_keys = set()
+            if payload is None:
+                self.not_modified += 1
+            else:
+                for issue in payload.get('issues', []):
+                    key = issue.get('key')
+                    updated = issue.get('fields', {}).get('updated')
+                    if self.seen_updated.get((base_url, key)) != updated:
+                        self.seen_updated[(base_url, key)] = updated
+                        changed_keys.add(key)
+                state['etag'] = headers.get('ETag')
+                state['last_modified'] = headers.get('Last-Modified')
+            # A filter tracked since the last poll has nothing to compare against yet
+            changed_filters = {filter_id for filter_id, seen in members.items()
+                               if filter_id in state['members'] and state['members'][filter_id] != seen}
+            state['members'].update(members)
+
+            # The first answer only establishes what the freshly loaded pages already show
+            if state['baselined'] and (changed_keys or changed_filters):
+                self.mark_dirty(base_url, changed_keys, changed_filters)
+            state['baselined'] = True
+            state['healthy'] = True
+
+    def mark_dirty(self, base_url, changed_keys, changed_filters=()):
+        for url, target in self.targets.items():
+            if target.base_url != base_url:
+                continue
+            if target.issue_key in changed_keys or target.filter_id in changed_filters:
+                self.dirty.add(url)
+            elif changed_keys and target.filter_id is not None:
+                self.dirty.add(url)
+
+    def mark_unhealthy(self, base_url, error):
+        print(f"Jira change detection failed for {base_url}: {error}")
+        with self.lock:
+            self.hosts[base_url]['healthy'] = False
+
+    def should_reload(self, url):
+        """Return True if the tab showing `url` needs a reload, consuming its dirty flag."""
+        with self.lock:
+            target = self.targets.get(url)
+            if target is None or not self.hosts[target.base_url]['healthy']:
+                return True
+            if url in self.dirty:
+                self.dirty.discard(url)
+                return True
+            self.avoided_reloads += 1
+            return False
+
+    def stats(self):
+        with self.lock:
+            return {
+                'polls': self.polls,
+                'not_modified': self.not_modified,
+                'avoided_reloads': self.avoided_reloads,
+                'dirty_tabs': len(self.dirty),
+            }
+
+    def start(self):
+        """Poll on a background thread so slow Jira responses never block the GUI."""
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name='jira-change-detector', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(self.timeout)
+            self.thread = None
+
+    def run(self):
+        reported = None
+        while not self.stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                # Keep polling; until a round succeeds the affected tabs simply reload
+                print(f"Jira change detection poll failed: {e!r}")
+                with self.lock:
+                    for host in self.hosts.values():
+                        host['healthy'] = False
+            avoided = self.stats()['avoided_reloads']
+            if avoided != reported:
+                print(f"Jira change detection: {avoided} reloads avoided")
+                reported = avoided
+            self.stop_event.wait(self.poll_interval / 1000)
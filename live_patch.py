@@ -0,0 +1,220 @@
+# live_patch.py
+
+import json
+from functools import partial
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+
+from jira_changes import filter_jql
+
+SCRIPT_NAME = 'kiosk-live-patch'
+
+# Runs in the application world so Jira's own scripts cannot see or clobber it. run() returns
+# 'unknown' straight away when the page does not have the structure we know how to patch;
+# otherwise it fetches the REST data and leaves 'patched', 'unchanged' or 'failed' in status().
+LIVE_PATCH_JS = r"""
+(function () {
+    if (window.__kioskLivePatch) {
+        return;
+    }
+    var state = {status: 'idle'};
+
+    function leaf(el) {
+        return el.querySelector('.jira-issue-status-lozenge, .user-hover, a, span') || el;
+    }
+
+    function setText(el, value) {
+        value = value == null ? '' : String(value);
+        var target = leaf(el);
+        if (target.textContent.trim() === value) {
+            return 0;
+        }
+        target.textContent = value;
+        return 1;
+    }
+
+    function fetchJson(url) {
+        return fetch(url, {credentials: 'same-origin', headers: {'Accept': 'application/json'}})
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                return response.json();
+            });
+    }
+
+    function assigneeName(fields) {
+        return fields.assignee ? fields.assignee.displayName : 'Unassigned';
+    }
+
+    function patchIssue(baseUrl, issueKey, nodes) {
+        var url = baseUrl + '/rest/api/2/issue/' + encodeURIComponent(issueKey) + '?fields=summary,status,assignee';
+        return fetchJson(url).then(function (issue) {
+            var fields = issue.fields;
+            var changes = setText(nodes.summary, fields.summary);
+            if (nodes.status) {
+                changes += setText(nodes.status, fields.status.name);
+            }
+            if (nodes.assignee) {
+                changes += setText(nodes.assignee, assigneeName(fields));
+            }
+            return changes;
+        });
+    }
+
+    function rowKey(row) {
+        return row.getAttribute('data-issuekey') || row.getAttribute('data-key');
+    }
+
+    function patchRows(baseUrl, filterJql, rows) {
+        var query = 'jql=' + encodeURIComponent(filterJql) +
+            '&fields=summary,status,assignee&maxResults=' + Math.max(rows.length, 1);
+        return fetchJson(baseUrl + '/rest/api/2/search?' + query).then(function (result) {
+            var keys = result.issues.map(function (issue) { return issue.key; });
+            var shown = rows.map(rowKey);
+            // Added, removed or reordered rows need the server to render the list
+            if (keys.join(',') !== shown.join(',')) {
+                throw new Error('filter rows changed');
+            }
+            var changes = 0;
+            result.issues.forEach(function (issue, i) {
+                var row = rows[i];
+                var cells = {
+                    summary: row.querySelector('td.summary, .issue-link-summary'),
+                    status: row.querySelector('td.status'),
+                    assignee: row.querySelector('td.assignee')
+                };
+                if (cells.summary) {
+                    changes += setText(cells.summary, issue.fields.summary);
+                }
+                if (cells.status) {
+                    changes += setText(cells.status, issue.fields.status.name);
+                }
+                if (cells.assignee) {
+                    changes += setText(cells.assignee, assigneeName(issue.fields));
+                }
+            });
+            return changes;
+        });
+    }
+
+    window.__kioskLivePatch = {
+        run: function (baseUrl, issueKey, filterJql) {
+            if (state.status === 'pending') {
+                return 'pending';
+            }
+            var jobs = [];
+            if (issueKey) {
+                var nodes = {
+                    summary: document.getElementById('summary-val'),
+                    status: document.getElementById('status-val'),
+                    assignee: document.getElementById('assignee-val')
+                };
+                if (!nodes.summary) {
+                    return 'unknown';
+                }
+                jobs.push(patchIssue(baseUrl, issueKey, nodes));
+            }
+            if (filterJql !== null) {
+                var rows = Array.prototype.slice.call(
+                    document.querySelectorAll('#issuetable tr.issuerow[data-issuekey], .issue-list li[data-key]'));
+                if (rows.length) {
+                    jobs.push(patchRows(baseUrl, filterJql, rows));
+                } else if (!issueKey) {
+                    return 'unknown';
+                }
+            }
+            if (!jobs.length) {
+                return 'unknown';
+            }
+            state.status = 'pending';
+            Promise.all(jobs).then(function (changes) {
+                var total = changes.reduce(function (a, b) { return a + b; }, 0);
+                state.status = total > 0 ? 'patched' : 'unchanged';
+            }).catch(function () {
+                state.status = 'failed';
+            });
+            return 'started';
+        },
+        status: function () {
+            return state.status;
+        }
+    };
+})();
+"""
+
+
+def install_live_patch_script(profile):
+    """Register the live patch script on a profile once; every page it creates gets it."""
+    scripts = profile.scripts()
+    if not scripts.findScript(SCRIPT_NAME).isNull():
+        return
+    script = QWebEngineScript()
+    script.setName(SCRIPT_NAME)
+    script.setSourceCode(LIVE_PATCH_JS)
+    script.setInjectionPoint(QWebEngineScript.DocumentReady)
+    script.setWorldId(QWebEngineScript.ApplicationWorld)
+    script.setRunsOnSubFrames(False)
+    scripts.insert(script)
+
+
+class LivePatcher:
+    """
+    Updates issue and filter tabs in place from Jira's REST API instead of reloading them.
+
+    Only the summary, status and assignee texts that differ are rewritten, so scroll position
+    and expanded panels survive. Filter rows are searched with the filter's JQL, so system
+    filters work too. `fallback` is called whenever the page structure is unknown, the REST
+    call fails or the set of filter rows changed.
+    """
+
+    def __init__(self, view_pool, timeout_ms=5000, poll_ms=250):
+        self.view_pool = view_pool
+        self.timeout_ms = timeout_ms
+        self.poll_ms = poll_ms
+        self.patched = 0
+        self.unchanged = 0
+        self.fallbacks = 0
+        install_live_patch_script(view_pool.profile)
+
+    def patch(self, index, target, fallback):
+        view = self.view_pool.view_for(index)
+        if view is None:
+            # Released tabs are rebuilt fresh on demand
+            return
+        # Rows are only patched for filters with a JQL equivalent; system filter IDs fail `filter = `
+        jql = filter_jql(target.filter_id) if target.filter_id is not None else None
+        args = ', '.join(json.dumps(value) for value in (target.base_url, target.issue_key, jql))
+        js_code = f"window.__kioskLivePatch ? window.__kioskLivePatch.run({args}) : 'unknown'"
+        view.page().runJavaScript(
+            js_code, QWebEngineScript.ApplicationWorld,
+            partial(self.on_started, view.page(), fallback, 0)
+        )
+
+    def on_started(self, page, fallback, waited, result):
+        if result == 'started' or result == 'pending':
+            QTimer.singleShot(self.poll_ms, partial(self.check_status, page, fallback, waited + self.poll_ms))
+        else:
+            self.fall_back(fallback)
+
+    def check_status(self, page, fallback, waited):
+        if self.view_pool.owns_page(page):
+            page.runJavaScript(
+                "window.__kioskLivePatch ? window.__kioskLivePatch.status() : 'failed'",
+                QWebEngineScript.ApplicationWorld,
+                partial(self.on_status, page, fallback, waited)
+            )
+
+    def on_status(self, page, fallback, waited, status):
+        if status == 'patched':
+            self.patched += 1
+        elif status == 'unchanged':
+            self.unchanged += 1
+        elif status == 'pending' and waited < self.timeout_ms:
+            QTimer.singleShot(self.poll_ms, partial(self.check_status, page, fallback, waited + self.poll_ms))
+        else:
+            self.fall_back(fallback)
+
+    def fall_back(self, fallback):
+        self.fallbacks += 1
+        fallback()
@@ -2,21 +2,47 @@
 
 import sys
 import os
-import subprocess
+# Imported first so the startup clock covers the Qt imports
+from startup_profiler import profiler
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel, QPushButton
 )
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import QTimer, Qt
+# QtWebEngine has to be imported before the QApplication exists
+from PyQt5 import QtWebEngineWidgets  # noqa: F401
+from mode_launcher import ModeLauncher
+from background_cache import BackgroundImageLoader
+from config_store import default_config_path
+
+CONFIG_PATH = default_config_path(__file__)
+
+
+def build_frontend():
+    import frontend
+    return frontend.AdminPortal(CONFIG_PATH)
+
+
+def build_admin():
+    import admin
+    return admin.AdminPortal(CONFIG_PATH)
+
 
 class MainWindow(QWidget):
     def __init__(self):
         super().__init__()
+        # Both modes run in this process; the default one is built while the countdown runs
+        self.launcher = ModeLauncher(
+            {'frontend': build_frontend, 'admin': build_admin}, 'frontend', chooser=self,
+            fullscreen=('frontend', 'admin')
+        )
         self.init_ui()
         self.timer = QTimer()
         self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.open_frontend)
         self.timer.start(10000)  # 10 seconds
+        # Start loading the frontend's tabs once the chooser has painted
+        QTimer.singleShot(0, self.launcher.preload)
 
     def init_ui(self):
         self.setWindowTitle("Select Application")
@@ -66,24 +92,6 @@ class MainWindow(QWidget):
         self.show()
 
     def set_background_image(self):
-        # Get the absolute path of the image
-        image_path = os.path.join(os.path.dirname(__file__), 'Images', 'Rada.jpg')
-        # Check if the image exists
-        if not os.path.exists(image_path):
-            print(f"Background image not found at {image_path}")
-            return
-
-        # Create a QLabel to display the background image
-        self.background_label = QLabel(self)
-        pixmap = QPixmap(image_path)
-        if pixmap.isNull():
-            print(f"Failed to load image at {image_path}")
-            return
-
-        # Get the size of the original image
-        image_width = pixmap.width()
-        image_height = pixmap.height()
-
         # Define the offsets to move the image
         x_offset = 200  # Adjust this value to move the image horizontally
         y_offset = 300  # Adjust this value to move the image vertically
@@ -92,37 +100,41 @@ class MainWindow(QWidget):
         display_width = 1245
         display_height = 940
 
-        # Ensure the region is within the bounds of the original image
-        if x_offset + display_width > image_width:
-            x_offset = image_width - display_width
-        if y_offset + display_height > image_height:
-            y_offset = image_height - display_height
-        if x_offset < 0:
-            x_offset = 0
-        if y_offset < 0:
-            y_offset = 0
-
-        # Crop the image to the specified region
-        cropped_pixmap = pixmap.copy(x_offset, y_offset, display_width, display_height)
-
-        self.background_label.setPixmap(cropped_pixmap)
+        # The label paints a plain backdrop at once; the image follows from a worker thread
+        self.background_label = QLabel(self)
+        self.background_label.setStyleSheet("background-color: black;")
         self.background_label.setGeometry(0, 0, display_width, display_height)
         self.background_label.setScaledContents(False)
         self.background_label.lower()
 
+        # Get the absolute path of the image
+        image_path = os.path.join(os.path.dirname(__file__), 'Images', 'Rada.jpg')
+        # Check if the image exists
+        if not os.path.exists(image_path):
+            print(f"Background image not found at {image_path}")
+            return
+
+        # Only the cropped region is decoded, and the crop is cached on disk for the next launch
+        self.background_loader = BackgroundImageLoader()
+        self.background_loader.loaded.connect(self.show_background_image)
+        self.background_loader.load(image_path, x_offset, y_offset, display_width, display_height)
+
+    def show_background_image(self, image):
+        if not image.isNull():
+            self.background_label.setPixmap(QPixmap.fromImage(image))
+
     def open_frontend(self):
         self.timer.stop()
-        self.hide()
-        subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), 'frontend.py')])
-        QApplication.instance().quit()
+        self.launcher.switch('frontend')
 
     def open_admin(self):
         self.timer.stop()
-        self.hide()
-        subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), 'admin.py')])
-        QApplication.instance().quit()
+        self.launcher.switch('admin')
 
 if __name__ == "__main__":
+    profiler.mark('imports')
     app = QApplication(sys.argv)
+    profiler.mark('app_init')
     window = MainWindow()
+    profiler.mark('chooser_shown')
     sys.exit(app.exec_())
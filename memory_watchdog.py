@@ -0,0 +1,168 @@
+# memory_watchdog.py
+
+import json
+import os
+import time
+from collections import deque
+from functools import partial
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+DEFAULT_INTERVAL = 60000  # ms
+DEFAULT_BUDGET_MB = 800
+DEFAULT_GROWTH_MB_PER_HOUR = 200
+DEFAULT_GROWTH_WINDOW = 1800  # s of samples a growth rate is computed over
+
+PAGE_SIZE_KB = os.sysconf('SC_PAGE_SIZE') // 1024 if hasattr(os, 'sysconf') else 4
+
+
+def memory_watchdog_settings(config):
+    """Return the 'memory_watchdog' block of a urls.json mapping, or None when disabled."""
+    settings = config.get('memory_watchdog', {})
+    if not settings.get('enabled', False):
+        return None
+    return settings
+
+
+def read_process_memory(pid):
+    """Return (rss_kb, pss_kb) of a process from /proc, or None if it is gone or unreadable."""
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            rss_kb = int(f.read().split()[1]) * PAGE_SIZE_KB
+    except (OSError, ValueError, IndexError):
+        return None
+    pss_kb = None
+    try:
+        # PSS splits shared pages between the renderers that map them
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    pss_kb = int(line.split()[1])
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    return rss_kb, pss_kb if pss_kb is not None else rss_kb
+
+
+class MemoryWatchdog:
+    """
+    Samples the memory of every live tab's renderer and recycles pages that outgrow it.
+
+    A tab is recycled (given a fresh page that reloads its URL off-screen, see
+    ViewPool.recycle_host) when its renderer's PSS exceeds `budget_mb` or grew faster than
+    `growth_mb_per_hour` over the last `growth_window` seconds. Visible tabs are only recycled
+    once they are off-screen. Renderers sharing a process are judged together. Crashed or
+    killed renderers are restored in place with an increasing back-off so a page that crashes
+    on load cannot spin.
+    """
+
+    def __init__(self, view_pool, interval=DEFAULT_INTERVAL, budget_mb=DEFAULT_BUDGET_MB,
+                 growth_mb_per_hour=DEFAULT_GROWTH_MB_PER_HOUR, growth_window=DEFAULT_GROWTH_WINDOW,
+                 log_path=None):
+        self.view_pool = view_pool
+        self.budget_kb = budget_mb * 1024
+        self.growth_kb_per_hour = growth_mb_per_hour * 1024
+        self.growth_window = growth_window
+        self.log_path = log_path  # JSON lines, one per tab per sample
+        self.samples = {}  # pid -> deque of (monotonic time, pss_kb)
+        self.crashes = {}  # host -> consecutive crashes
+        self.recycled = 0
+        self.restored = 0
+
+        view_pool.page_hooks.append(self.watch_page)
+        for host in view_pool.lru:
+            self.watch_page(host.view.page(), host)
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.sample)
+        self.timer.start(interval)
+
+    def watch_page(self, page, host):
+        page.renderProcessTerminated.connect(partial(self.on_render_process_terminated, host, page))
+
+    def on_render_process_terminated(self, host, page, status, exit_code):
+        if status == QWebEnginePage.NormalTerminationStatus:
+            return
+        view = host.view
+        if view is None or view.page() is not page:
+            return  # A standby or already replaced page
+        crashes = self.crashes.get(host, 0) + 1
+        self.crashes[host] = crashes
+        delay = min(60, 2 ** (crashes - 1))
+        print(f"Renderer for {host.url} terminated (status {int(status)}, exit code {exit_code}); "
+              f"restoring in {delay}s")
+        QTimer.singleShot(delay * 1000, partial(self.restore, host, page))
+
+    def restore(self, host, page):
+        if host.view is None or host.view.page() is not page:
+            return  # Released, removed or reloaded in the meantime
+        # Nothing is left on the crashed page to keep on screen while the new one loads
+        self.view_pool.recycle_host(host, in_place=True)
+        self.restored += 1
+
+    def growth_per_hour(self, pid):
+        samples = self.samples.get(pid)
+        if not samples or samples[-1][0] - samples[0][0] < self.growth_window / 2:
+            return 0  # Not enough history for a meaningful rate
+        (start, first), (end, last) = samples[0], samples[-1]
+        return (last - first) * 3600 / (end - start)
+
+    def sample(self):
+        now = time.monotonic()
+        tabs_by_pid = {}
+        for host in self.view_pool.lru:
+            pid = host.view.page().renderProcessPid()
+            if pid > 0:
+                tabs_by_pid.setdefault(pid, []).append(host)
+
+        records = []
+        for pid, hosts in tabs_by_pid.items():
+            memory = read_process_memory(pid)
+            if memory is None:
+                continue
+            rss_kb, pss_kb = memory
+            samples = self.samples.setdefault(pid, deque())
+            samples.append((now, pss_kb))
+            while samples and now - samples[0][0] > self.growth_window:
+                samples.popleft()
+            growth = self.growth_per_hour(pid)
+
+            for host in hosts:
+                self.crashes.pop(host, None)  # Alive long enough to be sampled
+                records.append({
+                    'time': time.time(), 'tab': self.view_pool.index_of(host), 'url': host.url,
+                    'pid': pid, 'rss_mb': round(rss_kb / 1024, 1), 'pss_mb': round(pss_kb / 1024, 1),
+                    'growth_mb_per_hour': round(growth / 1024, 1), 'shared_by': len(hosts),
+                })
+
+            if pss_kb > self.budget_kb or growth > self.growth_kb_per_hour:
+                reason = 'over budget' if pss_kb > self.budget_kb else 'growing'
+                # The shown tab is left alone and picked up by a later sample
+                for host in [host for host in hosts if not host.isVisible()]:
+                    print(f"Recycling {host.url}: renderer {pid} {reason} "
+                          f"({pss_kb // 1024} MB PSS, {growth / 1024:+.0f} MB/h)")
+                    self.view_pool.recycle_host(host)
+                    self.recycled += 1
+                    self.samples.pop(pid, None)
+
+        # Forget renderers that went away
+        for pid in [pid for pid in self.samples if pid not in tabs_by_pid]:
+            del self.samples[pid]
+        self.log(records)
+
+    def log(self, records):
+        if not records:
+            return
+        print("Renderer memory: " + ', '.join(
+            f"tab {record['tab']} {record['pss_mb']:.0f} MB ({record['growth_mb_per_hour']:+.0f} MB/h)"
+            for record in records
+        ))
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a') as f:
+                    for record in records:
+                        f.write(json.dumps(record) + '\n')
+            except OSError as e:
+                print(f"Could not write memory log {self.log_path}: {e}")
+
+    def stop(self):
+        self.timer.stop()
@@ -0,0 +1,73 @@
+# mode_launcher.py
+
+import time
+import traceback
+from startup_profiler import profiler
+
+
+class ModeLauncher:
+    """
+    Switches between the kiosk's modes (e.g. frontend and admin) inside one QApplication.
+
+    `factories` maps each mode to a callable that builds its top-level window without
+    showing it. While the chooser counts down, preload() builds the default mode off-screen
+    so its tabs are already loading when the countdown ends; picking another mode discards
+    the speculative window instead of paying interpreter and WebEngine start-up again.
+    """
+
+    def __init__(self, factories, default_mode, chooser=None, fullscreen=()):
+        self.factories = factories  # mode -> callable() returning a hidden top-level widget
+        self.default_mode = default_mode
+        self.chooser = chooser  # Hidden once a mode is shown
+        self.fullscreen = set(fullscreen)  # Modes shown full screen rather than windowed
+        self.windows = {}  # mode -> built window
+        self.current_mode = None
+        self.started = time.monotonic()
+
+    def preload(self, mode=None):
+        """Build `mode` (the default mode if None) hidden, once; None if its factory failed."""
+        mode = mode or self.default_mode
+        if mode not in self.windows:
+            try:
+                window = self.factories[mode]()
+            except Exception:
+                # A broken mode must not take the chooser and the other modes down with it;
+                # this often runs from a timer slot, where an exception aborts the process
+                print(f"Could not build the {mode} mode:")
+                traceback.print_exc()
+                return None
+            window.mode_launcher = self  # Lets the window switch modes itself
+            self.windows[mode] = window
+        return self.windows[mode]
+
+    def switch(self, mode):
+        if mode == self.current_mode:
+            return self.windows[mode]
+        preloaded = mode in self.windows
+        window = self.preload(mode)
+        if window is None:
+            return None  # Reported by preload(); the chooser stays up
+
+        # Show the new window before closing anything so the application never sees
+        # its last window close and quits
+        if mode in self.fullscreen:
+            window.showFullScreen()
+        else:
+            window.show()
+        for other in [other for other in self.windows if other != mode]:
+            self.discard(other)
+        if self.chooser is not None:
+            self.chooser.hide()
+
+        self.current_mode = mode
+        profiler.mark('mode_shown', mode=mode, preloaded=preloaded)
+        elapsed = time.monotonic() - self.started
+        print(f"Opened {mode} {elapsed:.1f}s after launch ({'preloaded' if preloaded else 'cold'})")
+        return window
+
+    def discard(self, mode):
+        window = self.windows.pop(mode, None)
+        if window is None:
+            return
+        window.close()  # closeEvent disposes the window's web views
+        window.deleteLater()
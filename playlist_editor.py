@@ -0,0 +1,311 @@
+# playlist_editor.py
+
+"""
+The admin portal's tab list: a model/view playlist with one shared preview.
+
+Only the selected entry is ever loaded, in a single QWebEngineView, so the admin's memory
+stays the same whether the playlist has five URLs or five thousand. The list itself is
+virtualized by QListView and filtered incrementally through a QSortFilterProxyModel.
+
+Per-entry metadata lives in urls.json next to the URL list, keyed by URL:
+
+    "playlist": {"https://...": {"dwell": 20000}}          ms on screen instead of `interval`
+    "refresh": {"policies": {"https://...": {"every": 300}}}   see refresh_scheduler.RefreshPolicy
+"""
+
+import json
+import time
+from PyQt5.QtWidgets import QAbstractItemView, QLineEdit, QListView, QSplitter, QVBoxLayout, QWidget
+from PyQt5.QtCore import (
+    QAbstractListModel, QModelIndex, QSortFilterProxyModel, QTimer, QUrl, Qt, pyqtSignal
+)
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineView
+
+PREVIEW_DELAY = 250  # ms the selection must rest on an entry before it is loaded
+
+
+def parse_url_list(text):
+    """URLs from pasted or imported text: a JSON list, or one URL per line ('#' starts a comment)."""
+    text = text.strip()
+    if text.startswith('['):
+        return [url.strip() for url in json.loads(text) if isinstance(url, str) and url.strip()]
+    return [line.strip() for line in text.splitlines() if line.strip() and not line.strip().startswith('#')]
+
+
+class PlaylistItem:
+    def __init__(self, url, dwell=None, policy=None):
+        self.url = url
+        self.dwell = dwell  # ms, or None for the rotation interval
+        self.policy = policy  # refresh policy dict, or None for the default policy
+        self.load_ms = None  # last preview load, this session
+        self.load_ok = None
+
+
+class PlaylistModel(QAbstractListModel):
+    UrlRole = Qt.UserRole
+    DwellRole = Qt.UserRole + 1
+    PolicyRole = Qt.UserRole + 2
+    LoadRole = Qt.UserRole + 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items = []
+
+    # Loading and saving
+
+    def load(self, urls, playlist=None, policies=None):
+        playlist, policies = playlist or {}, policies or {}
+        self.beginResetModel()
+        self.items = [
+            PlaylistItem(url, playlist.get(url, {}).get('dwell'), policies.get(url)) for url in urls
+        ]
+        self.endResetModel()
+
+    def urls(self):
+        return [item.url for item in self.items]
+
+    def metadata(self):
+        """({url: {'dwell': ms}}, {url: policy}) for the entries that have any."""
+        playlist = {item.url: {'dwell': item.dwell} for item in self.items if item.dwell}
+        policies = {item.url: item.policy for item in self.items if item.policy}
+        return playlist, policies
+
+    # QAbstractListModel
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.items[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole, self.UrlRole):
+            if role == Qt.DisplayRole:
+                return f"{index.row() + 1}. {item.url}{self.summary(item)}"
+            return item.url
+        if role == Qt.ToolTipRole:
+            return item.url + self.summary(item)
+        if role == self.DwellRole:
+            return item.dwell
+        if role == self.PolicyRole:
+            return item.policy
+        if role == self.LoadRole:
+            return item.load_ms, item.load_ok
+        return None
+
+    def summary(self, item):
+        parts = []
+        if item.dwell:
+            parts.append(f"{item.dwell / 1000:g}s")
+        if item.policy:
+            parts.append("refresh " + ', '.join(f"{key} {value}" for key, value in item.policy.items()))
+        if item.load_ms is not None:
+            parts.append(f"loaded in {item.load_ms} ms" if item.load_ok else "failed to load")
+        return f"   [{' | '.join(parts)}]" if parts else ''
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid():
+            return False
+        item = self.items[index.row()]
+        if role in (Qt.EditRole, self.UrlRole):
+            value = value.strip()
+            if not value:
+                return False
+            item.url = value
+            item.load_ms = item.load_ok = None
+        elif role == self.DwellRole:
+            item.dwell = value or None
+        elif role == self.PolicyRole:
+            item.policy = value or None
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable | Qt.ItemIsDragEnabled
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    # Editing
+
+    def insert_urls(self, urls, row=None):
+        """Insert many URLs in one batch, so views update once however long the list is."""
+        if not urls:
+            return
+        row = len(self.items) if row is None else row
+        self.beginInsertRows(QModelIndex(), row, row + len(urls) - 1)
+        self.items[row:row] = [PlaylistItem(url) for url in urls]
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        # Back to front in contiguous runs, one signal pair per run
+        rows = sorted(set(rows), reverse=True)
+        while rows:
+            last = first = rows.pop(0)
+            while rows and rows[0] == first - 1:
+                first = rows.pop(0)
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.items[first:last + 1]
+            self.endRemoveRows()
+
+    def move_rows(self, rows, destination):
+        """Move `rows` (kept in order) to sit before row `destination` of the current list."""
+        moving_rows = set(rows)
+        moving = [self.items[row] for row in sorted(moving_rows)]
+        remaining = [item for row, item in enumerate(self.items) if row not in moving_rows]
+        position = destination - sum(1 for row in moving_rows if row < destination)
+        order = remaining[:position] + moving + remaining[position:]
+        # Rows before `target` are final, so every move is upwards and selections follow it
+        for target, item in enumerate(order):
+            row = self.items.index(item)
+            if row != target:
+                self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), target)
+                self.items.insert(target, self.items.pop(row))
+                self.endMoveRows()
+
+    def record_load(self, item, load_ms, ok):
+        if item not in self.items:
+            return
+        item.load_ms, item.load_ok = load_ms, ok
+        index = self.index(self.items.index(item))
+        self.dataChanged.emit(index, index, [self.LoadRole])
+
+
+class PlaylistView(QListView):
+    """
+    A QListView for long playlists. Drag and drop only reports which rows moved where
+    (`rowsDropped`, in the view's rows); the owner moves them in the model.
+    """
+
+    rowsDropped = pyqtSignal(list, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setUniformItemSizes(True)  # Lets the view lay out thousands of rows without measuring each
+        self.setLayoutMode(QListView.Batched)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setDragDropMode(QAbstractItemView.InternalMove)
+        self.setDefaultDropAction(Qt.MoveAction)
+        self.setEditTriggers(QAbstractItemView.EditKeyPressed)
+
+    def dropEvent(self, event):
+        if event.source() is not self:
+            event.ignore()
+            return
+        index = self.indexAt(event.pos())
+        if not index.isValid():
+            destination = self.model().rowCount()
+        elif self.dropIndicatorPosition() == QAbstractItemView.BelowItem:
+            destination = index.row() + 1
+        else:
+            destination = index.row()
+        self.rowsDropped.emit(sorted(index.row() for index in self.selectedIndexes()), destination)
+        # The rows are moved already; a move action would have the view remove them as well
+        event.setDropAction(Qt.CopyAction)
+        event.accept()
+
+
+class PlaylistEditor(QSplitter):
+    """Filter box and playlist on the left, a preview of the selected entry on the right."""
+
+    reordered = pyqtSignal()  # rows were dragged to a new position
+
+    def __init__(self, profile, parent=None):
+        super().__init__(Qt.Horizontal, parent)
+        self.profile = profile
+        self.model = PlaylistModel(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterRole(PlaylistModel.UrlRole)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+        left = QWidget()
+        layout = QVBoxLayout(left)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter URLs")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self.set_filter)
+        layout.addWidget(self.filter_edit)
+        self.list_view = PlaylistView()
+        self.list_view.setModel(self.proxy)
+        self.list_view.rowsDropped.connect(self.on_rows_dropped)
+        self.list_view.selectionModel().currentChanged.connect(lambda current, previous: self.preview_timer.start())
+        layout.addWidget(self.list_view)
+        self.addWidget(left)
+
+        # The one web view; it follows the selection after it has rested for PREVIEW_DELAY
+        self.preview = QWebEngineView()
+        self.preview.setFocusPolicy(Qt.StrongFocus)
+        page = QWebEnginePage(profile, self.preview)
+        self.preview.setPage(page)
+        self.preview.loadStarted.connect(self.on_load_started)
+        self.preview.loadFinished.connect(self.on_load_finished)
+        self.addWidget(self.preview)
+        self.setSizes([1, 2])
+        self.previewed = None  # PlaylistItem shown in the preview
+        self.load_started = None
+
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(PREVIEW_DELAY)
+        self.preview_timer.timeout.connect(self.update_preview)
+
+    def set_filter(self, text):
+        self.proxy.setFilterFixedString(text)
+        # Reordering a filtered list would be ambiguous about where hidden rows end up
+        self.list_view.setDragEnabled(not text)
+
+    def on_rows_dropped(self, rows, destination):
+        rows = [self.proxy.mapToSource(self.proxy.index(row, 0)).row() for row in rows]
+        if destination < self.proxy.rowCount():
+            destination = self.proxy.mapToSource(self.proxy.index(destination, 0)).row()
+        else:
+            destination = self.model.rowCount()
+        self.model.move_rows(rows, destination)
+        self.reordered.emit()
+
+    # Selection
+
+    def current_row(self):
+        """Row of the selected entry in the model, or -1."""
+        index = self.proxy.mapToSource(self.list_view.currentIndex())
+        return index.row() if index.isValid() else -1
+
+    def selected_rows(self):
+        return sorted(self.proxy.mapToSource(index).row() for index in self.list_view.selectedIndexes())
+
+    def select_row(self, row):
+        index = self.proxy.mapFromSource(self.model.index(row))
+        if index.isValid():
+            self.list_view.setCurrentIndex(index)
+            self.list_view.scrollTo(index)
+
+    # Preview
+
+    def update_preview(self):
+        row = self.current_row()
+        item = self.model.items[row] if row >= 0 else None
+        if item is None or (item is self.previewed and self.preview.url() == QUrl(item.url)):
+            return
+        self.previewed = item
+        self.preview.setUrl(QUrl(item.url))
+
+    def on_load_started(self):
+        self.load_started = time.monotonic()
+
+    def on_load_finished(self, ok):
+        if self.previewed is None or self.load_started is None:
+            return
+        load_ms = int((time.monotonic() - self.load_started) * 1000)
+        self.load_started = None
+        self.model.record_load(self.previewed, load_ms, ok)
+
+    def dispose(self):
+        self.preview_timer.stop()
+        self.preview.page().deleteLater()
+        self.preview.deleteLater()
@@ -0,0 +1,163 @@
+# profile_factory.py
+
+import json
+import os
+from PyQt5.QtCore import QByteArray, QFileSystemWatcher, QTimer
+from PyQt5.QtNetwork import QNetworkCookie, QNetworkProxy
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile
+from config_store import file_lock
+from startup_profiler import profiler
+
+DEFAULT_STORAGE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'browser_data')
+DEFAULT_CACHE_SIZE_MB = 100
+
+_profile = None
+_cookie_jar = None
+
+
+def get_profile(role='frontend', settings=None):
+    """
+    Return this process's web profile, creating it on first use.
+
+    `settings` is the 'profile' block of urls.json:
+        storage_path   root directory for everything the profiles keep (default ./browser_data)
+        cache_mode     'disk' or 'memory' for the frontend; the admin always caches in memory
+        cache_size_mb  HTTP cache cap; Chromium evicts least recently used entries past it
+        proxy          optional "host:port" of an HTTP proxy for all pages, e.g. the fleet's
+                       caching_proxy.py
+
+    In memory mode the profile is off-the-record and nothing but the shared cookie jar is
+    written, which suits kiosks running from SD cards. Either way cookies are mirrored to
+    <storage_path>/cookies.json so the admin and frontend processes share one Jira login.
+    """
+    global _profile, _cookie_jar
+    if _profile is not None:
+        return _profile
+
+    settings = settings or {}
+    root = os.path.abspath(settings.get('storage_path') or DEFAULT_STORAGE_ROOT)
+    os.makedirs(root, exist_ok=True)
+    # Only the frontend keeps a disk cache, so the two processes never duplicate one
+    cache_mode = 'memory' if role == 'admin' else settings.get('cache_mode', 'disk')
+    app = QApplication.instance()
+
+    if cache_mode == 'memory':
+        profile = QWebEngineProfile(app)  # Off-the-record profile, kept entirely in memory
+        profile.setHttpCacheType(QWebEngineProfile.MemoryHttpCache)
+    else:
+        profile = QWebEngineProfile(f'Kiosk-{role}', app)
+        profile.setPersistentStoragePath(os.path.join(root, role))
+        profile.setCachePath(os.path.join(root, 'cache', role))
+        profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+        profile.setPersistentCookiesPolicy(QWebEngineProfile.ForcePersistentCookies)
+    profile.setHttpCacheMaximumSize(int(settings.get('cache_size_mb', DEFAULT_CACHE_SIZE_MB)) * 1024 * 1024)
+    if settings.get('proxy'):
+        use_proxy(settings['proxy'])
+
+    _cookie_jar = SharedCookieJar(profile.cookieStore(), os.path.join(root, 'cookies.json'))
+    _profile = profile
+    profiler.mark('profile_ready', role=role, cache_mode=cache_mode)
+    return profile
+
+
+def use_proxy(address):
+    """Route the process's traffic, web pages included, through an HTTP proxy at "host:port"."""
+    host, _, port = address.rpartition(':')
+    if not host or not port.isdigit():
+        print(f"Ignoring proxy setting '{address}', expected host:port")
+        return
+    QNetworkProxy.setApplicationProxy(QNetworkProxy(QNetworkProxy.HttpProxy, host, int(port)))
+
+
+def cookie_key(cookie):
+    return (bytes(cookie.name()).decode('latin-1'), cookie.domain(), cookie.path())
+
+
+class SharedCookieJar:
+    """
+    Mirrors a profile's cookies into a JSON file shared by every kiosk process.
+
+    Local cookie changes are written (debounced, atomically, under the config file lock
+    helper) merged with what other processes wrote; changes other processes make to the
+    file are imported into the local cookie store.
+    """
+
+    def __init__(self, cookie_store, path, debounce_ms=500):
+        self.cookie_store = cookie_store
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.cookies = {}  # (name, domain, path) -> raw Set-Cookie form
+        self.removed = set()  # keys deleted locally since the last write
+
+        self.write_timer = QTimer()
+        self.write_timer.setSingleShot(True)
+        self.write_timer.setInterval(debounce_ms)
+        self.write_timer.timeout.connect(self.write)
+
+        self.import_file()
+        cookie_store.cookieAdded.connect(self.on_cookie_added)
+        cookie_store.cookieRemoved.connect(self.on_cookie_removed)
+
+        self.watcher = QFileSystemWatcher([os.path.dirname(path)])
+        self.watcher.directoryChanged.connect(self.import_file)
+
+    def on_cookie_added(self, cookie):
+        key = cookie_key(cookie)
+        raw = bytes(cookie.toRawForm()).decode('latin-1')
+        if self.cookies.get(key) == raw:
+            return  # Echo of a cookie we imported
+        self.cookies[key] = raw
+        self.removed.discard(key)
+        self.write_timer.start()
+
+    def on_cookie_removed(self, cookie):
+        key = cookie_key(cookie)
+        if self.cookies.pop(key, None) is not None:
+            self.removed.add(key)
+            self.write_timer.start()
+
+    def read_file(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get('cookies', [])
+        except (OSError, ValueError):
+            return []
+
+    def import_file(self, path=None):
+        if self.write_timer.isActive():
+            return  # Our own write is pending and will merge the file first
+        file_cookies = {}
+        for raw in self.read_file():
+            for cookie in QNetworkCookie.parseCookies(QByteArray(raw.encode('latin-1'))):
+                file_cookies[cookie_key(cookie)] = (raw, cookie)
+
+        for key, (raw, cookie) in file_cookies.items():
+            if self.cookies.get(key) != raw:
+                self.cookies[key] = raw
+                self.cookie_store.setCookie(cookie)
+
+        # Cookies another process removed, e.g. on logout
+        for key in [key for key in self.cookies if key not in file_cookies]:
+            raw = self.cookies.pop(key)
+            for cookie in QNetworkCookie.parseCookies(QByteArray(raw.encode('latin-1'))):
+                self.cookie_store.deleteCookie(cookie)
+
+    def write(self):
+        directory = os.path.dirname(self.path)
+        with file_lock(self.lock_path):
+            merged = {}
+            for raw in self.read_file():
+                for cookie in QNetworkCookie.parseCookies(QByteArray(raw.encode('latin-1'))):
+                    merged[cookie_key(cookie)] = raw
+            for key in self.removed:
+                merged.pop(key, None)
+            merged.update(self.cookies)
+
+            temp_path = os.path.join(directory, f".cookies.{os.getpid()}.tmp")
+            with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+                json.dump({'cookies': sorted(merged.values())}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        self.removed.clear()
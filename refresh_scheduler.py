@@ -0,0 +1,284 @@
+# refresh_scheduler.py
+
+import heapq
+import itertools
+import random
+import re
+import time
+from datetime import datetime
+from PyQt5 import sip
+from PyQt5.QtCore import QTimer
+
+DEFAULT_MAX_CONCURRENT = 2
+DEFAULT_JITTER_MS = 1500
+DEFAULT_WAVE_SPACING_MS = 750
+DEFAULT_LOAD_TIMEOUT_MS = 30000
+
+# Lower runs first
+PRIORITY_MANUAL = -1
+PRIORITY_VISIBLE = 0
+PRIORITY_NEXT = 1
+PRIORITY_NORMAL = 2
+
+DAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+WINDOW_PATTERN = re.compile(r'^(?:(?P<days>[a-z,\-]+)\s+)?(?P<start>\d{1,2}:\d{2})-(?P<end>\d{1,2}:\d{2})$')
+
+
+def refresh_settings(config):
+    """Return the 'refresh' block of a urls.json mapping ({} when absent)."""
+    return config.get('refresh', {})
+
+
+def parse_days(text):
+    """'mon-fri', 'sat,sun' or 'fri-mon' -> set of weekday numbers (Monday is 0)."""
+    days = set()
+    for part in text.split(','):
+        first, _, last = part.partition('-')
+        start = DAYS.index(first[:3])
+        end = DAYS.index(last[:3]) if last else start
+        day = start
+        while True:
+            days.add(day)
+            if day == end:
+                break
+            day = (day + 1) % 7
+    return days
+
+
+def parse_minutes(text):
+    hours, minutes = text.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+class RefreshWindow:
+    """A daily time window such as "mon-fri 08:00-18:00"; windows may run past midnight."""
+
+    def __init__(self, text):
+        match = WINDOW_PATTERN.match(text.strip().lower())
+        if match is None:
+            raise ValueError(f"Refresh window '{text}' is not like 'mon-fri 08:00-18:00'")
+        self.days = parse_days(match.group('days')) if match.group('days') else set(range(7))
+        self.start = parse_minutes(match.group('start'))
+        self.end = parse_minutes(match.group('end'))
+
+    def contains(self, moment):
+        minutes = moment.hour * 60 + moment.minute
+        if self.start <= self.end:
+            return moment.weekday() in self.days and self.start <= minutes < self.end
+        # Overnight: the part after midnight belongs to the previous day's window
+        if minutes >= self.start:
+            return moment.weekday() in self.days
+        return minutes < self.end and (moment.weekday() - 1) % 7 in self.days
+
+
+class RefreshPolicy:
+    """
+    How one tab is refreshed, from urls.json:
+
+        {"every": 300}                 reload every 300 s, besides any other trigger
+        {"on_show": false}             no refresh ahead of being shown (on by default)
+        {"windows": ["mon-fri 08:00-18:00"]}   periodic and on-show refreshes only inside these
+        {"never": true}                only manual refreshes
+    """
+
+    def __init__(self, every=None, on_show=True, windows=None, never=False):
+        self.every = every
+        self.on_show = on_show and not never
+        self.windows = [RefreshWindow(window) for window in windows or ()]
+        self.never = never
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('every'), data.get('on_show', True), data.get('windows'), data.get('never', False))
+
+    def allows(self, moment=None):
+        if self.never:
+            return False
+        if not self.windows:
+            return True
+        moment = moment or datetime.now()
+        return any(window.contains(moment) for window in self.windows)
+
+
+class RefreshScheduler:
+    """
+    Owns the refresh work of a set of tabs.
+
+    Pending refreshes sit on a heap of due times served by one QTimer. Due refreshes wait in a
+    ready queue until fewer than `max_concurrent` loads are in flight; the visible tab goes
+    first, then the next one in rotation. Periodic refreshes and Refresh All waves get random
+    jitter, and Refresh All starts one tab every `wave_spacing_ms` instead of all at once.
+
+    `start_load(key, reason)` begins a refresh and returns True if a load is now in flight,
+    which must be reported through finished(key); loads not reported within
+    `load_timeout_ms` free their slot anyway. Without start_load, keys are web views that are
+    reloaded and finish on loadFinished. `priority_of(key)` ranks keys, `policy_for(key)`
+    returns their RefreshPolicy. Reasons are 'show', 'periodic', 'manual' and 'wave'; only
+    'show' and 'periodic' are subject to policies.
+    """
+
+    def __init__(self, start_load=None, priority_of=None, policy_for=None, max_concurrent=DEFAULT_MAX_CONCURRENT,
+                 jitter_ms=DEFAULT_JITTER_MS, wave_spacing_ms=DEFAULT_WAVE_SPACING_MS,
+                 load_timeout_ms=DEFAULT_LOAD_TIMEOUT_MS):
+        self.start_load = start_load or self.reload_view
+        self.priority_of = priority_of or (lambda key: PRIORITY_NORMAL)
+        self.policy_for = policy_for or (lambda key: RefreshPolicy())
+        self.max_concurrent = max(1, max_concurrent)
+        self.jitter_ms = jitter_ms
+        self.wave_spacing_ms = wave_spacing_ms
+        self.load_timeout = load_timeout_ms / 1000
+
+        self.heap = []  # (due, sequence, key, reason)
+        self.tokens = {}  # (key, reason) -> sequence of its live heap entry
+        self.periodic = {}  # key -> seconds between periodic refreshes
+        self.ready = []  # [(key, reason)] in arrival order
+        self.in_flight = {}  # key -> deadline
+        self.sequence = itertools.count()
+        self.stats = {'started': 0, 'skipped_by_policy': 0, 'merged': 0, 'timed_out': 0, 'max_waiting': 0}
+
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run_due)
+
+    @classmethod
+    def from_settings(cls, settings, **kwargs):
+        """A scheduler configured from a 'refresh' block; policies are looked up by URL with `url_of`."""
+        settings = settings or {}
+        url_of = kwargs.pop('url_of', None)
+        policies = settings.get('policies', {})
+        default = RefreshPolicy.from_dict(policies.get('default', {}))
+        by_url = {url: RefreshPolicy.from_dict(policy) for url, policy in policies.items() if url != 'default'}
+        if url_of is not None:
+            kwargs.setdefault('policy_for', lambda key: by_url.get(url_of(key), default))
+        return cls(
+            max_concurrent=settings.get('max_concurrent', DEFAULT_MAX_CONCURRENT),
+            jitter_ms=settings.get('jitter_ms', DEFAULT_JITTER_MS),
+            wave_spacing_ms=settings.get('wave_spacing_ms', DEFAULT_WAVE_SPACING_MS),
+            load_timeout_ms=settings.get('load_timeout_ms', DEFAULT_LOAD_TIMEOUT_MS),
+            **kwargs
+        )
+
+    # Scheduling
+
+    def schedule(self, key, delay_ms, reason='show', jitter=False):
+        """Refresh `key` after `delay_ms`, replacing its pending refresh for the same reason."""
+        if jitter and self.jitter_ms:
+            delay_ms += random.uniform(0, self.jitter_ms)
+        sequence = next(self.sequence)
+        self.tokens[(key, reason)] = sequence
+        heapq.heappush(self.heap, (time.monotonic() + delay_ms / 1000, sequence, key, reason))
+        self.arm()
+
+    def cancel(self, key=None, reason=None):
+        """Drop pending refreshes of one key and/or reason (all of them without arguments)."""
+        for token in [token for token in self.tokens if key in (None, token[0]) and reason in (None, token[1])]:
+            del self.tokens[token]
+        self.ready = [(k, r) for k, r in self.ready if not (key in (None, k) and reason in (None, r))]
+
+    def track(self, key):
+        """Start the periodic refreshes of `key`'s policy, if it has any."""
+        policy = self.policy_for(key)
+        if policy.every and not policy.never:
+            self.periodic[key] = policy.every
+            self.schedule(key, policy.every * 1000, 'periodic', jitter=True)
+        else:
+            self.periodic.pop(key, None)
+            self.cancel(key, 'periodic')
+
+    def forget(self, key):
+        self.periodic.pop(key, None)
+        self.cancel(key)
+        self.in_flight.pop(key, None)
+        self.dispatch()
+
+    def refresh_now(self, key, reason='manual'):
+        self.enqueue(key, reason)
+        self.dispatch()
+
+    def refresh_all(self, keys):
+        """Queue a staged wave over `keys`, most urgent first."""
+        keys = sorted(keys, key=self.priority_of)
+        for position, key in enumerate(keys):
+            self.schedule(key, position * self.wave_spacing_ms, 'wave', jitter=position > 0)
+
+    # Running
+
+    def arm(self):
+        while self.heap and self.tokens.get((self.heap[0][2], self.heap[0][3])) != self.heap[0][1]:
+            heapq.heappop(self.heap)  # Cancelled or replaced
+        deadlines = [self.heap[0][0]] if self.heap else []
+        deadlines.extend(self.in_flight.values())
+        if not deadlines:
+            self.timer.stop()
+            return
+        self.timer.start(max(0, int((min(deadlines) - time.monotonic()) * 1000) + 1))
+
+    def run_due(self):
+        now = time.monotonic()
+        for key, deadline in list(self.in_flight.items()):
+            if deadline <= now:
+                del self.in_flight[key]
+                self.stats['timed_out'] += 1
+        while self.heap and self.heap[0][0] <= now:
+            due, sequence, key, reason = heapq.heappop(self.heap)
+            if self.tokens.get((key, reason)) != sequence:
+                continue
+            del self.tokens[(key, reason)]
+            if reason == 'periodic' and key in self.periodic:
+                self.schedule(key, self.periodic[key] * 1000, 'periodic', jitter=True)
+            self.enqueue(key, reason)
+        self.dispatch()
+
+    def enqueue(self, key, reason):
+        if any(k == key for k, _ in self.ready):
+            self.stats['merged'] += 1  # One refresh covers both requests
+            if reason in ('manual', 'wave'):
+                # A forced refresh must not be lost to a policy check of the queued one
+                self.ready = [(k, reason if k == key else r) for k, r in self.ready]
+            return
+        self.ready.append((key, reason))
+        self.stats['max_waiting'] = max(self.stats['max_waiting'], len(self.ready))
+
+    def rank(self, entry):
+        key, reason = entry
+        return PRIORITY_MANUAL if reason == 'manual' else self.priority_of(key)
+
+    def dispatch(self):
+        while self.ready and len(self.in_flight) < self.max_concurrent:
+            entry = min(self.ready, key=self.rank)  # min() keeps arrival order among equals
+            self.ready.remove(entry)
+            key, reason = entry
+            if key in self.in_flight:
+                self.stats['merged'] += 1
+                continue
+            if reason in ('show', 'periodic'):
+                policy = self.policy_for(key)
+                if not policy.allows() or (reason == 'show' and not policy.on_show):
+                    self.stats['skipped_by_policy'] += 1
+                    continue
+            if self.start_load(key, reason):
+                self.in_flight[key] = time.monotonic() + self.load_timeout
+            self.stats['started'] += 1
+        self.arm()
+
+    def finished(self, key):
+        """Report that the load started for `key` is done, freeing its slot."""
+        if self.in_flight.pop(key, None) is not None:
+            self.dispatch()
+
+    def reload_view(self, view, reason):
+        """Default start_load: reload a web view and finish on its loadFinished."""
+        if sip.isdeleted(view):
+            self.periodic.pop(view, None)
+            self.cancel(view)
+            return False
+        view.reload()
+        signal = getattr(view, 'loadFinished', None)
+        if signal is None:
+            return False  # e.g. a native board, which updates without a page load
+
+        def done(ok):
+            signal.disconnect(done)
+            self.finished(view)
+        signal.connect(done)
+        return True
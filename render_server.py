@@ -0,0 +1,340 @@
+# render_server.py
+
+"""
+Headless frontend: renders every configured tab off-screen and publishes snapshots over HTTP.
+
+One process keeps a web view per tab in urls.json, reloads each on a staggered schedule,
+re-captures them in between so live-updating pages are picked up, and serves the frames to
+any number of thin_client.py displays. The cost grows with the number of tabs, not screens.
+
+    GET /tabs                       manifest: interval, pause_duration and per-tab frame hashes
+    GET /tabs/<i>/frame             the tab's current frame (ETag = content hash, honours If-None-Match)
+    GET /tabs/<i>/frame?since=<h>   304 when <h> is current; when <h> is the previous frame, only the
+                                    changed rectangle, marked by X-Delta-Base and X-Delta-Rect "x,y,w,h"
+
+Frames are PNG (or JPEG) and deduplicated by content hash: an unchanged capture is never
+re-encoded or re-sent.
+
+    python render_server.py [--port 8090] [--width 1920] [--height 1080]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Rendering needs no display; these must be set before Qt starts
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('QTWEBENGINE_CHROMIUM_FLAGS', '--disable-gpu')
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QRect, QSize, QTimer, QUrl
+from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineView
+from config_store import ConfigStore, default_config_path
+from config_watcher import ConfigWatcher
+from profile_factory import get_profile
+
+DEFAULT_PORT = 8090
+DEFAULT_SIZE = (1920, 1080)
+DEFAULT_REFRESH_MS = 60000  # Reload of each tab
+DEFAULT_CAPTURE_MS = 5000  # Re-capture between reloads
+DEFAULT_SETTLE_MS = 1500  # After loadFinished, for scripts to render
+MAX_DELTA_AREA = 0.5  # Larger changes are sent as full frames
+TILE = 32  # px; changed columns are located in tiles of this width
+
+
+def render_server_settings(config):
+    """Return the 'render_server' block of a urls.json mapping ({} when absent)."""
+    return config.get('render_server', {})
+
+
+def encode_image(image, image_format='png', quality=85):
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, 'JPEG' if image_format == 'jpeg' else 'PNG', quality if image_format == 'jpeg' else -1)
+    buffer.close()
+    return bytes(data)
+
+
+def image_bytes(image):
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    return memoryview(bits)
+
+
+def changed_rect(old, new):
+    """Bounding rectangle of the pixels that differ between two RGB32 images, or None if identical."""
+    if old.size() != new.size() or old.format() != new.format():
+        return QRect(0, 0, new.width(), new.height())
+    stride = new.bytesPerLine()
+    old_bits, new_bits = image_bytes(old), image_bytes(new)
+    rows = [y for y in range(new.height()) if old_bits[y * stride:(y + 1) * stride] != new_bits[y * stride:(y + 1) * stride]]
+    if not rows:
+        return None
+    top, bottom = rows[0], rows[-1]
+
+    def column_changed(x):
+        start, end = x * 4, min(x + TILE, new.width()) * 4
+        return any(old_bits[y * stride + start:y * stride + end] != new_bits[y * stride + start:y * stride + end]
+                   for y in rows)
+
+    columns = range(0, new.width(), TILE)
+    left = next(x for x in columns if column_changed(x))
+    right = next(x for x in reversed(columns) if column_changed(x))
+    right = min(right + TILE, new.width())
+    return QRect(left, top, right - left, bottom - top + 1)
+
+
+class Frame:
+    __slots__ = ('hash', 'data', 'content_type', 'updated', 'delta')
+
+    def __init__(self, data, content_type, delta=None):
+        self.hash = hashlib.sha1(data).hexdigest()[:16]
+        self.data = data
+        self.content_type = content_type
+        self.updated = time.time()
+        self.delta = delta  # (base hash, (x, y, w, h), encoded crop) or None
+
+
+class FrameStore:
+    """Latest frame per tab, shared between the Qt thread that renders and the HTTP threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tabs = []  # [{'url': ..., 'frame': Frame or None}]
+        self.timing = {}  # interval and pause_duration for thin clients
+
+    def set_tabs(self, urls, timing):
+        with self.lock:
+            old = {tab['url']: tab['frame'] for tab in self.tabs}
+            self.tabs = [{'url': url, 'frame': old.get(url)} for url in urls]
+            self.timing = dict(timing)
+
+    def publish(self, index, frame):
+        with self.lock:
+            if index < len(self.tabs):
+                self.tabs[index]['frame'] = frame
+
+    def frame(self, index):
+        with self.lock:
+            return self.tabs[index]['frame'] if 0 <= index < len(self.tabs) else None
+
+    def manifest(self):
+        with self.lock:
+            return dict(self.timing, tabs=[
+                {'index': index, 'url': tab['url'],
+                 'hash': tab['frame'].hash if tab['frame'] else None,
+                 'updated': round(tab['frame'].updated, 3) if tab['frame'] else None}
+                for index, tab in enumerate(self.tabs)
+            ])
+
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    store = None  # set on the subclass built by serve_snapshots()
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.end_headers()
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(parts.query)
+
+        if parts.path == '/tabs':
+            body = json.dumps(self.store.manifest()).encode('utf-8')
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_not_modified(etag)
+            else:
+                self.send_body(200, body, 'application/json', {'ETag': etag})
+            return
+
+        match = re.fullmatch(r'/tabs/(\d+)/frame', parts.path)
+        frame = self.store.frame(int(match.group(1))) if match else None
+        if frame is None:
+            self.send_body(404, b'No such frame', 'text/plain')
+            return
+        etag = f'"{frame.hash}"'
+        since = query.get('since', [None])[0]
+        if since == frame.hash or self.headers.get('If-None-Match') == etag:
+            self.send_not_modified(etag)
+        elif since and frame.delta and frame.delta[0] == since:
+            base, rect, data = frame.delta
+            self.send_body(200, data, frame.content_type, {
+                'ETag': etag, 'X-Frame-Hash': frame.hash, 'X-Delta-Base': base,
+                'X-Delta-Rect': ','.join(str(value) for value in rect),
+            })
+        else:
+            self.send_body(200, frame.data, frame.content_type, {'ETag': etag, 'X-Frame-Hash': frame.hash})
+
+
+def serve_snapshots(store, host='0.0.0.0', port=DEFAULT_PORT):
+    """Serve `store` on a background thread; returns the server. Port 0 picks a free port."""
+    handler = type('BoundSnapshotHandler', (SnapshotHandler,), {'store': store})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name='render-server', daemon=True).start()
+    return server
+
+
+class TabRenderer:
+    """One off-screen web view and the last frame captured from it."""
+
+    def __init__(self, render_server, index, url):
+        self.render_server = render_server
+        self.index = index
+        self.url = url
+        self.image = None  # Last captured QImage, for dedup and deltas
+        self.frame = None
+        self.view = QWebEngineView()
+        self.view.setPage(QWebEnginePage(render_server.profile, self.view))
+        self.view.resize(render_server.size)
+        self.view.loadFinished.connect(self.on_load_finished)
+        self.view.show()  # Mapped on the offscreen platform only, so Chromium paints it
+        self.view.load(QUrl(url))
+
+    def on_load_finished(self, ok):
+        QTimer.singleShot(self.render_server.settle_ms, self.capture)
+
+    def reload(self):
+        self.view.reload()
+
+    def capture(self):
+        if self.view is None:
+            return
+        image = self.view.grab().toImage().convertToFormat(QImage.Format_RGB32)
+        if image.isNull():
+            return
+        rect = changed_rect(self.image, image) if self.image is not None else QRect(image.rect())
+        if rect is None:
+            return  # Identical to the published frame
+        server = self.render_server
+        data = encode_image(image, server.image_format, server.quality)
+        frame_hash = hashlib.sha1(data).hexdigest()[:16]
+        if self.frame is not None and frame_hash == self.frame.hash:
+            self.image = image
+            return
+        delta = None
+        if self.frame is not None and rect.width() * rect.height() <= MAX_DELTA_AREA * image.width() * image.height():
+            crop = encode_image(image.copy(rect), server.image_format, server.quality)
+            delta = (self.frame.hash, (rect.x(), rect.y(), rect.width(), rect.height()), crop)
+        self.frame = Frame(data, server.content_type, delta)
+        self.image = image
+        server.store.publish(self.index, self.frame)
+        server.captures += 1
+
+    def close(self):
+        view, self.view = self.view, None
+        view.close()
+        view.deleteLater()
+
+
+class RenderServer:
+    def __init__(self, config_store, settings=None, port=None):
+        settings = settings or {}
+        self.config_store = config_store
+        config = config_store.snapshot()
+        self.profile = get_profile('frontend', config.get('profile'))
+        self.size = QSize(settings.get('width', DEFAULT_SIZE[0]), settings.get('height', DEFAULT_SIZE[1]))
+        self.image_format = settings.get('format', 'png')
+        self.content_type = 'image/jpeg' if self.image_format == 'jpeg' else 'image/png'
+        self.quality = settings.get('quality', 85)
+        self.refresh_ms = settings.get('refresh_ms', DEFAULT_REFRESH_MS)
+        self.settle_ms = settings.get('settle_ms', DEFAULT_SETTLE_MS)
+        self.captures = 0
+        self.renderers = []
+        self.next_reload = 0
+
+        self.store = FrameStore()
+        self.apply_config(None, config)
+        self.http = serve_snapshots(self.store, settings.get('host', '0.0.0.0'), port or settings.get('port', DEFAULT_PORT))
+        self.config_watcher = ConfigWatcher(config_store, self.apply_config)
+
+        # Tabs reload one at a time, spread evenly over refresh_ms
+        self.reload_timer = QTimer()
+        self.reload_timer.timeout.connect(self.reload_next)
+        self.reload_timer.start(max(1000, self.refresh_ms // max(1, len(self.renderers))))
+        self.capture_timer = QTimer()
+        self.capture_timer.timeout.connect(self.capture_all)
+        self.capture_timer.start(settings.get('capture_ms', DEFAULT_CAPTURE_MS))
+
+    def apply_config(self, diff, config):
+        urls = config.get('urls', [])
+        self.store.set_tabs(urls, {
+            'interval': config.get('interval', 5000), 'pause_duration': config.get('pause_duration', 10000),
+        })
+        if urls == [renderer.url for renderer in self.renderers]:
+            return
+        # Keep the renderers of URLs that stay, at their new positions
+        old = {renderer.url: renderer for renderer in self.renderers}
+        renderers = []
+        for index, url in enumerate(urls):
+            renderer = old.pop(url, None) or TabRenderer(self, index, url)
+            renderer.index = index
+            if renderer.frame is not None:
+                self.store.publish(index, renderer.frame)
+            renderers.append(renderer)
+        for renderer in old.values():
+            renderer.close()
+        self.renderers = renderers
+
+    def reload_next(self):
+        if not self.renderers:
+            return
+        self.next_reload %= len(self.renderers)
+        self.renderers[self.next_reload].reload()
+        self.next_reload += 1
+
+    def capture_all(self):
+        for renderer in self.renderers:
+            renderer.capture()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the kiosk tabs headlessly and serve snapshots.")
+    parser.add_argument('--config', default=default_config_path(__file__))
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--width', type=int)
+    parser.add_argument('--height', type=int)
+    args = parser.parse_args(argv)
+
+    app = QApplication(sys.argv[:1])
+    config_store = ConfigStore(args.config)
+    try:
+        config_store.load()
+    except (OSError, ValueError) as e:
+        print(f"Could not read {args.config}: {e}")
+        return 1
+    settings = dict(render_server_settings(config_store.snapshot()))
+    for key in ('width', 'height'):
+        if getattr(args, key):
+            settings[key] = getattr(args, key)
+    server = RenderServer(config_store, settings, args.port)
+    print(f"Render server publishing {len(server.renderers)} tabs on port {server.http.server_address[1]}")
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
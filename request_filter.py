@@ -0,0 +1,210 @@
+# request_filter.py
+
+import fnmatch
+import re
+import threading
+from collections import Counter
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInfo, QWebEngineUrlRequestInterceptor
+
+# Names used for "types" in urls.json rules
+RESOURCE_TYPES = {
+    QWebEngineUrlRequestInfo.ResourceTypeMainFrame: 'main_frame',
+    QWebEngineUrlRequestInfo.ResourceTypeSubFrame: 'sub_frame',
+    QWebEngineUrlRequestInfo.ResourceTypeStylesheet: 'stylesheet',
+    QWebEngineUrlRequestInfo.ResourceTypeScript: 'script',
+    QWebEngineUrlRequestInfo.ResourceTypeImage: 'image',
+    QWebEngineUrlRequestInfo.ResourceTypeFontResource: 'font',
+    QWebEngineUrlRequestInfo.ResourceTypeSubResource: 'sub_resource',
+    QWebEngineUrlRequestInfo.ResourceTypeObject: 'object',
+    QWebEngineUrlRequestInfo.ResourceTypeMedia: 'media',
+    QWebEngineUrlRequestInfo.ResourceTypeWorker: 'worker',
+    QWebEngineUrlRequestInfo.ResourceTypeSharedWorker: 'shared_worker',
+    QWebEngineUrlRequestInfo.ResourceTypePrefetch: 'prefetch',
+    QWebEngineUrlRequestInfo.ResourceTypeFavicon: 'favicon',
+    QWebEngineUrlRequestInfo.ResourceTypeXhr: 'xhr',
+    QWebEngineUrlRequestInfo.ResourceTypePing: 'ping',
+    QWebEngineUrlRequestInfo.ResourceTypeServiceWorker: 'service_worker',
+    QWebEngineUrlRequestInfo.ResourceTypeCspReport: 'csp_report',
+    QWebEngineUrlRequestInfo.ResourceTypePluginResource: 'plugin',
+}
+
+# Blocked requests are never fetched, so their size is unknown; these typical sizes give
+# an estimate of what was saved
+ESTIMATED_BYTES = {
+    'image': 30000, 'font': 40000, 'media': 1000000, 'script': 60000, 'stylesheet': 20000,
+    'sub_frame': 100000, 'xhr': 5000, 'ping': 500, 'csp_report': 500, 'favicon': 2000,
+}
+DEFAULT_ESTIMATED_BYTES = 10000
+
+
+def request_filter_settings(config):
+    """Return the 'request_filter' block of a urls.json mapping, or None when disabled."""
+    settings = config.get('request_filter', {})
+    if not settings.get('enabled', False):
+        return None
+    return settings
+
+
+class RuleSet:
+    """
+    Rules compiled into a host-suffix index.
+
+    A rule is a dict with any of "host" ("example.com" or "*.example.com", both matching the
+    domain and its subdomains), "path" (a glob such as "/rest/analytics/*"), "types" (resource
+    type names) and "action" ("block", the default, or "allow"). A request matches a rule when
+    every condition given matches; any matching allow rule wins over block rules.
+    """
+
+    def __init__(self, rules):
+        self.by_host = {}  # host suffix -> [(action, path regex, types)]
+        self.any_host = []
+        for rule in rules:
+            action = rule.get('action', 'block')
+            if action not in ('block', 'allow'):
+                print(f"Ignoring request filter rule with unknown action: {rule}")
+                continue
+            path = rule.get('path')
+            types = rule.get('types')
+            compiled = (
+                action,
+                re.compile(fnmatch.translate(path)) if path else None,
+                frozenset(types) if types else None,
+            )
+            host = (rule.get('host') or '').lower()
+            if host.startswith('*.'):
+                host = host[2:]
+            if host:
+                self.by_host.setdefault(host, []).append(compiled)
+            else:
+                self.any_host.append(compiled)
+
+    def candidates(self, host):
+        yield from self.any_host
+        labels = host.split('.')
+        for i in range(len(labels)):
+            yield from self.by_host.get('.'.join(labels[i:]), ())
+
+    def match(self, host, path, resource_type):
+        """Return 'allow', 'block' or None for a request."""
+        decision = None
+        for action, path_regex, types in self.candidates(host):
+            if types is not None and resource_type not in types:
+                continue
+            if path_regex is not None and not path_regex.match(path):
+                continue
+            if action == 'allow':
+                return 'allow'
+            decision = 'block'
+        return decision
+
+
+class FilterStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.allowed = 0
+        self.blocked = 0
+        self.bytes_saved = 0  # Estimated, see ESTIMATED_BYTES
+        self.blocked_types = Counter()
+
+
+class TabRequestInterceptor(QWebEngineUrlRequestInterceptor):
+    """Installed on each page of one tab; applies the rules for the tab's configured URL."""
+
+    def __init__(self, request_filter, host, parent=None):
+        super().__init__(parent)
+        self.request_filter = request_filter
+        self.host = host
+
+    def interceptRequest(self, info):
+        resource_type = RESOURCE_TYPES.get(info.resourceType(), 'other')
+        stats = self.request_filter.stats_for(self.host)
+        # The tab's own document is never blocked
+        if resource_type != 'main_frame':
+            url = info.requestUrl()
+            rule_set = self.request_filter.rule_set_for(self.host.url)
+            if rule_set.match(url.host().lower(), url.path(), resource_type) == 'block':
+                info.block(True)
+                with stats.lock:
+                    stats.blocked += 1
+                    stats.bytes_saved += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+                    stats.blocked_types[resource_type] += 1
+                return
+        with stats.lock:
+            stats.allowed += 1
+
+
+class RequestFilter:
+    """
+    Filters what the kiosk's pages load using global and per-URL rules from urls.json.
+
+    Each page the view pool creates gets an interceptor bound to its tab, so requests are
+    counted per tab and per-URL rules follow the tab's configured URL. Rule sets are compiled
+    once per distinct URL.
+    """
+
+    def __init__(self, view_pool, rules=None, per_url=None, report_interval=300000):
+        self.view_pool = view_pool
+        self.global_rules = list(rules or [])
+        self.per_url = dict(per_url or {})  # configured URL -> extra rules
+        self.lock = threading.Lock()
+        self.rule_sets = {}  # configured URL -> RuleSet
+        self.global_rule_set = RuleSet(self.global_rules)
+        self.stats = {}  # host -> FilterStats
+
+        view_pool.page_hooks.append(self.watch_page)
+        for host in view_pool.lru:
+            self.watch_page(host.view.page(), host)
+
+        self.reported = None
+        self.report_timer = QTimer()
+        self.report_timer.timeout.connect(self.report)
+        self.report_timer.start(report_interval)
+
+    def watch_page(self, page, host):
+        page.setUrlRequestInterceptor(TabRequestInterceptor(self, host, page))
+
+    def rule_set_for(self, url):
+        if url not in self.per_url:
+            return self.global_rule_set
+        with self.lock:
+            rule_set = self.rule_sets.get(url)
+            if rule_set is None:
+                rule_set = self.rule_sets[url] = RuleSet(self.global_rules + list(self.per_url[url]))
+            return rule_set
+
+    def stats_for(self, host):
+        with self.lock:
+            stats = self.stats.get(host)
+            if stats is None:
+                stats = self.stats[host] = FilterStats()
+            return stats
+
+    def forget(self, host):
+        with self.lock:
+            self.stats.pop(host, None)
+
+    def summary(self):
+        summaries = []
+        for index, host in enumerate(self.view_pool.hosts):
+            stats = self.stats.get(host)
+            if stats is None:
+                continue
+            with stats.lock:
+                summaries.append({
+                    'tab': index, 'url': host.url, 'allowed': stats.allowed, 'blocked': stats.blocked,
+                    'bytes_saved': stats.bytes_saved, 'blocked_types': dict(stats.blocked_types),
+                })
+        return summaries
+
+    def report(self):
+        summary = self.summary()
+        totals = [(entry['allowed'], entry['blocked']) for entry in summary]
+        if totals == self.reported:
+            return
+        self.reported = totals
+        print("Request filter: " + ', '.join(
+            f"tab {entry['tab'] + 1} {entry['blocked']} blocked / {entry['allowed']} allowed "
+            f"(~{entry['bytes_saved'] / 1048576:.1f} MB saved)"
+            for entry in summary
+        ))
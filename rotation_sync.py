@@ -0,0 +1,368 @@
+# rotation_sync.py
+
+"""
+Keeps the rotation of several kiosks (or several screens of one machine) in step.
+
+One kiosk is the leader and owns the rotation clock: slot k starts at `epoch + k * interval` on
+the leader's monotonic clock. Followers learn the offset between their clock and the leader's
+with NTP-style UDP pings (the sample with the lowest round trip wins), then switch on the
+leader's slot boundaries using precise local timers, so screens change within a few ms of
+each other without any message being sent at the switch itself.
+
+    follower -> leader  {"v": 1, "type": "ping", "seq": 3, "t0": <follower clock>, "screen": 1}
+    leader -> follower  {"v": 1, "type": "pong", "seq": 3, "t0": ..., "t1": <leader clock>, "state": {...}}
+    leader -> followers {"v": 1, "type": "state", "state": {...}}  (pushed on pause, resume or interval change)
+
+The state carries the leader's id, epoch, interval and pause. A follower that stops hearing
+from the leader keeps rotating on its last estimate and re-synchronises when pongs return; a
+restarted leader (new id) is detected and its clock learnt afresh. Each screen maps slots to
+its own tabs through an optional plan, and refreshes the upcoming tab `screen * stagger_ms`
+earlier than screen 0 so a wall of kiosks does not hit Jira in the same second.
+"""
+
+import json
+import math
+import time
+import uuid
+from collections import deque
+from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtNetwork import QHostAddress, QUdpSocket
+
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 45454
+DEFAULT_STAGGER_MS = 1500
+FAST_PING_INTERVAL = 250  # ms, until the clock offset is known
+PING_INTERVAL = 2000  # ms once in sync
+LOST_AFTER = 3  # missed pongs before a follower considers itself out of sync
+OFFSET_SAMPLES = 16
+FOLLOWER_TIMEOUT = 10  # s without a ping before the leader stops pushing state to a follower
+BOUNDARY_TOLERANCE = 0.002  # s; a timer firing this close to a boundary counts as on it
+
+
+def sync_settings(config):
+    """Return the 'sync' block of a urls.json mapping, or None when disabled."""
+    settings = config.get('sync', {})
+    if not settings.get('enabled', False):
+        return None
+    return settings
+
+
+def parse_address(address, default_port=DEFAULT_PORT):
+    host, _, port = str(address).rpartition(':')
+    if not host:
+        return str(address), default_port
+    return host, int(port)
+
+
+def clock():
+    return time.monotonic()
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+class RotationState:
+    """The leader's rotation clock, as shared with followers."""
+
+    def __init__(self, leader_id, epoch, interval_ms, paused=False, paused_slot=0):
+        self.leader_id = leader_id
+        self.epoch = epoch  # Leader clock (s) at which slot 0 started
+        self.interval_ms = interval_ms
+        self.paused = paused
+        self.paused_slot = paused_slot
+
+    @classmethod
+    def from_dict(cls, data):
+        """Raises ValueError unless `data` is a state as sent by a leader."""
+        if not isinstance(data, dict) or not isinstance(data.get('id'), str):
+            raise ValueError("state without a leader id")
+        if not is_number(data.get('epoch')) or not is_number(data.get('interval_ms')) or data['interval_ms'] <= 0:
+            raise ValueError("state without a valid epoch and interval")
+        slot = data.get('slot', 0)
+        return cls(data['id'], data['epoch'], data['interval_ms'], bool(data.get('paused', False)),
+                   slot if isinstance(slot, int) and not isinstance(slot, bool) else 0)
+
+    def key(self):
+        """Identifies one schedule; slots of the same schedule only ever move forward."""
+        return self.leader_id, self.epoch, self.interval_ms, self.paused
+
+    def to_dict(self):
+        return {'id': self.leader_id, 'epoch': self.epoch, 'interval_ms': self.interval_ms,
+                'paused': self.paused, 'slot': self.paused_slot}
+
+    def slot_at(self, leader_time):
+        if self.paused or self.interval_ms <= 0:
+            return self.paused_slot
+        return math.floor((leader_time - self.epoch) * 1000 / self.interval_ms)
+
+    def slot_start(self, slot):
+        return self.epoch + slot * self.interval_ms / 1000
+
+
+class ClockOffset:
+    """Follower clock -> leader clock offset from the ping with the shortest round trip."""
+
+    def __init__(self):
+        self.samples = deque(maxlen=OFFSET_SAMPLES)  # (round trip s, offset s)
+
+    def add(self, t0, t1, t2):
+        round_trip = t2 - t0
+        self.samples.append((round_trip, t1 - (t0 + t2) / 2))
+
+    def clear(self):
+        self.samples.clear()
+
+    @property
+    def known(self):
+        return bool(self.samples)
+
+    def best(self):
+        """(offset s, error bound s) of the best sample."""
+        round_trip, offset = min(self.samples)
+        return offset, round_trip / 2
+
+
+class RotationSync:
+    """
+    Drives an AutoTabSwitcher's tab changes from the shared rotation clock.
+
+    role is 'leader' or 'follower'. The leader listens on `port`; followers ping `leader`
+    ("host:port") from an ephemeral port. `plan` lists the tab indices this screen shows in
+    consecutive slots (all tabs in order by default).
+    """
+
+    def __init__(self, auto_switcher, role='leader', leader=None, port=DEFAULT_PORT, screen=0,
+                 stagger_ms=DEFAULT_STAGGER_MS, plan=None):
+        if role not in ('leader', 'follower'):
+            raise ValueError(f"Unknown sync role '{role}'")
+        self.auto_switcher = auto_switcher
+        self.role = role
+        self.screen = screen
+        self.plan = list(plan) if plan else None
+        self.leader_address = parse_address(leader or f'127.0.0.1:{port}', port)
+        self.leader_host = QHostAddress(self.leader_address[0])
+        # Until a follower hears from the leader it rotates on a clock of its own
+        self.state = RotationState(uuid.uuid4().hex if role == 'leader' else None, clock(), auto_switcher.interval,
+                                   paused=auto_switcher.is_paused)
+        self.offset = ClockOffset()
+        self.in_sync = role == 'leader'
+        self.paused_by_leader = False
+        self.followers = {}  # (host, port) -> clock of last ping
+        self.ping_seq = 0
+        self.last_pong_seq = 0
+        self.shown_slot = None
+        self.shown_key = None
+
+        auto_switcher.sync = self
+        auto_switcher.refresh_stagger = screen * stagger_ms
+
+        self.socket = QUdpSocket()
+        if role == 'leader':
+            if not self.socket.bind(QHostAddress.Any, port):
+                print(f"Rotation sync could not listen on port {port}: {self.socket.errorString()}")
+        else:
+            self.socket.bind(QHostAddress.Any, 0)
+        self.socket.readyRead.connect(self.read_datagrams)
+
+        self.switch_timer = QTimer()
+        self.switch_timer.setSingleShot(True)
+        self.switch_timer.setTimerType(Qt.PreciseTimer)
+        self.switch_timer.timeout.connect(self.on_slot_boundary)
+
+        self.ping_timer = QTimer()
+        self.ping_timer.timeout.connect(self.ping)
+        if role == 'follower':
+            self.ping_timer.start(FAST_PING_INTERVAL)
+            self.ping()
+        self.schedule()
+
+    # Clock
+
+    def leader_time(self):
+        if self.role == 'leader' or not self.offset.known:
+            return clock()
+        return clock() + self.offset.best()[0]
+
+    def tab_for_slot(self, slot):
+        total = self.auto_switcher.total_tabs
+        if total == 0:
+            return None
+        plan = [index for index in (self.plan or ()) if 0 <= index < total] or range(total)
+        return plan[slot % len(plan)]
+
+    def next_tab(self):
+        """The tab the next slot shows, so it can be refreshed in time."""
+        return self.tab_for_slot(self.state.slot_at(self.leader_time()) + 1)
+
+    def schedule(self):
+        """Show the current slot's tab and arm the timer for the next boundary."""
+        self.switch_timer.stop()
+        now = self.leader_time()
+        slot = self.state.slot_at(now + BOUNDARY_TOLERANCE)
+        if self.shown_key == self.state.key() and self.shown_slot is not None:
+            # A refined clock offset must not step back over a boundary that was already shown
+            slot = max(slot, self.shown_slot)
+        self.show_slot(slot)
+        if self.state.paused or self.state.interval_ms <= 0 or self.auto_switcher.is_paused:
+            return
+        delay = (self.state.slot_start(slot + 1) - now) * 1000
+        self.switch_timer.start(max(0, int(math.ceil(delay))))
+
+    def on_slot_boundary(self):
+        self.schedule()
+
+    def show_slot(self, slot):
+        if (slot == self.shown_slot and self.shown_key == self.state.key()) or self.auto_switcher.is_paused:
+            return
+        self.shown_slot = slot
+        self.shown_key = self.state.key()
+        tab = self.tab_for_slot(slot)
+        if tab is not None:
+            self.auto_switcher.switch_to(tab)
+
+    # Pause and interval, driven by the local switcher
+
+    def set_paused(self, paused):
+        if self.role == 'follower':
+            # A follower pauses on its own; resuming rejoins the shared clock
+            if not paused:
+                self.paused_by_leader = False
+                self.shown_slot = None
+                self.schedule()
+            else:
+                self.switch_timer.stop()
+            return
+        if paused == self.state.paused:
+            if not paused:
+                self.schedule()
+            return
+        now = clock()
+        if paused:
+            self.state.paused_slot = self.state.slot_at(now)
+            self.state.paused = True
+            self.switch_timer.stop()
+        else:
+            # The slot that was paused gets a full interval from now
+            self.state.epoch = now - self.state.paused_slot * self.state.interval_ms / 1000
+            self.state.paused = False
+            self.schedule()
+        self.push_state()
+
+    def set_interval(self, interval_ms):
+        if self.role == 'follower' or interval_ms == self.state.interval_ms:
+            return
+        now = clock()
+        slot = self.state.slot_at(now)
+        # Keep the current slot and start the new cadence from now
+        self.state.epoch = now - slot * interval_ms / 1000
+        self.state.interval_ms = interval_ms
+        self.schedule()
+        self.push_state()
+
+    # Network
+
+    def send(self, message, address):
+        host, port = address
+        self.socket.writeDatagram(json.dumps(message, separators=(',', ':')).encode('utf-8'),
+                                  QHostAddress(host), port)
+
+    def push_state(self):
+        now = clock()
+        for address, last_seen in list(self.followers.items()):
+            if now - last_seen > FOLLOWER_TIMEOUT:
+                del self.followers[address]
+                continue
+            self.send({'v': PROTOCOL_VERSION, 'type': 'state', 'state': self.state.to_dict()}, address)
+
+    def ping(self):
+        if self.ping_seq - self.last_pong_seq >= LOST_AFTER and self.in_sync:
+            self.in_sync = False
+            self.ping_timer.start(FAST_PING_INTERVAL)
+            print("Rotation sync: lost the leader, rotating on the last known clock")
+        self.ping_seq += 1
+        self.send({'v': PROTOCOL_VERSION, 'type': 'ping', 'seq': self.ping_seq, 't0': clock(),
+                   'screen': self.screen}, self.leader_address)
+
+    def read_datagrams(self):
+        while self.socket.hasPendingDatagrams():
+            data, host, port = self.socket.readDatagram(self.socket.pendingDatagramSize())
+            try:
+                message = json.loads(data.decode('utf-8'))
+            except ValueError:
+                continue
+            if not isinstance(message, dict) or message.get('v') != PROTOCOL_VERSION:
+                continue
+            try:
+                self.handle_datagram(message, host, port)
+            except Exception as e:
+                # A slot must not raise; one bad datagram is dropped, not the kiosk
+                print(f"Rotation sync: ignored a datagram from {host.toString()}:{port}: {e!r}")
+
+    def from_leader(self, host, port):
+        # Tolerant so an IPv4 leader still matches when it arrives as ::ffff:a.b.c.d
+        return port == self.leader_address[1] and self.leader_host.isEqual(host, QHostAddress.TolerantConversion)
+
+    def handle_datagram(self, message, host, port):
+        kind = message.get('type')
+        if self.role == 'leader' and kind == 'ping':
+            if not is_number(message.get('t0')):
+                return
+            self.followers[(host.toString(), port)] = clock()
+            self.send({'v': PROTOCOL_VERSION, 'type': 'pong', 'seq': message.get('seq'), 't0': message['t0'],
+                       't1': clock(), 'state': self.state.to_dict()}, (host.toString(), port))
+        elif self.role == 'follower' and kind in ('pong', 'state'):
+            if not self.from_leader(host, port):
+                return  # Only the configured leader may move this kiosk's rotation
+            if kind == 'pong':
+                self.on_pong(message, clock())
+            else:
+                self.apply_state(RotationState.from_dict(message.get('state')))
+
+    def on_pong(self, message, t2):
+        if not is_number(message.get('t0')) or not is_number(message.get('t1')):
+            raise ValueError("pong without t0 and t1")
+        seq = message.get('seq')
+        if not isinstance(seq, int) or isinstance(seq, bool):
+            raise ValueError("pong without a sequence number")
+        state = RotationState.from_dict(message.get('state'))
+        if state.leader_id != self.state.leader_id:
+            self.offset.clear()  # A new leader process means a new clock
+        self.offset.add(message['t0'], message['t1'], t2)
+        self.last_pong_seq = max(self.last_pong_seq, seq)
+        if not self.in_sync and len(self.offset.samples) >= 4:
+            self.in_sync = True
+            self.ping_timer.start(PING_INTERVAL)
+            offset, error = self.offset.best()
+            print(f"Rotation sync: following {self.leader_address[0]}:{self.leader_address[1]} "
+                  f"(±{error * 1000:.1f} ms)")
+        self.apply_state(state)
+
+    def apply_state(self, state):
+        if state.paused and not self.auto_switcher.is_paused:
+            self.paused_by_leader = True
+            self.state = state
+            self.auto_switcher.stop_timers()
+            return
+        if not state.paused and self.paused_by_leader:
+            self.state = state
+            self.auto_switcher.start_timers()  # Reschedules through set_paused
+            return
+        self.state = state
+        self.auto_switcher.interval = state.interval_ms
+        self.schedule()
+
+    def status(self):
+        offset, error = self.offset.best() if self.offset.known else (0, None)
+        return {
+            'role': self.role, 'screen': self.screen, 'in_sync': self.in_sync,
+            'slot': self.state.slot_at(self.leader_time()), 'interval_ms': self.state.interval_ms,
+            'paused': self.state.paused, 'offset_ms': round(offset * 1000, 3),
+            'error_ms': round(error * 1000, 3) if error is not None else None,
+            'followers': len(self.followers),
+        }
+
+    def stop(self):
+        self.switch_timer.stop()
+        self.ping_timer.stop()
+        self.socket.close()
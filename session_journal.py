@@ -0,0 +1,296 @@
+# session_journal.py
+
+import hashlib
+import json
+import os
+import time
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import QEvent, QObject, QTimer, Qt
+
+DEFAULT_INTERVAL = 10000  # ms between journal writes (skipped when nothing changed)
+DEFAULT_FRAME_WIDTH = 480  # px
+DEFAULT_FRAME_QUALITY = 70
+DEFAULT_FRAME_INTERVAL = 60000  # ms a tab's last frame is kept before it is captured again
+DEFAULT_SETTLE_MS = 1500  # ms after a switch before the shown tab is captured
+DEFAULT_MAX_AGE = 86400  # s after which a journal is too old to resume from
+SPLASH_TIMEOUT = 20000  # ms the splash may cover a tab that never finishes loading
+
+JOURNAL_VERSION = 1
+
+
+def session_journal_settings(config):
+    """Return the 'session_journal' block of a urls.json mapping, or None when disabled."""
+    settings = config.get('session_journal', {})
+    if not settings.get('enabled', False):
+        return None
+    return settings
+
+
+def valid_session(session):
+    """True if `session` has the shape snapshot() writes, so resuming from it cannot fail."""
+    if not isinstance(session, dict) or session.get('version') != JOURNAL_VERSION:
+        return False
+    number = (int, float)
+    if not isinstance(session.get('saved_at', 0), number) or not isinstance(session.get('current_index', 0), int):
+        return False
+    tabs = session.get('tabs', [])
+    if not isinstance(tabs, list):
+        return False
+    for tab in tabs:
+        if not isinstance(tab, dict) or not isinstance(tab.get('url'), str):
+            return False
+        if not isinstance(tab.get('current_url', ''), (str, type(None))):
+            return False
+        if not isinstance(tab.get('frame', ''), (str, type(None))) or '/' in (tab.get('frame') or ''):
+            return False  # A frame is a file name inside the journal directory
+        if not isinstance(tab.get('ui_state', []), list):
+            return False
+    return True
+
+
+def write_atomically(path, data):
+    """Replace `path` with `data` (bytes) so a crash leaves either the old or the new file."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class SessionJournal(QObject):
+    """
+    Persists where the kiosk was so a restart resumes there instead of at tab 0.
+
+    Every `interval` ms the rotation state (shown tab, paused, custom links) and each tab's
+    scroll and panel state (from the view pool's UiStateStore) are written to `journal.json`
+    in `directory`, atomically and only when they changed. A tab is also captured as a
+    downscaled JPEG once it has settled on screen, at most every `frame_interval` ms.
+
+    On startup load() returns the last session unless it is missing, unreadable or older than
+    `max_age` seconds; resume_index() and restore_ui_state() apply it before the first tab is
+    built, resume() once the rotation exists, and show_splash() covers the stack with the
+    shown tab's last frame until its page has loaded. Tabs are matched by their configured
+    URL, so a session survives tabs being added, removed or reordered in between.
+    """
+
+    def __init__(self, directory, interval=DEFAULT_INTERVAL, frame_width=DEFAULT_FRAME_WIDTH,
+                 frame_quality=DEFAULT_FRAME_QUALITY, frame_interval=DEFAULT_FRAME_INTERVAL,
+                 settle_ms=DEFAULT_SETTLE_MS, max_age=DEFAULT_MAX_AGE):
+        super().__init__()
+        self.directory = directory
+        self.journal_path = os.path.join(directory, 'journal.json')
+        self.interval = interval
+        self.frame_width = frame_width
+        self.frame_quality = frame_quality
+        self.frame_interval = frame_interval / 1000
+        self.settle_ms = settle_ms
+        self.max_age = max_age
+        self.auto_switcher = None
+        self.view_pool = None
+        self.frames = {}  # url -> (frame file name, monotonic capture time)
+        self.last_written = None
+        self.writes = 0
+        self.splash = None
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.save)
+        self.capture_timer = QTimer()
+        self.capture_timer.setSingleShot(True)
+        self.capture_timer.timeout.connect(self.capture_shown)
+
+    # Restoring
+
+    def load(self):
+        try:
+            with open(self.journal_path, 'r') as f:
+                session = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Could not read session journal {self.journal_path}: {e}")
+            return None
+        if not valid_session(session):
+            print(f"Ignoring session journal {self.journal_path}: not a journal this version wrote")
+            return None
+        if time.time() - session.get('saved_at', 0) > self.max_age:
+            return None
+        # Frames from the last session stay valid until they are replaced
+        self.frames = {tab['url']: (tab['frame'], 0) for tab in session.get('tabs', []) if tab.get('frame')}
+        return session
+
+    def match_tabs(self, session, urls):
+        """Map each of the session's tabs to the index of the same configured URL, or None."""
+        used = set()
+        matches = []
+        for tab in session.get('tabs', []):
+            index = next((i for i, url in enumerate(urls) if url == tab['url'] and i not in used), None)
+            if index is not None:
+                used.add(index)
+            matches.append(index)
+        return matches
+
+    def resume_index(self, session, urls):
+        """Index of the tab that was shown, among `urls`; 0 if it is no longer configured."""
+        tabs = session.get('tabs', [])
+        shown = session.get('current_index', 0)
+        if not 0 <= shown < len(tabs):
+            return 0
+        index = self.match_tabs(session, urls)[shown]
+        return index if index is not None else 0
+
+    def restore_ui_state(self, session, view_pool):
+        """Seed the UI state store so pages restore their scroll and panels as they load."""
+        if view_pool.ui_state is None:
+            return
+        urls = [host.url for host in view_pool.hosts]
+        for tab, index in zip(session.get('tabs', []), self.match_tabs(session, urls)):
+            if index is not None and tab.get('ui_state'):
+                view_pool.ui_state.states[view_pool.host(index)] = tuple(tab['ui_state'])
+
+    def resume(self, auto_switcher, session):
+        """Put the rotation back where it was; the pool has already shown the resumed tab."""
+        urls = auto_switcher.default_urls
+        auto_switcher.current_index = self.resume_index(session, urls)
+        matches = zip(session.get('tabs', []), self.match_tabs(session, urls))
+        custom = [(index, tab['current_url']) for tab, index in matches
+                  if index is not None and tab.get('current_url') and tab['current_url'] != tab['url']]
+        for index, url in custom:
+            # Custom links revert after the pause duration, as they would have
+            auto_switcher.open_custom_link(index, url)
+        if custom:
+            return
+        if session.get('is_paused'):
+            auto_switcher.stop_timers()
+        elif auto_switcher.interval > 0:
+            # Restart so the next switch and refresh are timed from the resumed tab
+            auto_switcher.start_timers()
+
+    def show_splash(self, session, stacked_widget, view):
+        """Cover the stack with the shown tab's last frame until `view` has loaded."""
+        tabs = session.get('tabs', [])
+        shown = session.get('current_index', 0)
+        if not 0 <= shown < len(tabs) or not tabs[shown].get('frame'):
+            return
+        pixmap = QPixmap(os.path.join(self.directory, tabs[shown]['frame']))
+        if pixmap.isNull():
+            return
+        self.splash = FrameSplash(stacked_widget, pixmap)
+        signal = getattr(view, 'loadFinished', None)
+        if signal is not None:
+            signal.connect(self.dismiss_splash)
+            QTimer.singleShot(SPLASH_TIMEOUT, self.dismiss_splash)
+        else:
+            # Native boards draw their first rows without a page load
+            QTimer.singleShot(self.settle_ms, self.dismiss_splash)
+
+    def dismiss_splash(self, ok=True):
+        if self.splash is None:
+            return
+        self.splash.hide()
+        self.splash.deleteLater()
+        self.splash = None
+
+    # Recording
+
+    def start(self, auto_switcher, view_pool):
+        self.auto_switcher = auto_switcher
+        self.view_pool = view_pool
+        os.makedirs(self.directory, exist_ok=True)
+        # Frames of tabs that are no longer configured
+        configured = {self.frames[url][0] for url in auto_switcher.default_urls if url in self.frames}
+        for name in os.listdir(self.directory):
+            if name.endswith('.jpg') and name not in configured:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+        auto_switcher.stacked_widget.currentChanged.connect(lambda index: self.capture_timer.start(self.settle_ms))
+        self.capture_timer.start(self.settle_ms)
+        self.timer.start(self.interval)
+
+    def snapshot(self):
+        switcher = self.auto_switcher
+        ui_states = self.view_pool.ui_state.states if self.view_pool.ui_state is not None else {}
+        tabs = []
+        for index, host in enumerate(self.view_pool.hosts):
+            tab = {'url': switcher.default_urls[index], 'current_url': switcher.current_urls[index]}
+            if host in ui_states:
+                tab['ui_state'] = list(ui_states[host])
+            frame = self.frames.get(switcher.default_urls[index])
+            if frame:
+                tab['frame'] = frame[0]
+            tabs.append(tab)
+        return {
+            'version': JOURNAL_VERSION,
+            'current_index': switcher.current_index,
+            'is_paused': switcher.is_paused,
+            'tabs': tabs,
+        }
+
+    def save(self):
+        if self.auto_switcher is None:
+            return
+        snapshot = self.snapshot()
+        key = json.dumps(snapshot, sort_keys=True)
+        if key == self.last_written:
+            return  # Nothing changed; a rotating wallboard spends most ticks here
+        snapshot['saved_at'] = time.time()
+        try:
+            write_atomically(self.journal_path, json.dumps(snapshot).encode('utf-8'))
+        except OSError as e:
+            print(f"Could not write session journal {self.journal_path}: {e}")
+            return
+        self.last_written = key
+        self.writes += 1
+
+    def capture_shown(self):
+        switcher = self.auto_switcher
+        index = switcher.current_index
+        if not 0 <= index < switcher.total_tabs or self.splash is not None:
+            return
+        host = self.view_pool.host(index)
+        url = switcher.default_urls[index]
+        if host.view is None or not host.isVisible() or switcher.current_urls[index] != url:
+            return  # Nothing built yet, or showing a custom link rather than the tab itself
+        frame = self.frames.get(url)
+        if frame and time.monotonic() - frame[1] < self.frame_interval:
+            return
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16] + '.jpg'
+        image = host.grab().toImage().scaledToWidth(self.frame_width, Qt.SmoothTransformation)
+        path = os.path.join(self.directory, name)
+        temp_path = f"{path}.{os.getpid()}.tmp.jpg"
+        if not image.save(temp_path, 'JPEG', self.frame_quality):
+            print(f"Could not write frame {temp_path}")
+            return
+        os.replace(temp_path, path)
+        self.frames[url] = (name, time.monotonic())
+
+    def stop(self):
+        self.timer.stop()
+        self.capture_timer.stop()
+        self.save()
+
+
+class FrameSplash(QLabel):
+    """The last captured frame of a tab, scaled over the whole stack while the tab loads."""
+
+    def __init__(self, parent, pixmap):
+        super().__init__(parent)
+        self.frame = pixmap
+        self.setAlignment(Qt.AlignCenter)
+        self.setStyleSheet("background-color: black;")
+        parent.installEventFilter(self)
+        self.fit()
+        self.show()
+        self.raise_()
+
+    def fit(self):
+        self.setGeometry(self.parentWidget().rect())
+        self.setPixmap(self.frame.scaled(self.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+    def eventFilter(self, watched, event):
+        if watched is self.parentWidget() and event.type() == QEvent.Resize:
+            self.fit()
+        return False
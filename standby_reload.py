@@ -0,0 +1,104 @@
+# standby_reload.py
+
+import time
+from collections import deque
+from functools import partial
+from PyQt5.QtCore import QTimer, QUrl
+
+
+class LoadLatencyEstimator:
+    """Rolling per-URL load latency, used to decide how early a background reload must start."""
+
+    def __init__(self, window=10, default_ms=2500, margin_ms=500):
+        self.window = window
+        self.default_ms = default_ms
+        self.margin_ms = margin_ms
+        self.samples = {}  # url -> deque of recent load times in ms
+
+    def record(self, url, elapsed_ms):
+        self.samples.setdefault(url, deque(maxlen=self.window)).append(elapsed_ms)
+
+    def estimate(self, url):
+        """90th percentile of the recent load times for `url`, or the default when unknown."""
+        samples = self.samples.get(url)
+        if not samples:
+            return self.default_ms
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+
+    def lead_time(self, url):
+        return int(self.estimate(url)) + self.margin_ms
+
+
+class StandbyReloader:
+    """
+    Reloads a tab into a hidden standby page and swaps it into the view once loaded.
+
+    The stale page stays on screen until the standby page has fired loadFinished(True)
+    and had `settle_ms` to finish rendering, so the displayed view never shows a load.
+    """
+
+    def __init__(self, view_pool, latency, settle_ms=300):
+        self.view_pool = view_pool
+        self.latency = latency
+        self.settle_ms = settle_ms
+        # Keyed by tab host rather than index so reloads survive tabs being reordered
+        self.pending = {}  # host -> (standby page, loadFinished slot)
+        self.finished_hooks = []  # callables(host) run when a standby load is swapped in or dropped
+
+    def reload(self, index):
+        view = self.view_pool.view_for(index)
+        host = self.view_pool.host(index)
+        if view is None or host in self.pending:
+            # Released tabs are rebuilt fresh on demand; in-flight reloads are left alone
+            return
+
+        # The tab's own URL rather than view.url(): a redirect or login page must not stick,
+        # and latency is looked up by the URL the rotation knows the tab by
+        url = host.url
+        # Parent the standby page to the host, which outlives a released view; it restores
+        # the tab's scroll and panel state itself when the pool has a UI state store
+        page = self.view_pool.create_page(host, host)
+        slot = partial(self.on_standby_loaded, host, page, url, time.monotonic())
+        page.loadFinished.connect(slot)
+        self.pending[host] = (page, slot)
+        page.setUrl(QUrl(url))
+
+    def on_standby_loaded(self, host, page, url, started, ok):
+        if self.pending.get(host, (None,))[0] is not page:
+            return
+        if not ok:
+            # Keep the stale content on screen and try again next cycle
+            self.cancel(host)
+            return
+
+        self.latency.record(url, (time.monotonic() - started) * 1000)
+        QTimer.singleShot(self.settle_ms, partial(self.swap, host, page))
+
+    def swap(self, host, page):
+        if self.pending.get(host, (None,))[0] is not page:
+            return
+        _, slot = self.pending.pop(host)
+        page.loadFinished.disconnect(slot)
+        index = self.view_pool.index_of(host)
+        if index is None or self.view_pool.view_for(index) is None:
+            page.deleteLater()
+        else:
+            self.view_pool.swap_page(index, page)
+        self.notify_finished(host)
+
+    def cancel(self, host):
+        """Drop an in-flight standby load, e.g. because its tab is being removed."""
+        if host not in self.pending:
+            return
+        page, slot = self.pending.pop(host)
+        page.loadFinished.disconnect(slot)
+        page.deleteLater()
+        self.notify_finished(host)
+
+    def notify_finished(self, host):
+        for hook in self.finished_hooks:
+            hook(host)
+
+    def is_pending(self, index):
+        return self.view_pool.host(index) in self.pending
@@ -0,0 +1,158 @@
+# startup_benchmark.py
+
+"""
+Cold and warm start-up benchmark for the kiosk entry points.
+
+Starts a fake Jira (fake_jira.py), writes a urls.json pointing at it into a scratch
+directory and launches the chosen script repeatedly under QT_QPA_PLATFORM=offscreen. Each
+run exits as soon as every tab it opened has loaded and leaves a startup_profiler report.
+
+Cold runs start from an empty browser profile (no HTTP cache, cookies or storage); warm
+runs reuse the profile of a priming run. Python's bytecode cache and the OS page cache
+are not cleared, so "cold" measures the kiosk's own state, not a fresh boot.
+
+By default it measures the wallboard (Works); pass --script to time another entry point.
+
+    python startup_benchmark.py [--script Works] [--runs 5] [--tabs 3] [--json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from fake_jira import serve
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def phase_key(phase):
+    return f"{phase['name']}[{phase['tab']}]" if 'tab' in phase else phase['name']
+
+
+def write_config(path, base_url, tabs, storage_path):
+    try:
+        with open(os.path.join(HERE, 'urls.json'), 'r') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        config = {}
+    config.update({
+        'urls': [f"{base_url}/browse/XCH-{number}?filter=-5" for number in range(1, tabs + 1)],
+        'interval': 0,  # No rotation while measuring
+        'change_detection': {'enabled': False},
+        'live_patch': False,
+        'profile': dict(config.get('profile') or {}, storage_path=storage_path),
+    })
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=4)
+
+
+def run_once(script, config_path, report_path, timeout):
+    """Launch `script` once; returns its startup report, or None if it failed or timed out."""
+    if os.path.exists(report_path):
+        os.remove(report_path)
+    env = dict(
+        os.environ,
+        QT_QPA_PLATFORM='offscreen',
+        KIOSK_CONFIG=config_path,
+        KIOSK_STARTUP_REPORT=report_path,
+        KIOSK_STARTUP_EXIT='1',
+        KIOSK_LAUNCH_TIME=repr(time.time()),
+    )
+    try:
+        subprocess.run([sys.executable, script], env=env, timeout=timeout, cwd=HERE,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except subprocess.TimeoutExpired:
+        print(f"  run timed out after {timeout}s")
+        return None
+    try:
+        with open(report_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print("  run exited without a startup report")
+        return None
+
+
+def summarize(reports):
+    """Per phase: (runs, p50, p90, max) in ms, ordered by median time."""
+    samples = {}
+    for report in reports:
+        for phase in report['phases']:
+            samples.setdefault(phase_key(phase), []).append(phase['ms'])
+    rows = {
+        key: (len(values), percentile(values, 0.5), percentile(values, 0.9), max(values))
+        for key, values in samples.items()
+    }
+    return dict(sorted(rows.items(), key=lambda item: item[1][1]))
+
+
+def print_summary(label, rows):
+    print(f"\n{label}")
+    print(f"  {'phase':<24}{'runs':>6}{'p50 ms':>10}{'p90 ms':>10}{'max ms':>10}")
+    for key, (runs, p50, p90, worst) in rows.items():
+        print(f"  {key:<24}{runs:>6}{p50:>10.1f}{p90:>10.1f}{worst:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--script', default='Works', help="entry point to launch, relative to this directory")
+    parser.add_argument('--runs', type=int, default=5, help="measured runs per mode")
+    parser.add_argument('--tabs', type=int, default=3, help="tabs in the generated urls.json")
+    parser.add_argument('--timeout', type=int, default=60, help="seconds before a run is abandoned")
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    args = parser.parse_args()
+
+    script = os.path.join(HERE, args.script)
+    server, jira = serve()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    scratch = tempfile.mkdtemp(prefix='kiosk-startup-')
+    storage_path = os.path.join(scratch, 'profile')
+    config_path = os.path.join(scratch, 'urls.json')
+    report_path = os.path.join(scratch, 'report.json')
+    write_config(config_path, base_url, args.tabs, storage_path)
+
+    results = {}
+    try:
+        cold = []
+        for run in range(args.runs):
+            print(f"cold run {run + 1}/{args.runs}")
+            shutil.rmtree(storage_path, ignore_errors=True)
+            report = run_once(script, config_path, report_path, args.timeout)
+            if report:
+                cold.append(report)
+        results['cold'] = summarize(cold)
+
+        print("priming the profile for warm runs")
+        run_once(script, config_path, report_path, args.timeout)
+        warm = []
+        for run in range(args.runs):
+            print(f"warm run {run + 1}/{args.runs}")
+            report = run_once(script, config_path, report_path, args.timeout)
+            if report:
+                warm.append(report)
+        results['warm'] = summarize(warm)
+    finally:
+        server.shutdown()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps({
+            mode: {key: dict(zip(('runs', 'p50', 'p90', 'max'), row)) for key, row in rows.items()}
+            for mode, rows in results.items()
+        }, indent=4))
+    else:
+        for mode, rows in results.items():
+            print_summary(f"{mode} start ({args.script}, {args.tabs} tabs)", rows)
+    return 0 if results['cold'] and results['warm'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
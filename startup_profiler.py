@@ -0,0 +1,123 @@
+# startup_profiler.py
+
+"""
+Startup phase timestamps for the kiosk entry points.
+
+Import this module first so its clock starts before PyQt5 and QtWebEngine are loaded; it
+reads the clock before any other import and only imports Qt once a view is tracked:
+
+    from startup_profiler import profiler
+    ...
+    profiler.mark('imports')
+
+Phases are recorded in milliseconds since launch. When the launching process sets
+KIOSK_LAUNCH_TIME (a time.time() value) the clock starts there, so interpreter start-up is
+included. Tracked web views add 'view_created', 'first_paint' and 'load_finished' per tab;
+first paint is the page's first-contentful-paint, offset from the view's loadStarted.
+
+Environment:
+    KIOSK_STARTUP_REPORT  write the JSON report to this path once every tracked tab loaded
+    KIOSK_STARTUP_EXIT    quit the application right after that (used by startup_benchmark.py)
+"""
+
+import time
+
+IMPORTED_AT = time.time()  # Before anything else is loaded, Qt above all
+
+import json  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+
+PAINT_TIMING_JS = """
+(function() {
+    var paint = performance.getEntriesByName('first-contentful-paint')[0]
+        || performance.getEntriesByName('first-paint')[0];
+    return paint ? paint.startTime : null;
+})();
+"""
+
+
+class StartupProfiler:
+    def __init__(self):
+        launch_time = os.environ.get('KIOSK_LAUNCH_TIME')
+        now = IMPORTED_AT
+        self.origin = float(launch_time) if launch_time else now
+        self.phases = []
+        self.tabs = {}  # view -> {'tab', 'url', 'started', 'connections'}
+        self.pending = 0  # tracked tabs that have not finished their first load
+        self.finished = False
+        self.report_path = os.environ.get('KIOSK_STARTUP_REPORT')
+        self.exit_when_loaded = bool(os.environ.get('KIOSK_STARTUP_EXIT'))
+        self.mark('profiler_loaded', at=now)
+
+    def elapsed_ms(self, at=None):
+        return round(((at if at is not None else time.time()) - self.origin) * 1000, 1)
+
+    def mark(self, name, at=None, **info):
+        """Record that phase `name` was reached now (or at the time.time() value `at`)."""
+        if self.finished:
+            return
+        self.phases.append(dict(name=name, ms=self.elapsed_ms(at), **info))
+
+    def track_view(self, view, url):
+        """Record creation, first paint and first load of a tab's view."""
+        if self.finished or view in self.tabs:
+            return
+        tab = len(self.tabs)
+        self.mark('view_created', tab=tab, url=url)
+        state = {'tab': tab, 'url': url, 'started': None, 'connections': []}
+        self.tabs[view] = state
+        self.pending += 1
+        state['connections'] = [
+            view.loadStarted.connect(lambda: self.on_load_started(view)),
+            view.loadFinished.connect(lambda ok: self.on_load_finished(view, ok)),
+        ]
+
+    def on_load_started(self, view):
+        state = self.tabs[view]
+        if state['started'] is None:
+            state['started'] = time.time()
+
+    def on_load_finished(self, view, ok):
+        from PyQt5.QtCore import QObject
+        state = self.tabs[view]
+        # Only the first load is part of startup
+        for connection in state['connections']:
+            QObject.disconnect(connection)
+        state['connections'] = []
+        self.mark('load_finished', tab=state['tab'], ok=ok)
+        started = state['started']
+        view.page().runJavaScript(
+            PAINT_TIMING_JS, lambda paint_ms: self.on_paint_timing(state, started, paint_ms)
+        )
+
+    def on_paint_timing(self, state, started, paint_ms):
+        if paint_ms is not None and started is not None:
+            self.mark('first_paint', at=started + paint_ms / 1000, tab=state['tab'])
+        self.pending -= 1
+        if self.pending == 0:
+            self.complete()
+
+    def report(self):
+        return {
+            'script': os.path.basename(sys.argv[0]),
+            'pid': os.getpid(),
+            'launch_time': self.origin,
+            'phases': sorted(self.phases, key=lambda phase: phase['ms']),
+        }
+
+    def write_report(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=4)
+
+    def complete(self):
+        self.mark('all_tabs_loaded')
+        self.finished = True
+        if self.report_path:
+            self.write_report(self.report_path)
+        if self.exit_when_loaded:
+            from PyQt5.QtWidgets import QApplication
+            QApplication.instance().quit()
+
+
+profiler = StartupProfiler()
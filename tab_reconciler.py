@@ -0,0 +1,51 @@
+# tab_reconciler.py
+
+from config_watcher import match_urls
+from playlist_editor import PlaylistModel
+
+
+class TabReconciler:
+    """
+    Keeps the admin's playlist in step with a URL list that changed outside the editor.
+
+    Entries are matched by URL (see config_watcher.match_urls), so adding, deleting,
+    reordering or editing one entry only inserts, removes, moves or edits that row. Every
+    other row keeps its selection and load times, and the preview only loads again when
+    the entry it shows was edited. `page_loads` counts the preview loads reconcile() started.
+    """
+
+    def __init__(self, editor):
+        self.editor = editor  # PlaylistEditor
+        self.page_loads = 0
+
+    def reconcile(self, urls, playlist=None, policies=None):
+        playlist, policies = playlist or {}, policies or {}
+        model = self.editor.model
+        previewed = self.editor.previewed
+        previewed_url = previewed.url if previewed is not None else None
+
+        old_items = list(model.items)
+        plan, removed = match_urls(model.urls(), urls)
+        model.remove_rows(removed)
+        for position, (kind, old) in enumerate(plan):
+            if kind == 'add':
+                model.insert_urls([urls[position]], position)
+                continue
+            # Rows before `position` are final, so the row is at or after it
+            row = model.items.index(old_items[old])
+            if row != position:
+                model.move_rows([row], position)
+            if kind == 'edit':
+                model.setData(model.index(position), urls[position])
+
+        for row, item in enumerate(model.items):
+            dwell = playlist.get(item.url, {}).get('dwell')
+            if item.dwell != dwell:
+                model.setData(model.index(row), dwell, PlaylistModel.DwellRole)
+            if item.policy != policies.get(item.url):
+                model.setData(model.index(row), policies.get(item.url), PlaylistModel.PolicyRole)
+
+        # A removed entry moves the selection, which loads its new row by itself
+        if previewed in model.items and previewed.url != previewed_url:
+            self.editor.preview_timer.start()
+            self.page_loads += 1
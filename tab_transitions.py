@@ -0,0 +1,237 @@
+# tab_transitions.py
+
+import time
+from collections import deque
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPainter
+from PyQt5.QtCore import Qt, QTimer, QVariantAnimation, QEasingCurve
+
+TRANSITION_STYLES = ('wipe', 'fade', 'cut')
+DEFAULT_STYLE = 'wipe'
+DEFAULT_DURATION = 500  # ms
+DEFAULT_SETTLE_MS = 50  # ms before the incoming view is first checked for a fresh frame
+DEFAULT_MAX_SETTLE_MS = 500  # ms after which it is grabbed whether it painted or not
+PAINT_POLL_MS = 30
+
+# Two animation frames after the switch, Blink has painted the now visible (and thawed) page
+ARM_PAINT_JS = """
+window.__kioskPainted = false;
+requestAnimationFrame(function() { requestAnimationFrame(function() { window.__kioskPainted = true; }); });
+"""
+PAINTED_JS = "window.__kioskPainted === true"
+
+
+def transition_settings(config):
+    """Return (style, duration_ms) from the 'transition' block of a urls.json mapping."""
+    settings = config.get('transition', {})
+    style = settings.get('style', DEFAULT_STYLE)
+    if style not in TRANSITION_STYLES:
+        print(f"Unknown transition style '{style}', using '{DEFAULT_STYLE}'")
+        style = DEFAULT_STYLE
+    return style, settings.get('duration_ms', DEFAULT_DURATION)
+
+
+class TransitionStats:
+    """Frame timing of the most recent transitions."""
+
+    def __init__(self, history=50, frame_budget_ms=1000 / 60):
+        self.frame_budget_ms = frame_budget_ms
+        self.transitions = deque(maxlen=history)  # dicts of per-transition numbers
+        self.frame_times = []
+        self.started = None
+
+    def begin(self):
+        self.started = time.perf_counter()
+        self.frame_times = [self.started]
+
+    def frame(self):
+        if self.started is not None:
+            self.frame_times.append(time.perf_counter())
+
+    def end(self, style):
+        if self.started is None:
+            return
+        intervals = [(b - a) * 1000 for a, b in zip(self.frame_times, self.frame_times[1:])]
+        duration = (time.perf_counter() - self.started) * 1000
+        self.transitions.append({
+            'style': style,
+            'duration_ms': round(duration, 1),
+            'frames': len(intervals),
+            'max_frame_ms': round(max(intervals, default=0), 1),
+            # A frame that took longer than two frame budgets showed up as a visible hitch
+            'dropped_frames': sum(1 for interval in intervals if interval > 2 * self.frame_budget_ms),
+        })
+        self.started = None
+
+    def summary(self):
+        if not self.transitions:
+            return {'transitions': 0}
+        frames = sum(t['frames'] for t in self.transitions)
+        duration = sum(t['duration_ms'] for t in self.transitions)
+        worst = sorted(t['max_frame_ms'] for t in self.transitions)
+        return {
+            'transitions': len(self.transitions),
+            'fps': round(frames * 1000 / duration, 1) if duration else 0,
+            'p95_max_frame_ms': worst[min(len(worst) - 1, int(len(worst) * 0.95))],
+            'dropped_frames': sum(t['dropped_frames'] for t in self.transitions),
+        }
+
+
+class TransitionOverlay(QWidget):
+    """Paints the outgoing and incoming snapshots over the stacked widget while a transition runs."""
+
+    def __init__(self, parent, stats):
+        super().__init__(parent)
+        self.stats = stats  # Timed on paints, i.e. frames that were actually drawn
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.outgoing = None
+        self.incoming = None
+        self.style = DEFAULT_STYLE
+        self.direction = 1
+        self.progress = 0.0
+        self.hide()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        width = self.width()
+        if self.incoming is not None:
+            self.stats.frame()
+        if self.incoming is None or self.style == 'cut':
+            painter.drawPixmap(0, 0, self.outgoing)
+        elif self.style == 'fade':
+            painter.drawPixmap(0, 0, self.outgoing)
+            painter.setOpacity(self.progress)
+            painter.drawPixmap(0, 0, self.incoming)
+        else:
+            offset = int(self.progress * width) * self.direction
+            painter.drawPixmap(-offset, 0, self.outgoing)
+            painter.drawPixmap(width * self.direction - offset, 0, self.incoming)
+
+
+class TabTransitioner:
+    """
+    Animates tab changes using snapshots instead of the live web views.
+
+    The outgoing view is grabbed once and covers the stack while the incoming tab is made
+    current underneath at its final geometry. Once the incoming page has painted a frame since
+    it was shown (and thawed), checked from `settle_ms` on and given up on after
+    `max_settle_ms`, it is grabbed too, the two images are animated on the overlay and the
+    overlay is removed, revealing the live view. Live views are never moved or resized, so
+    Chromium does no relayout per frame.
+    """
+
+    def __init__(self, stacked_widget, view_pool=None, style=DEFAULT_STYLE, duration_ms=DEFAULT_DURATION,
+                 settle_ms=DEFAULT_SETTLE_MS, max_settle_ms=DEFAULT_MAX_SETTLE_MS):
+        self.stacked_widget = stacked_widget
+        self.view_pool = view_pool
+        self.style = style
+        self.duration_ms = duration_ms
+        self.settle_ms = settle_ms
+        self.max_settle_ms = max_settle_ms
+        self.stats = TransitionStats()
+        self.overlay = TransitionOverlay(stacked_widget, self.stats)
+        self.next_index = None
+        self.generation = 0  # Bumped per transition so late paint answers are dropped
+
+        self.settle_timer = QTimer()
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.timeout.connect(self.check_painted)
+        # Also covers a page whose renderer never answers, e.g. because it crashed
+        self.give_up_timer = QTimer()
+        self.give_up_timer.setSingleShot(True)
+        self.give_up_timer.timeout.connect(self.animate)
+
+        self.animation = QVariantAnimation()
+        self.animation.setStartValue(0.0)
+        self.animation.setEndValue(1.0)
+        self.animation.setEasingCurve(QEasingCurve.OutCubic)
+        self.animation.valueChanged.connect(self.on_frame)
+        self.animation.finished.connect(self.finish)
+
+    def transition(self, current_index, next_index, direction=1):
+        if self.next_index is not None:
+            self.finish()  # Jump to the end of a transition that is still running
+
+        # Make sure the incoming tab has a live view before it is shown
+        if self.view_pool:
+            self.view_pool.materialize(next_index)
+
+        if self.style == 'cut' or not self.stacked_widget.isVisible():
+            self.show_tab(next_index)
+            return
+
+        self.stacked_widget.setCurrentIndex(current_index)
+        self.overlay.outgoing = self.stacked_widget.currentWidget().grab()
+        self.overlay.incoming = None
+        self.overlay.style = self.style
+        self.overlay.direction = direction
+        self.overlay.progress = 0.0
+        self.overlay.setGeometry(self.stacked_widget.rect())
+        self.overlay.raise_()
+        self.overlay.show()
+
+        # The live incoming view becomes current under the overlay and gets time to paint
+        self.next_index = next_index
+        self.generation += 1
+        self.show_tab(next_index)
+        self.overlay.raise_()
+        page = self.incoming_page()
+        if page is not None:
+            page.runJavaScript(ARM_PAINT_JS)
+        self.settle_timer.start(self.settle_ms)
+        self.give_up_timer.start(self.max_settle_ms)
+
+    def show_tab(self, index):
+        self.stacked_widget.setCurrentIndex(index)
+        # Warm the next tabs in rotation and freeze or release the rest
+        if self.view_pool:
+            self.view_pool.show(index)
+        self.stacked_widget.currentWidget().setFocus()
+
+    def incoming_page(self):
+        """The web page of the incoming tab, or None for native tabs."""
+        view = self.view_pool.view_for(self.next_index) if self.view_pool else self.stacked_widget.currentWidget()
+        page = getattr(view, 'page', None)
+        return page() if callable(page) else None
+
+    def check_painted(self):
+        page = self.incoming_page()
+        if page is None:
+            self.animate()
+            return
+        generation = self.generation
+        page.runJavaScript(PAINTED_JS, lambda painted: self.on_painted(generation, painted))
+
+    def on_painted(self, generation, painted):
+        if generation != self.generation or self.next_index is None or self.overlay.incoming is not None:
+            return
+        if painted:
+            self.animate()
+        else:
+            self.settle_timer.start(PAINT_POLL_MS)
+
+    def animate(self):
+        if self.next_index is None or self.overlay.incoming is not None:
+            return
+        self.settle_timer.stop()
+        self.give_up_timer.stop()
+        self.overlay.incoming = self.stacked_widget.currentWidget().grab()
+        self.stats.begin()
+        self.animation.setDuration(self.duration_ms)
+        self.animation.start()
+
+    def on_frame(self, value):
+        self.overlay.progress = value
+        self.overlay.update()
+
+    def finish(self):
+        self.settle_timer.stop()
+        self.give_up_timer.stop()
+        if self.animation.state() == QVariantAnimation.Running:
+            self.animation.stop()
+        self.stats.end(self.style)
+        self.overlay.hide()
+        self.overlay.outgoing = None
+        self.overlay.incoming = None
+        self.next_index = None
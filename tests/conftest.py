@@ -0,0 +1,39 @@
+# conftest.py
+
+import os
+import sys
+import time
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_jira  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def jira():
+    """A fresh fake Jira; yields (base URL, FakeJira)."""
+    server, jira = fake_jira.serve()
+    yield f"http://127.0.0.1:{server.server_address[1]}", jira
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def wait(qapp):
+    """wait(condition, timeout) runs the event loop until condition() holds; returns whether it did."""
+    def wait(condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            qapp.processEvents()
+            time.sleep(0.01)
+        return condition()
+    return wait
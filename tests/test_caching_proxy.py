@@ -0,0 +1,50 @@
+# test_caching_proxy.py
+
+import asyncio
+
+from caching_proxy import CachingProxy, Response
+
+
+def test_concurrent_misses_are_coalesced(jira):
+    base_url, fake = jira
+    proxy = CachingProxy(upstream=base_url)
+
+    async def fetch_many():
+        requests = [proxy.respond('GET', f"{base_url}/browse/XCH-1", [('Cookie', 'a')], b'') for _ in range(5)]
+        results = await asyncio.gather(*requests)
+        cached = await proxy.respond('GET', f"{base_url}/browse/XCH-1", [('Cookie', 'a')], b'')
+        proxy.pool.close()
+        return results, cached
+
+    results, cached = asyncio.run(fetch_many())
+    assert [state for _, state in results] == ['MISS'] + ['COALESCED'] * 4
+    assert all(response.body == results[0][0].body for response, _ in results)
+    assert cached[1] == 'HIT'
+    assert fake.request_counts['browse'] == 1
+    assert proxy.stats['coalesced'] == 4
+
+
+def test_pages_are_keyed_by_caller(jira):
+    base_url, fake = jira
+    proxy = CachingProxy(upstream=base_url)
+
+    async def fetch_as(cookies):
+        states = [(await proxy.respond('GET', f"{base_url}/browse/XCH-1", [('Cookie', c)], b''))[1] for c in cookies]
+        proxy.pool.close()
+        return states
+
+    assert asyncio.run(fetch_as(['a', 'b', 'a'])) == ['MISS', 'MISS', 'HIT']
+    assert fake.request_counts['browse'] == 2
+
+
+def test_static_policy():
+    proxy = CachingProxy()
+    response = Response(200, 'OK', [], b'')
+    private = Response(200, 'OK', [('Cache-Control', 'private, max-age=600')], b'')
+    assert proxy.cache_ttl('/secure/attachment/1/diagram.png', response) == proxy.page_ttl
+    assert proxy.cache_ttl('/s/8.20.0-1/_/batch.js', response) == proxy.static_ttl
+    assert proxy.cache_ttl('/avatar.png', private) == 0
+    headers = [('Cookie', 'a')]
+    assert proxy.cache_key('u', '/s/8.20.0-1/_/batch.js', headers)[2] == ''
+    assert proxy.cache_key('u', '/secure/attachment/1/diagram.png', headers)[2] != ''
+    assert proxy.cache_key('u', '/avatar.png', headers)[2] != ''
@@ -0,0 +1,108 @@
+# test_jira_board.py
+
+from jira_board import PAGE_SIZE, IssueTableModel, JiraBoards, JiraRestClient
+
+
+def issue(key, summary='Summary', status='To Do'):
+    return {'key': key, 'fields': {'summary': summary, 'status': {'name': status}, 'assignee': None,
+                                   'updated': '2024-01-01T10:00:00.000+0000'}}
+
+
+def test_jql_translates_system_filters(jira, qapp):
+    base_url, _ = jira
+    boards = JiraBoards(poll_interval=60000)
+    try:
+        view = boards.create_view(f"native:{base_url}/browse/XCH-1?filter=-5")
+        assert view.jql(full=True) == "(resolution = Unresolved) ORDER BY key ASC"
+        assert view.jql(full=False) == "(resolution = Unresolved) AND updated >= -3m ORDER BY key ASC"
+        view.setUrl(f"native:{base_url}/issues/?filter=-4")
+        assert view.jql(full=True) == "ORDER BY key ASC"
+        view.setUrl(f"native:{base_url}/issues/?filter=10000")
+        assert view.jql(full=True) == "(filter = 10000) ORDER BY key ASC"
+        # A system filter Jira has no JQL for falls back to the issue key
+        view.setUrl(f"native:{base_url}/browse/XCH-2?filter=-42")
+        assert view.jql(full=True) == "(key in (XCH-2)) ORDER BY key ASC"
+    finally:
+        boards.stop()
+
+
+def test_board_shows_system_filter(jira, wait):
+    base_url, fake = jira
+    fake.update_issue('XCH-2', status='Done')
+    boards = JiraBoards(poll_interval=60000)
+    try:
+        view = boards.create_view(f"native:{base_url}/browse/XCH-1?filter=-5")
+        assert wait(lambda: view.model.rows)
+        assert view.error is None
+        assert [row['key'] for row in view.model.rows] == ['XCH-1', 'XCH-3', 'XCH-4', 'XCH-5']
+    finally:
+        boards.stop()
+
+
+def test_search_pages_through_large_results(jira, wait):
+    base_url, fake = jira
+    for number in range(6, PAGE_SIZE * 2 + 30):
+        fake.add_issue(f"XCH-{number}", f"Issue {number}")
+    results = []
+    client = JiraRestClient()
+    try:
+        client.search(base_url, 'ORDER BY key ASC', lambda result, error: results.append((result, error)))
+        assert wait(lambda: results)
+    finally:
+        client.stop()
+    result, error = results[0]
+    assert error is None and result['complete']
+    assert len({issue['key'] for issue in result['issues']}) == PAGE_SIZE * 2 + 29
+    assert fake.request_counts['search'] == 3
+
+
+def test_search_reports_rejected_jql(jira, wait):
+    base_url, _ = jira
+    results = []
+    client = JiraRestClient()
+    try:
+        client.search(base_url, 'filter = -5', lambda result, error: results.append((result, error)))
+        assert wait(lambda: results)
+    finally:
+        client.stop()
+    assert results[0][0] is None and 'HTTP 400' in str(results[0][1])
+
+
+def test_search_after_stop_is_dropped(jira, qapp):
+    base_url, _ = jira
+    boards = JiraBoards(poll_interval=60000)
+    view = boards.create_view(f"native:{base_url}/browse/XCH-1")
+    boards.stop()
+    assert not view.poll_timer.isActive()
+    view.pending = False
+    view.refresh()  # Would raise "cannot schedule new futures after shutdown"
+
+
+def test_apply_updates_inserts_and_removes_rows(qapp):
+    model = IssueTableModel()
+    assert model.apply([issue('A-1'), issue('A-2'), issue('A-3')], full=True) == 3
+    assert model.apply([issue('A-2', summary='Changed')]) == 1
+    assert model.rows[1]['summary'] == 'Changed'
+    assert model.apply([issue('A-2', summary='Changed')]) == 0
+    # Incremental results never remove rows; a full one drops what it no longer contains
+    assert model.apply([issue('A-3')], full=True) == 2
+    assert [row['key'] for row in model.rows] == ['A-3']
+    assert model.row_of == {'A-3': 0}
+    assert model.apply([issue('A-4')]) == 1
+    assert model.row_of == {'A-3': 0, 'A-4': 1}
+
+
+def test_incomplete_result_keeps_rows(jira, wait, monkeypatch):
+    import jira_board
+    base_url, fake = jira
+    monkeypatch.setattr(jira_board, 'MAX_ISSUES', 3)
+    monkeypatch.setattr(jira_board, 'PAGE_SIZE', 2)
+    boards = JiraBoards(poll_interval=60000)
+    try:
+        view = boards.create_view(f"native:{base_url}/issues/?filter=-4")
+        view.model.apply([issue('XCH-5')])
+        assert wait(lambda: not view.pending)
+        # Paging stopped at MAX_ISSUES, so XCH-5 was not seen but is not taken as gone
+        assert [row['key'] for row in view.model.rows] == ['XCH-5', 'XCH-1', 'XCH-2', 'XCH-3', 'XCH-4']
+    finally:
+        boards.stop()
@@ -0,0 +1,113 @@
+# test_jira_changes.py
+
+import threading
+import time
+
+from jira_changes import JiraChangeDetector, filter_jql
+
+
+def test_filter_jql():
+    assert filter_jql('-5') == 'resolution = Unresolved'
+    assert filter_jql('-4') == ''
+    assert filter_jql('10000') == 'filter = 10000'
+    assert filter_jql('-42') is None
+    assert filter_jql('1) OR (1') is None
+
+
+def test_build_jql_for_system_filters(jira):
+    base_url, _ = jira
+    detector = JiraChangeDetector([f"{base_url}/browse/XCH-1?filter=-5", f"{base_url}/browse/XCH-2?filter=-42"])
+    assert detector.build_jql(detector.hosts[base_url]) == \
+        "(key in (XCH-1, XCH-2) OR (resolution = Unresolved)) AND updated >= -2m"
+    detector.track(f"{base_url}/issues/?filter=-4")
+    assert detector.build_jql(detector.hosts[base_url]) == "updated >= -2m"
+
+
+def test_changed_issue_dirties_its_tabs(jira):
+    base_url, fake = jira
+    issue_url = f"{base_url}/browse/XCH-2"
+    filter_url = f"{base_url}/browse/XCH-1?filter=-5"
+    detector = JiraChangeDetector([issue_url, filter_url, 'http://example.com/dashboard'])
+    detector.poll()  # Baseline
+    assert not detector.should_reload(issue_url)
+    assert not detector.should_reload(filter_url)
+    assert detector.should_reload('http://example.com/dashboard')
+
+    fake.update_issue('XCH-2', summary='Changed')
+    detector.poll()
+    assert detector.should_reload(issue_url)
+    assert detector.should_reload(filter_url)  # Filter results cannot be attributed, so all filter tabs reload
+    assert not detector.should_reload(issue_url)  # The flag is consumed
+
+
+def test_issue_leaving_a_filter_dirties_its_tabs(jira):
+    base_url, fake = jira
+    open_url = f"{base_url}/browse/XCH-1?filter=-5"
+    saved_url = f"{base_url}/issues/?filter=10000"
+    detector = JiraChangeDetector([open_url, saved_url])
+    detector.poll()  # Baseline
+    assert not detector.should_reload(open_url)
+
+    fake.update_issue('XCH-3', status='Done')  # No longer matches `resolution = Unresolved`
+    detector.poll()
+    assert detector.should_reload(open_url)
+    detector.should_reload(saved_url)
+
+    fake.set_filter(10000, ['XCH-1', 'XCH-5'])  # The filter was edited; no issue was updated
+    detector.poll()
+    assert detector.should_reload(saved_url)
+    assert not detector.should_reload(open_url)
+
+
+def test_unreachable_host_always_reloads():
+    url = 'http://127.0.0.1:9/browse/XCH-1'
+    detector = JiraChangeDetector([url], timeout=1)
+    detector.poll()
+    assert detector.should_reload(url)
+
+
+def test_track_during_poll(jira):
+    base_url, _ = jira
+    detector = JiraChangeDetector([f"{base_url}/browse/XCH-1"], poll_interval=10)
+    errors = []
+    done = threading.Event()
+
+    def poll():
+        while not done.is_set():
+            try:
+                detector.poll()
+            except Exception as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=poll)
+    thread.start()
+    for number in range(300):
+        detector.track(f"{base_url}/browse/XCH-{number}?filter={number}")
+    done.set()
+    thread.join()
+    assert errors == []
+
+
+def test_run_survives_a_failed_poll(jira, monkeypatch):
+    base_url, _ = jira
+    url = f"{base_url}/browse/XCH-1"
+    detector = JiraChangeDetector([url], poll_interval=20)
+    poll_host = detector.poll_host
+    calls = []
+
+    def failing_once(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise RuntimeError('boom')
+        poll_host(*args)
+
+    monkeypatch.setattr(detector, 'poll_host', failing_once)
+    detector.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(calls) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert detector.thread.is_alive()
+        assert detector.hosts[base_url]['healthy']
+    finally:
+        detector.stop()
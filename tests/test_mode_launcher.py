@@ -0,0 +1,28 @@
+# test_mode_launcher.py
+
+import pytest
+
+from mode_launcher import ModeLauncher
+
+
+def test_preload_reports_a_broken_mode(qapp):
+    def broken():
+        raise RuntimeError('boom')
+
+    launcher = ModeLauncher({'broken': broken}, 'broken')
+    assert launcher.preload() is None
+    assert launcher.switch('broken') is None
+
+
+def test_preload_builds_the_jira_window(qapp):
+    pytest.importorskip('PyQt5.QtWebEngineWidgets', exc_type=ImportError)  # Needs a system with Chromium's libraries
+    import jira
+
+    launcher = ModeLauncher({'jira': jira.build_main_application}, 'jira')
+    try:
+        window = launcher.preload('jira')
+        assert window is not None
+        assert not window.isVisible()  # Built off-screen until the chooser picks it
+        assert launcher.preload('jira') is window
+    finally:
+        launcher.discard('jira')
@@ -0,0 +1,241 @@
+# thin_client.py
+
+"""
+Display for render_server.py: rotates the server's tab snapshots full screen.
+
+Needs only QtWidgets and QtNetwork, no web engine, so it runs on cheap hardware. Rotation
+follows the kiosk's semantics, with `interval` and `pause_duration` taken from the server's
+manifest (i.e. from urls.json): Space pauses and resumes; Ctrl+Tab, Ctrl+Shift+Tab and
+Ctrl+1..9 switch tabs by hand and pause rotation for `pause_duration`.
+
+The shown tab is polled for changes and the next one is fetched shortly before it is due.
+Requests name the frame the client already has, so unchanged tabs cost a 304 and small
+changes arrive as a patch for the changed rectangle.
+
+    python thin_client.py http://render-server:8090 [--windowed]
+"""
+
+import argparse
+import json
+import sys
+from functools import partial
+from PyQt5.QtWidgets import QApplication, QLabel, QShortcut
+from PyQt5.QtGui import QImage, QKeySequence, QPainter, QPixmap
+from PyQt5.QtCore import QTimer, QUrl, Qt
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+
+MANIFEST_INTERVAL = 30000  # ms
+POLL_INTERVAL = 5000  # ms, for changes to the shown tab
+PREFETCH_LEAD = 1000  # ms before a switch the next tab is fetched
+
+
+class ThinClient(QLabel):
+    def __init__(self, server_url):
+        super().__init__()
+        self.server_url = server_url.rstrip('/')
+        self.network = QNetworkAccessManager(self)
+        self.tabs = []  # manifest entries
+        self.images = {}  # tab index -> (hash, QImage)
+        self.pending = set()  # tab indices with a frame request in flight
+        self.current_index = 0
+        self.interval = 5000
+        self.pause_duration = 10000
+        self.is_paused = False
+        self.manifest_etag = None
+
+        self.setAlignment(Qt.AlignCenter)
+        self.setStyleSheet("background-color: black;")
+        self.setMinimumSize(320, 180)
+
+        self.pause_label = QLabel("Paused", self)
+        self.pause_label.setStyleSheet("font-size: 18px; color: white; background-color: rgba(0, 0, 0, 0.5);")
+        self.pause_label.setMargin(10)
+        self.pause_label.hide()
+
+        self.switch_timer = QTimer()
+        self.switch_timer.timeout.connect(self.switch_tab)
+        self.prefetch_timer = QTimer()
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.timeout.connect(self.prefetch_next)
+        self.resume_timer = QTimer()
+        self.resume_timer.setSingleShot(True)
+        self.resume_timer.timeout.connect(self.start_timers)
+        self.poll_timer = QTimer()
+        self.poll_timer.timeout.connect(lambda: self.fetch_frame(self.current_index))
+        self.poll_timer.start(POLL_INTERVAL)
+        self.manifest_timer = QTimer()
+        self.manifest_timer.timeout.connect(self.fetch_manifest)
+        self.manifest_timer.start(MANIFEST_INTERVAL)
+
+        self.setup_shortcuts()
+        self.fetch_manifest()
+
+    # Rotation
+
+    def start_timers(self):
+        self.is_paused = False
+        self.pause_label.hide()
+        if self.interval > 0:
+            self.switch_timer.start(self.interval)
+            self.prefetch_timer.start(max(0, self.interval - PREFETCH_LEAD))
+
+    def stop_timers(self):
+        self.is_paused = True
+        self.pause_label.adjustSize()
+        self.pause_label.move(0, self.height() - self.pause_label.height())
+        self.pause_label.show()
+        self.switch_timer.stop()
+        self.prefetch_timer.stop()
+        self.resume_timer.stop()
+
+    def toggle(self):
+        if self.is_paused:
+            self.start_timers()
+        else:
+            self.stop_timers()
+
+    def switch_tab(self):
+        if self.tabs:
+            self.show_tab((self.current_index + 1) % len(self.tabs))
+        self.prefetch_timer.start(max(0, self.interval - PREFETCH_LEAD))
+
+    def switch_by_hand(self, index):
+        """Like a custom link on the kiosk: show `index` and pause rotation for pause_duration."""
+        if not 0 <= index < len(self.tabs):
+            return
+        self.show_tab(index)
+        self.stop_timers()
+        self.resume_timer.start(self.pause_duration)
+
+    def show_tab(self, index):
+        self.current_index = index
+        self.fetch_frame(index)
+        self.update_pixmap()
+
+    def prefetch_next(self):
+        if self.tabs:
+            self.fetch_frame((self.current_index + 1) % len(self.tabs))
+
+    def update_pixmap(self):
+        entry = self.images.get(self.current_index)
+        if entry is None:
+            return
+        pixmap = QPixmap.fromImage(entry[1])
+        self.setPixmap(pixmap.scaled(self.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_pixmap()
+
+    def setup_shortcuts(self):
+        QShortcut(QKeySequence("Space"), self).activated.connect(self.toggle)
+        QShortcut(QKeySequence("Ctrl+Tab"), self).activated.connect(
+            lambda: self.tabs and self.switch_by_hand((self.current_index + 1) % len(self.tabs)))
+        QShortcut(QKeySequence("Ctrl+Shift+Tab"), self).activated.connect(
+            lambda: self.tabs and self.switch_by_hand((self.current_index - 1) % len(self.tabs)))
+        for i in range(9):
+            QShortcut(QKeySequence(f"Ctrl+{i + 1}"), self).activated.connect(partial(self.switch_by_hand, i))
+
+    # Network
+
+    def get(self, path, callback, headers=None):
+        request = QNetworkRequest(QUrl(self.server_url + path))
+        for name, value in (headers or {}).items():
+            request.setRawHeader(name.encode('latin-1'), value.encode('latin-1'))
+        reply = self.network.get(request)
+        reply.finished.connect(partial(self.on_reply, reply, callback))
+
+    def on_reply(self, reply, callback):
+        try:
+            if reply.error() != QNetworkReply.NoError:
+                print(f"Render server request failed: {reply.errorString()}")
+                callback(None, reply)
+                return
+            callback(bytes(reply.readAll()), reply)
+        finally:
+            reply.deleteLater()
+
+    def fetch_manifest(self):
+        headers = {'If-None-Match': self.manifest_etag} if self.manifest_etag else {}
+        self.get('/tabs', self.on_manifest, headers)
+
+    def on_manifest(self, body, reply):
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if body is None or status == 304:
+            return
+        try:
+            manifest = json.loads(body.decode('utf-8'))
+        except ValueError as e:
+            print(f"Malformed manifest from the render server: {e}")
+            return
+        self.manifest_etag = bytes(reply.rawHeader(b'ETag')).decode('latin-1') or None
+        first = not self.tabs
+        self.tabs = manifest.get('tabs', [])
+        self.images = {index: entry for index, entry in self.images.items() if index < len(self.tabs)}
+        timing_changed = (manifest.get('interval', self.interval), manifest.get('pause_duration', self.pause_duration)) \
+            != (self.interval, self.pause_duration)
+        self.interval = manifest.get('interval', self.interval)
+        self.pause_duration = manifest.get('pause_duration', self.pause_duration)
+        if self.current_index >= len(self.tabs):
+            self.current_index = 0
+        if first or (timing_changed and not self.is_paused):
+            if self.interval > 0:
+                self.start_timers()
+            else:
+                self.stop_timers()
+        if first:
+            self.show_tab(self.current_index)
+
+    def fetch_frame(self, index):
+        if not 0 <= index < len(self.tabs) or index in self.pending:
+            return
+        known = self.images.get(index)
+        path = f'/tabs/{index}/frame'
+        if known:
+            path += f'?since={known[0]}'
+        self.pending.add(index)
+        self.get(path, partial(self.on_frame, index, known))
+
+    def on_frame(self, index, known, body, reply):
+        self.pending.discard(index)
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if body is None or status != 200:
+            return
+        frame_hash = bytes(reply.rawHeader(b'X-Frame-Hash')).decode('latin-1')
+        delta_base = bytes(reply.rawHeader(b'X-Delta-Base')).decode('latin-1')
+        patch = QImage.fromData(body)
+        if patch.isNull():
+            return
+        if delta_base:
+            if not known or known[0] != delta_base:
+                return  # The patch is for a frame this client no longer has; the next poll gets it whole
+            x, y, _, _ = (int(value) for value in bytes(reply.rawHeader(b'X-Delta-Rect')).decode('latin-1').split(','))
+            image = known[1].copy()
+            painter = QPainter(image)
+            painter.drawImage(x, y, patch)
+            painter.end()
+        else:
+            image = patch
+        self.images[index] = (frame_hash, image)
+        if index == self.current_index:
+            self.update_pixmap()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the render server's tabs in rotation.")
+    parser.add_argument('server', help="Render server URL, e.g. http://render-server:8090")
+    parser.add_argument('--windowed', action='store_true')
+    args = parser.parse_args(argv)
+
+    app = QApplication(sys.argv[:1])
+    client = ThinClient(args.server)
+    if args.windowed:
+        client.resize(1280, 720)
+        client.show()
+    else:
+        client.showFullScreen()
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
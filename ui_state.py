@@ -0,0 +1,226 @@
+# ui_state.py
+
+from PyQt5.QtCore import QFile, QIODevice, QObject, pyqtSlot
+from PyQt5.QtWebChannel import QWebChannel
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+
+CHANNEL_SCRIPT_NAME = 'kiosk-webchannel'
+SCRIPT_NAME = 'kiosk-ui-state'
+BRIDGE_NAME = 'kioskUiState'
+
+# Runs in the application world. Scroll and click events are coalesced into one capture per
+# 250 ms that reports the window scroll, every inner element the user scrolled and the open or
+# collapsed state of Jira's toggle panels. Once per load it asks Python for the tab's last
+# state and applies it, retrying briefly while Jira is still rendering the content.
+UI_STATE_JS = r"""
+(function () {
+    if (window.__kioskUiState || typeof qt === 'undefined' || !qt.webChannelTransport) {
+        return;
+    }
+    window.__kioskUiState = true;
+    var PANELS = '.toggle-wrap[id], .twixi-block[id]';
+    var bridge = null;
+    var scrolled = new Set();
+    var timer = null;
+    var restoring = false;
+
+    function selectorFor(el) {
+        var parts = [];
+        while (el && el.nodeType === 1) {
+            if (el.id) {
+                parts.unshift('#' + CSS.escape(el.id));
+                return parts.join(' > ');
+            }
+            if (el === document.body) {
+                parts.unshift('body');
+                return parts.join(' > ');
+            }
+            var index = 1;
+            for (var sibling = el.previousElementSibling; sibling; sibling = sibling.previousElementSibling) {
+                if (sibling.tagName === el.tagName) {
+                    index++;
+                }
+            }
+            parts.unshift(el.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+            el = el.parentElement;
+        }
+        return parts.join(' > ');
+    }
+
+    function isCollapsed(el) {
+        return el.classList.contains('collapsed') || el.classList.contains('twixi-collapsed');
+    }
+
+    function setExpanded(el, expanded) {
+        if (isCollapsed(el) !== expanded) {
+            return;
+        }
+        if (el.classList.contains('twixi-block')) {
+            el.classList.toggle('twixi-collapsed', !expanded);
+            el.classList.toggle('twixi-expanded', expanded);
+        } else {
+            el.classList.toggle('collapsed', !expanded);
+        }
+    }
+
+    function capture() {
+        timer = null;
+        if (!bridge || restoring) {
+            return;
+        }
+        var containers = [];
+        scrolled.forEach(function (el) {
+            if (el.isConnected && (el.scrollTop || el.scrollLeft)) {
+                containers.push({selector: selectorFor(el), top: el.scrollTop, left: el.scrollLeft});
+            }
+        });
+        var panels = {};
+        document.querySelectorAll(PANELS).forEach(function (el) {
+            panels[el.id] = !isCollapsed(el);
+        });
+        bridge.save(location.href, JSON.stringify({
+            x: window.scrollX, y: window.scrollY, containers: containers, panels: panels
+        }));
+    }
+
+    function schedule() {
+        if (timer === null) {
+            timer = setTimeout(capture, 250);
+        }
+    }
+
+    function restore(state, attempt) {
+        restoring = true;
+        var panels = state.panels || {};
+        Object.keys(panels).forEach(function (id) {
+            var el = document.getElementById(id);
+            if (el) {
+                setExpanded(el, panels[id]);
+            }
+        });
+        var missing = 0;
+        (state.containers || []).forEach(function (saved) {
+            var el = document.querySelector(saved.selector);
+            if (el) {
+                el.scrollTop = saved.top;
+                el.scrollLeft = saved.left;
+                scrolled.add(el);
+            }
+            if (!el || Math.abs(el.scrollTop - saved.top) > 1) {
+                missing++;
+            }
+        });
+        window.scrollTo(state.x || 0, state.y || 0);
+        if (Math.abs(window.scrollY - (state.y || 0)) > 1) {
+            missing++;
+        }
+        // Content that is still rendering may not be tall enough yet
+        if (missing && attempt < 30) {
+            setTimeout(function () { restore(state, attempt + 1); }, 100);
+        } else {
+            restoring = false;
+        }
+    }
+
+    document.addEventListener('scroll', function (event) {
+        if (event.target.nodeType === 1) {
+            scrolled.add(event.target);
+        }
+        schedule();
+    }, true);
+    document.addEventListener('click', schedule, true);
+
+    new QWebChannel(qt.webChannelTransport, function (channel) {
+        bridge = channel.objects.""" + BRIDGE_NAME + r""";
+        bridge.load(location.href, function (json) {
+            if (json) {
+                restore(JSON.parse(json), 0);
+            }
+        });
+    });
+})();
+"""
+
+
+def read_channel_js():
+    """The qwebchannel.js client shipped in Qt's resources."""
+    resource = QFile(':/qtwebchannel/qwebchannel.js')
+    if not resource.open(QIODevice.ReadOnly):
+        return None
+    try:
+        return bytes(resource.readAll()).decode('utf-8')
+    finally:
+        resource.close()
+
+
+def install_ui_state_scripts(profile):
+    """Register the web channel client and the UI state script on a profile once."""
+    scripts = profile.scripts()
+    if not scripts.findScript(SCRIPT_NAME).isNull():
+        return True
+    channel_js = read_channel_js()
+    if channel_js is None:
+        print("qwebchannel.js is not available; tab UI state will not be preserved")
+        return False
+    for name, source, injection_point in (
+            (CHANNEL_SCRIPT_NAME, channel_js, QWebEngineScript.DocumentCreation),
+            (SCRIPT_NAME, UI_STATE_JS, QWebEngineScript.DocumentReady)):
+        script = QWebEngineScript()
+        script.setName(name)
+        script.setSourceCode(source)
+        script.setInjectionPoint(injection_point)
+        script.setWorldId(QWebEngineScript.ApplicationWorld)
+        script.setRunsOnSubFrames(False)
+        scripts.insert(script)
+    return True
+
+
+class UiStateBridge(QObject):
+    """The object a page sees as `kioskUiState`; it is bound to one tab's entry in the store."""
+
+    def __init__(self, store, key, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.key = key
+
+    @pyqtSlot(str, str)
+    def save(self, url, state):
+        self.store.states[self.key] = (url, state)
+
+    @pyqtSlot(str, result=str)
+    def load(self, url):
+        return self.store.take_restore(self.key, url)
+
+
+class UiStateStore:
+    """
+    Python-side scroll and panel state per tab, kept current by the pages themselves.
+
+    Every page a tab creates (its view's page, standby pages) is attached with the tab's key.
+    Pages report their state as the user or the rotation scrolls them and ask for it once when
+    they load, so reloads restore without any per-load signal connections: each page has one
+    channel and one bridge, both owned by the page.
+    """
+
+    def __init__(self, profile):
+        self.enabled = install_ui_state_scripts(profile)
+        self.states = {}  # tab key -> (url, state JSON)
+        self.restores = 0
+
+    def attach(self, page, key):
+        if not self.enabled:
+            return
+        channel = QWebChannel(page)
+        channel.registerObject(BRIDGE_NAME, UiStateBridge(self, key, channel))
+        page.setWebChannel(channel, QWebEngineScript.ApplicationWorld)
+
+    def take_restore(self, key, url):
+        """State to apply to a page that just loaded `url` for tab `key`, or '' if there is none."""
+        saved_url, state = self.states.get(key, (None, ''))
+        if saved_url != url or not state:
+            return ''
+        self.restores += 1
+        return state
+
+    def forget(self, key):
+        self.states.pop(key, None)
@@ -0,0 +1,249 @@
+# view_pool.py
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+from PyQt5.QtCore import QUrl, Qt
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage
+from startup_profiler import profiler
+from jira_board import JiraBoards, is_native_url
+
+DEFAULT_POOL_SIZE = 3
+DEFAULT_LOOKAHEAD = 1
+
+
+def view_pool_settings(config):
+    """Return 'view_pool_size' and 'view_pool_lookahead' from a urls.json mapping, falling back to defaults."""
+    pool_size = config.get('view_pool_size', DEFAULT_POOL_SIZE)
+    lookahead = config.get('view_pool_lookahead', DEFAULT_LOOKAHEAD)
+    return pool_size, lookahead
+
+
+class TabHost(QWidget):
+    """Lightweight placeholder for one rotation slot. It only holds a live view while pooled."""
+
+    def __init__(self, url, parent=None):
+        super().__init__(parent)
+        self.url = url  # URL the view is (re)built with; follows custom links
+        self.view = None
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+    @property
+    def is_native(self):
+        """True for tabs drawn natively from Jira REST data instead of a web page."""
+        return is_native_url(self.url)
+
+    def attach(self, view):
+        self.layout().addWidget(view)
+        self.view = view
+
+    def detach(self):
+        view = self.view
+        if view is not None:
+            self.layout().removeWidget(view)
+            self.view = None
+        return view
+
+
+class ViewPool:
+    """
+    Keeps a bounded number of live QWebEngineViews for a list of tab hosts.
+
+    The shown tab and the next `lookahead` tabs in rotation are kept Active. Other live
+    pages are Frozen, and once more than `pool_size` views are alive the least recently
+    shown one is destroyed. Its host keeps the URL so the view is rebuilt on demand.
+    Native tabs (see jira_board) are cheap widgets; once built they stay, outside the LRU.
+    """
+
+    def __init__(self, profile, urls, pool_size=DEFAULT_POOL_SIZE, lookahead=DEFAULT_LOOKAHEAD):
+        self.profile = profile
+        self.lookahead = max(0, lookahead)
+        self.pool_size = max(pool_size, self.lookahead + 1)
+        self.current_index = 0
+        self.lru = []  # Live hosts, most recently shown last
+        self.hosts = [TabHost(url) for url in urls]
+        self.ui_state = None  # UiStateStore that carries scroll and panel state across reloads
+        self.page_hooks = []  # callables(page, host) run for every page the pool creates
+        self.boards = None  # JiraBoards that builds native tabs; a default one is made on first use
+        self.governor = None  # CpuGovernor that may freeze hidden tabs of the warm window too
+        self.reloader = None  # StandbyReloader that recycles pages off-screen; in place without one
+
+    def create_page(self, host, parent):
+        """A page on the pool's profile, attached to the tab's UI state when there is a store."""
+        page = QWebEnginePage(self.profile, parent)
+        if self.ui_state is not None:
+            self.ui_state.attach(page, host)
+        for hook in self.page_hooks:
+            hook(page, host)
+        return page
+
+    def count(self):
+        return len(self.hosts)
+
+    def host(self, index):
+        return self.hosts[index]
+
+    def index_of(self, host):
+        """Current position of a host, or None once it has been removed."""
+        for index, candidate in enumerate(self.hosts):
+            if candidate is host:
+                return index
+        return None
+
+    def set_hosts(self, hosts):
+        """Replace the host order after tabs were added, removed or reordered."""
+        removed = [host for host in self.hosts if host not in hosts]
+        self.hosts = list(hosts)
+        self.lru = [host for host in self.lru if host in self.hosts]
+        if self.governor is not None:
+            for host in removed:
+                self.governor.forget(host)
+
+    def view_for(self, index):
+        """Return the live view for a tab, or None if it is not materialized."""
+        if 0 <= index < len(self.hosts):
+            return self.hosts[index].view
+        return None
+
+    def owns_page(self, page):
+        """True if `page` is still the page of one of the live views."""
+        return any(isinstance(host.view, QWebEngineView) and host.view.page() is page for host in self.hosts)
+
+    def live_views(self):
+        return [host.view for host in self.lru]
+
+    def native_views(self):
+        return [host.view for host in self.hosts if host.view is not None and host.is_native]
+
+    def live_indices(self):
+        return [self.index_of(host) for host in self.lru]
+
+    def materialize(self, index):
+        """Return the view for a tab, building it if it is not live."""
+        host = self.hosts[index]
+        if host.view is None and host.is_native:
+            if self.boards is None:
+                self.boards = JiraBoards()
+            host.attach(self.boards.create_view(host.url))
+        elif host.view is None:
+            web = QWebEngineView()
+            web.setFocusPolicy(Qt.StrongFocus)
+            page = self.create_page(host, web)
+            web.setPage(page)
+            web.setUrl(QUrl(host.url))
+            profiler.track_view(web, host.url)
+            host.attach(web)
+            self.lru.insert(0, host)
+        return host.view
+
+    def navigate(self, index, url):
+        """Point a tab at a new URL; the URL is kept if the view is later rebuilt."""
+        self.navigate_host(self.hosts[index], url)
+
+    def navigate_host(self, host, url):
+        was_native = host.is_native
+        host.url = url
+        if host.view is None:
+            return
+        if host.is_native == was_native:
+            host.view.setUrl(QUrl(url))
+            return
+        # A web tab became native or the other way round; the view is rebuilt for its new kind
+        shown = host.isVisible()
+        self.release_host(host)
+        if shown and self.index_of(host) is not None:
+            self.materialize(self.index_of(host))
+
+    def swap_page(self, index, page):
+        """Replace a live view's page with an already loaded one and dispose of the old page."""
+        view = self.hosts[index].view
+        old_page = view.page()
+        page.setParent(view)
+        view.setPage(page)
+        old_page.deleteLater()
+
+    def recycle_host(self, host, in_place=False):
+        """
+        Give a live view a fresh page (and renderer) that reloads the tab's URL.
+
+        With a reloader the fresh page loads off-screen and is swapped in once loaded, so the
+        tab never shows a half-loaded page. `in_place` replaces the page at once, for pages
+        that have nothing left worth showing, e.g. after their renderer crashed.
+        """
+        view = host.view
+        if view is None:
+            return
+        if self.reloader is not None and not in_place:
+            self.reloader.reload(self.index_of(host))
+            return
+        old_page = view.page()
+        url = old_page.url() if old_page.url().isValid() else QUrl(host.url)
+        page = self.create_page(host, view)
+        view.setPage(page)
+        old_page.deleteLater()
+        page.setUrl(url)
+
+    def window(self, index):
+        total = len(self.hosts)
+        return [(index + offset) % total for offset in range(min(self.lookahead + 1, total))]
+
+    def show(self, index):
+        """Make `index` the shown tab: warm its window, freeze the rest and trim the pool."""
+        if not self.hosts:
+            return
+        self.current_index = index
+        window = [self.hosts[i] for i in self.window(index)]
+        for host in reversed(window):
+            self.materialize(self.index_of(host))
+            self.touch(host)
+
+        for host in self.lru:
+            state = QWebEnginePage.Active if host in window else QWebEnginePage.Frozen
+            self.set_lifecycle_state(host, state)
+        if self.governor is not None:
+            self.governor.apply()
+
+        self.trim(window)
+
+    def touch(self, host):
+        if host.is_native:
+            return  # Native tabs are not pooled
+        if host in self.lru:
+            self.lru.remove(host)
+        self.lru.append(host)
+
+    def set_lifecycle_state(self, host, state):
+        page = host.view.page()
+        if page.lifecycleState() == state:
+            return
+        # Visible pages cannot be frozen; they are frozen on a later show() instead
+        if state != QWebEnginePage.Active and host.isVisible():
+            return
+        page.setLifecycleState(state)
+
+    def trim(self, protected):
+        while len(self.lru) > self.pool_size:
+            victim = next((host for host in self.lru if host not in protected), None)
+            if victim is None:
+                break
+            self.release_host(victim)
+
+    def release(self, index):
+        """Destroy a tab's live view; the host stays in place as a descriptor."""
+        self.release_host(self.hosts[index])
+
+    def release_host(self, host):
+        view = host.detach()
+        if host in self.lru:
+            self.lru.remove(host)
+        if self.governor is not None:
+            self.governor.forget(host)  # Its renderer and CPU history go with the view
+        if view is not None:
+            if isinstance(view, QWebEngineView):
+                view.page().deleteLater()
+            view.deleteLater()
+
+    def release_all(self):
+        for host in list(self.lru):
+            self.release_host(host)
@@ -0,0 +1,228 @@
+# web_telemetry.py
+
+import csv
+import json
+import os
+import time
+from collections import deque
+from functools import partial
+from PyQt5 import sip
+from PyQt5.QtCore import QEvent, QObject, Qt, QTimer
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtWebEngineWidgets import QWebEngineScript
+
+DEFAULT_CAPACITY = 100  # samples kept per tab
+COLLECT_DELAY = 1000  # ms after loadFinished, so late load handlers are included
+
+FIELDS = ('ttfb_ms', 'dcl_ms', 'load_ms', 'resources', 'transfer_bytes', 'encoded_bytes', 'heap_bytes')
+
+# Navigation and Resource Timing of the current document, plus Chromium's performance.memory
+TELEMETRY_JS = r"""
+(function () {
+    var nav = performance.getEntriesByType('navigation')[0];
+    if (!nav) {
+        return null;
+    }
+    var resources = performance.getEntriesByType('resource');
+    var transfer = nav.transferSize || 0;
+    var encoded = nav.encodedBodySize || 0;
+    resources.forEach(function (entry) {
+        transfer += entry.transferSize || 0;
+        encoded += entry.encodedBodySize || 0;
+    });
+    var memory = performance.memory || {};
+    return {
+        ttfb_ms: nav.responseStart,
+        dcl_ms: nav.domContentLoadedEventEnd,
+        load_ms: nav.loadEventEnd || performance.now(),
+        resources: resources.length,
+        transfer_bytes: transfer,
+        encoded_bytes: encoded,
+        heap_bytes: memory.usedJSHeapSize || 0
+    };
+})();
+"""
+
+
+def telemetry_settings(config):
+    """Return the 'telemetry' block of a urls.json mapping, or None when disabled."""
+    settings = config.get('telemetry', {})
+    if not settings.get('enabled', False):
+        return None
+    return settings
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class WebTelemetry:
+    """
+    Per-tab page load metrics collected from the pages themselves.
+
+    Every page the view pool creates reports its Navigation/Resource Timing and JS heap a
+    moment after each load. The last `capacity` samples per tab are kept for percentiles;
+    with `export_path` each sample is also appended to a .jsonl or .csv file.
+    """
+
+    def __init__(self, view_pool, capacity=DEFAULT_CAPACITY, export_path=None):
+        self.view_pool = view_pool
+        self.capacity = capacity
+        self.export_path = export_path
+        self.samples = {}  # host -> deque of sample dicts
+        view_pool.page_hooks.append(self.watch_page)
+        for host in view_pool.lru:
+            self.watch_page(host.view.page(), host)
+
+    def watch_page(self, page, host):
+        page.loadFinished.connect(partial(self.on_load_finished, host, page))
+
+    def on_load_finished(self, host, page, ok):
+        if ok:
+            QTimer.singleShot(COLLECT_DELAY, partial(self.collect, host, page))
+
+    def collect(self, host, page):
+        if sip.isdeleted(page):
+            return
+        page.runJavaScript(
+            TELEMETRY_JS, QWebEngineScript.ApplicationWorld,
+            partial(self.record, host, page.url().toString())
+        )
+
+    def record(self, host, url, metrics):
+        if not metrics or self.view_pool.index_of(host) is None:
+            return
+        sample = {'time': round(time.time(), 3), 'url': url}
+        for field in FIELDS:
+            sample[field] = round(metrics.get(field) or 0, 1)
+        self.samples.setdefault(host, deque(maxlen=self.capacity)).append(sample)
+        if self.export_path:
+            self.export([dict(sample, tab=self.view_pool.index_of(host))], self.export_path, append=True)
+
+    def forget(self, host):
+        self.samples.pop(host, None)
+
+    def tab_summary(self, host):
+        samples = self.samples.get(host)
+        if not samples:
+            return None
+        loads = [sample['load_ms'] for sample in samples]
+        last = samples[-1]
+        return {
+            'tab': self.view_pool.index_of(host),
+            'url': host.url,
+            'loads': len(samples),
+            'load_p50_ms': percentile(loads, 0.5),
+            'load_p95_ms': percentile(loads, 0.95),
+            'transfer_bytes': last['transfer_bytes'],
+            'heap_bytes': last['heap_bytes'],
+        }
+
+    def summary(self):
+        """One summary per tab with samples, in tab order."""
+        summaries = [self.tab_summary(host) for host in self.view_pool.hosts]
+        return [summary for summary in summaries if summary is not None]
+
+    def rows(self):
+        for host, samples in self.samples.items():
+            tab = self.view_pool.index_of(host)
+            for sample in samples:
+                yield dict(sample, tab=tab)
+
+    def export(self, rows=None, path=None, append=False):
+        """Write samples (all buffered ones by default) as JSON lines or, for a .csv path, CSV."""
+        rows = list(self.rows() if rows is None else rows)
+        path = path or self.export_path
+        columns = ('time', 'tab', 'url') + FIELDS
+        try:
+            if path.endswith('.csv'):
+                write_header = not append or not os.path.exists(path) or os.path.getsize(path) == 0
+                with open(path, 'a' if append else 'w', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=columns)
+                    if write_header:
+                        writer.writeheader()
+                    writer.writerows(rows)
+            else:
+                with open(path, 'a' if append else 'w') as f:
+                    for row in rows:
+                        f.write(json.dumps({column: row.get(column) for column in columns}) + '\n')
+        except OSError as e:
+            print(f"Could not export telemetry to {path}: {e}")
+
+
+class OverlayAnchor(QObject):
+    """
+    Keeps a widget pinned to a corner of its parent without putting it in a layout.
+
+    The widget floats above its siblings, so showing, hiding or resizing it never changes
+    the geometry of anything else, e.g. the web views.
+    """
+
+    def __init__(self, widget, corner=Qt.BottomLeftCorner, margin=0):
+        super().__init__(widget)
+        self.widget = widget
+        self.corner = corner
+        self.margin = margin
+        widget.setAttribute(Qt.WA_TransparentForMouseEvents)
+        widget.parentWidget().installEventFilter(self)
+        widget.installEventFilter(self)
+        self.place()
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Resize, QEvent.Show, QEvent.LayoutRequest):
+            self.place()
+        return False
+
+    def place(self):
+        widget = self.widget
+        parent = widget.parentWidget()
+        widget.adjustSize()
+        left = self.corner in (Qt.TopLeftCorner, Qt.BottomLeftCorner)
+        top = self.corner in (Qt.TopLeftCorner, Qt.TopRightCorner)
+        x = self.margin if left else parent.width() - widget.width() - self.margin
+        y = self.margin if top else parent.height() - widget.height() - self.margin
+        if widget.pos().x() != x or widget.pos().y() != y:
+            widget.move(x, y)
+        widget.raise_()
+
+
+class TelemetryHud(QLabel):
+    """Floating per-tab load p50/p95 and page weight, transition frame timing and pause state; updated every second."""
+
+    def __init__(self, parent, telemetry, is_paused=None, corner=Qt.TopRightCorner, transitions=None):
+        super().__init__(parent)
+        self.telemetry = telemetry
+        self.is_paused = is_paused or (lambda: False)
+        self.transitions = transitions  # TransitionStats of the tab transitioner, if any
+        self.setStyleSheet(
+            "font-family: monospace; font-size: 13px; color: white; background-color: rgba(0, 0, 0, 0.6);"
+        )
+        self.setMargin(8)
+        self.anchor = OverlayAnchor(self, corner)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000)
+        self.refresh()
+        self.show()
+
+    def refresh(self):
+        lines = ['PAUSED' if self.is_paused() else 'rotating']
+        for summary in self.telemetry.summary():
+            lines.append(
+                f"tab {summary['tab'] + 1}: load p50 {summary['load_p50_ms'] / 1000:.2f}s "
+                f"p95 {summary['load_p95_ms'] / 1000:.2f}s  "
+                f"{summary['transfer_bytes'] / 1048576:.1f} MB  heap {summary['heap_bytes'] / 1048576:.0f} MB"
+            )
+        if self.transitions is not None:
+            summary = self.transitions.summary()
+            if summary['transitions']:
+                lines.append(
+                    f"transitions: {summary['fps']:.0f} fps  worst frame p95 {summary['p95_max_frame_ms']:.0f} ms  "
+                    f"{summary['dropped_frames']} dropped"
+                )
+        text = '\n'.join(lines)
+        if text != self.text():
+            self.setText(text)
+            self.anchor.place()